@@ -0,0 +1,314 @@
+"""
+Scaling benchmarks for the field, polynomial, R1CS and witness layers.
+
+    python benchmark.py                          # 10 .. 10^5 gates
+    python benchmark.py --max-gates 1000 --output bench.json
+    python benchmark.py --baseline bench.json    # flag regressions (exit code 1)
+
+Every benchmark runs at each size, then we fit its growth curve: the log-log
+slope (empirical exponent) and the closest of O(n), O(n log n), O(n^2),
+O(n^3). Results are JSON so they can be stored as a baseline and diffed;
+each point also records its throughput (n / seconds), the figure of merit
+for the curve benchmarks.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+from src.circuit import FlatCircuit
+from src.curve import G1_GENERATOR, G2_GENERATOR, CURVE_ORDER, FixedBaseTable, msm
+from src.finite_field import FieldElement
+from src.polynomial import Polynomial, lagrange_interpolation
+from src.r1cs import R1CS
+from src.witness import WitnessGenerator
+
+PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+COMPLEXITY_CLASSES = {
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: n ** 2,
+    "O(n^3)": lambda n: n ** 3,
+}
+
+
+def to_field(num):
+    return FieldElement(num, PRIME)
+
+
+def synthetic_circuit(num_gates, seed=0):
+    """
+    A random but reproducible circuit with num_gates gates: a mix of
+    MUL / ADD / SUB over 4 inputs and every wire computed so far.
+    """
+    rng = random.Random(seed)
+    circuit = FlatCircuit()
+    inputs = ["x0", "x1", "x2", "x3"]
+    wires = list(inputs)
+    for _ in range(num_gates):
+        left, right = rng.choice(wires), rng.choice(wires)
+        op = rng.choice([circuit.mul, circuit.mul, circuit.add, circuit.sub])
+        wires.append(op(left, right))
+    return circuit, {name: to_field(rng.randrange(1, PRIME)) for name in inputs}
+
+
+def time_it(fn, min_time=0.2, max_runs=5):
+    """Best-of-N wall time, running until min_time has been spent (or max_runs)."""
+    best, spent, runs = float("inf"), 0.0, 0
+    while runs < max_runs and (runs == 0 or spent < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best
+
+
+# --- Benchmarks: each takes n and returns a zero-argument callable to time ---
+
+def bench_field_ops(n):
+    rng = random.Random(n)
+    xs = [to_field(rng.randrange(1, PRIME)) for _ in range(n)]
+    ys = [to_field(rng.randrange(1, PRIME)) for _ in range(n)]
+
+    def run():
+        for x, y in zip(xs, ys):
+            (x + y) * (x - y)
+    return run
+
+
+def bench_field_inverse(n):
+    rng = random.Random(n)
+    xs = [to_field(rng.randrange(1, PRIME)) for _ in range(n)]
+    one = to_field(1)
+    return lambda: [one / x for x in xs]
+
+
+def _random_poly(n, rng):
+    return Polynomial([to_field(rng.randrange(PRIME)) for _ in range(n)])
+
+
+def bench_poly_mul(n):
+    rng = random.Random(n)
+    a, b = _random_poly(n, rng), _random_poly(n, rng)
+    return lambda: a * b
+
+
+def bench_poly_div(n):
+    rng = random.Random(n)
+    a, b = _random_poly(2 * n, rng), _random_poly(n, rng)
+    return lambda: a / b
+
+
+def bench_interpolation(n):
+    rng = random.Random(n)
+    xs = [to_field(i) for i in range(1, n + 1)]
+    ys = [to_field(rng.randrange(PRIME)) for _ in range(n)]
+    lagrange_interpolation(xs, ys, PRIME)  # Warm the domain cache: we time reuse
+    return lambda: lagrange_interpolation(xs, ys, PRIME)
+
+
+def bench_circuit_build(n):
+    # FlatCircuit emits the R1CS rows (with linear gates folded) as gates are recorded
+    return lambda: synthetic_circuit(n)
+
+
+def bench_r1cs_build(n):
+    # Gates to R1CS end to end; minus circuit.build, this is the variable layout
+    return lambda: R1CS(synthetic_circuit(n)[0])
+
+
+def bench_witness(n):
+    circuit, inputs = synthetic_circuit(n)
+    wg = WitnessGenerator(circuit, R1CS(circuit))
+    return lambda: wg.generate(inputs)
+
+
+def bench_constraint_check(n):
+    circuit, inputs = synthetic_circuit(n)
+    r1cs = R1CS(circuit)
+    w = WitnessGenerator(circuit, r1cs).generate(inputs)
+    return lambda: r1cs.unsatisfied_constraints(w)
+
+
+def _random_scalars(n):
+    rng = random.Random(n)
+    return [rng.randrange(CURVE_ORDER) for _ in range(n)]
+
+
+def bench_g1_mul(n):
+    scalars = _random_scalars(n)
+    return lambda: [G1_GENERATOR * k for k in scalars]
+
+
+def bench_g1_fixed_base(n):
+    scalars = _random_scalars(n)
+    table = FixedBaseTable(G1_GENERATOR)  # Built once, like in a trusted setup
+    return lambda: table.batch_mul(scalars)
+
+
+def bench_g2_mul(n):
+    scalars = _random_scalars(n)
+    return lambda: [G2_GENERATOR * k for k in scalars]
+
+
+def bench_g1_msm(n):
+    scalars = _random_scalars(n)
+    table = FixedBaseTable(G1_GENERATOR)
+    points = table.batch_mul(reversed(scalars))
+    return lambda: msm(points, scalars)
+
+
+BENCHMARKS = {
+    # name: (setup function, size cap key)
+    "field.add_sub_mul": (bench_field_ops, "max_gates"),
+    "field.inverse": (bench_field_inverse, "max_gates"),
+    "poly.mul": (bench_poly_mul, "max_poly"),
+    "poly.divmod": (bench_poly_div, "max_poly"),
+    "poly.interpolate": (bench_interpolation, "max_poly"),
+    "circuit.build": (bench_circuit_build, "max_gates"),
+    "r1cs.build": (bench_r1cs_build, "max_gates"),
+    "witness.generate": (bench_witness, "max_gates"),
+    "r1cs.check": (bench_constraint_check, "max_gates"),
+    # n scalar multiplications each: see "per_second" for throughput
+    "curve.g1_mul": (bench_g1_mul, "max_curve"),
+    "curve.g1_fixed_base": (bench_g1_fixed_base, "max_curve"),
+    "curve.g2_mul": (bench_g2_mul, "max_curve"),
+    "curve.g1_msm": (bench_g1_msm, "max_curve"),
+}
+
+
+def fit_complexity(points):
+    """
+    points: [(n, seconds)]. Returns the log-log slope and the complexity class
+    whose c * f(n) fits best (least squares on log time).
+    """
+    points = [(n, t) for n, t in points if t > 0]
+    if len(points) < 2:
+        return {"exponent": None, "best_fit": None}
+
+    logs = [(math.log(n), math.log(t)) for n, t in points]
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    var_x = sum((x - mean_x) ** 2 for x, _ in logs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in logs) / var_x if var_x else None
+
+    best, best_err = None, float("inf")
+    for label, f in COMPLEXITY_CLASSES.items():
+        # Best constant in log space is the mean residual
+        residuals = [math.log(t) - math.log(f(n)) for n, t in points]
+        log_c = sum(residuals) / len(residuals)
+        err = sum((r - log_c) ** 2 for r in residuals)
+        if err < best_err:
+            best, best_err = label, err
+    return {"exponent": slope, "best_fit": best}
+
+
+def run_suite(sizes, caps, only=None):
+    results = {}
+    for name, (setup, cap_key) in BENCHMARKS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        points = []
+        for n in sizes:
+            if n > caps[cap_key]:
+                continue
+            seconds = time_it(setup(n))
+            points.append((n, seconds))
+            print(f"  {name:<20} n={n:<8} {seconds * 1e3:12.3f} ms", file=sys.stderr)
+        results[name] = {
+            "points": [{"n": n, "seconds": t, "per_second": n / t if t else None} for n, t in points],
+            "fit": fit_complexity(points),
+        }
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold, exponent_slack, noise_floor=1e-3):
+    """
+    Returns human-readable regression messages (empty list = no regressions).
+    Sizes where both runs are under noise_floor seconds are too noisy to flag,
+    and growth exponents are refitted on the sizes both runs share.
+    """
+    regressions = []
+    for name, res in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        base_times = {p["n"]: p["seconds"] for p in base["points"]}
+        shared = []
+        for p in res["points"]:
+            old = base_times.get(p["n"])
+            if old is None:
+                continue
+            shared.append((p["n"], old, p["seconds"]))
+            if p["seconds"] < noise_floor and old < noise_floor:
+                continue
+            if p["seconds"] > old * threshold:
+                regressions.append(f"{name} n={p['n']}: {old:.4g}s -> {p['seconds']:.4g}s "
+                                   f"({p['seconds'] / old:.2f}x)")
+
+        old_fit = fit_complexity([(n, old) for n, old, _ in shared])
+        new_fit = fit_complexity([(n, new) for n, _, new in shared])
+        old_exp, new_exp = old_fit["exponent"], new_fit["exponent"]
+        if old_exp is not None and new_exp is not None and new_exp > old_exp + exponent_slack:
+            regressions.append(f"{name}: growth exponent {old_exp:.2f} -> {new_exp:.2f} "
+                               f"({old_fit['best_fit']} -> {new_fit['best_fit']})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-gates", type=int, default=10**5,
+                        help="Largest size for field / R1CS / witness benchmarks")
+    parser.add_argument("--max-poly", type=int, default=10**4,
+                        help="Largest size for polynomial benchmarks")
+    parser.add_argument("--max-curve", type=int, default=1000,
+                        help="Largest number of scalar multiplications for curve benchmarks")
+    parser.add_argument("--only", nargs="*", help="Run only benchmarks with these name prefixes")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Flag a size as regressed when slower than baseline by this factor")
+    parser.add_argument("--exponent-slack", type=float, default=0.3,
+                        help="Flag a benchmark when its fitted exponent grows by more than this")
+    args = parser.parse_args(argv)
+
+    sizes = [10 ** k for k in range(1, 6)]
+    caps = {"max_gates": args.max_gates, "max_poly": args.max_poly, "max_curve": args.max_curve}
+    report = run_suite(sizes, caps, args.only)
+
+    for name, res in report["results"].items():
+        fit = res["fit"]
+        if fit["exponent"] is not None:
+            print(f"{name:<20} ~n^{fit['exponent']:.2f}  best fit {fit['best_fit']}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.exponent_slack)
+        for msg in regressions:
+            print(f"REGRESSION: {msg}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
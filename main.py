@@ -1,9 +1,13 @@
+import argparse
+import logging
 import sys
 import time
-from src.circuit import FlatCircuit
+from src import instrument
+from src import circuits
 from src.r1cs import R1CS
 from src.witness import WitnessGenerator
 from src.finite_field import FieldElement
+from src import groth16
 
 # A standard large prime used in examples (or use the BN128 scalar field)
 PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
@@ -12,11 +16,17 @@ def to_field(num):
     """Helper to convert int -> FieldElement"""
     return FieldElement(num, PRIME)
 
+# Typewriter delay for the demo; --quiet sets it to 0
+SLOW_DELAY = 0.02
+
 def print_slow(str):
+    if not SLOW_DELAY:
+        print(str)
+        return
     for letter in str:
         sys.stdout.write(letter)
         sys.stdout.flush()
-        time.sleep(0.02)
+        time.sleep(SLOW_DELAY)
     print()
 
 def get_user_input():
@@ -47,16 +57,9 @@ def get_user_input():
         print_slow("\n...SCANNING ID CHIP...")
         return 1990
 
-def id_card_circuit():
-    circuit = FlatCircuit()
-    
-    current_year = "2026"
-    dob = "dob"
-    threshold = "21"
-    
-    # Logic (Remains the same!)
-    age = circuit.sub(current_year, dob, output_name="age")
-    result = circuit.sub(age, threshold, output_name="result")
+def id_card_circuit(key_cache=None):
+    # dob is private; current_year and threshold are constants (see src/circuits.py)
+    circuit = circuits.id_card(current_year=2026, threshold=21)
     
     # Compile
     r1cs = R1CS(circuit)
@@ -67,9 +70,7 @@ def id_card_circuit():
     # We wrap inputs in FieldElements. The entire circuit will now
     # automatically execute using Modular Arithmetic.
     input_data = {
-        "2026": to_field(2026),
         "dob": to_field(user_dob_int),
-        "21": to_field(21)
     }
     
     print_slow("\n>>> COMPUTING OVER FINITE FIELD (Modulo P)...")
@@ -78,20 +79,18 @@ def id_card_circuit():
     
     # Verify
     print("\n>>> VERIFYING CONSTRAINTS...")
-    verified = True
-    for i in range(len(r1cs.A)):
-        # Calculate dot products using field arithmetic
-        # (Since w contains FieldElements, sum() and * work automatically)
-        a_val = sum(r1cs.A[i][j] * w[j] for j in range(len(w)))
-        b_val = sum(r1cs.B[i][j] * w[j] for j in range(len(w)))
-        c_val = sum(r1cs.C[i][j] * w[j] for j in range(len(w)))
-        
-        check = (a_val * b_val) - c_val
-        
-        # Check if result is 0 (modulo P)
-        if check.value != 0:
-            verified = False
-            print(f" [x] Constraint {i} FAILED")
+    # One sparse pass over A, B and C (FieldElements carry the prime)
+    failed = r1cs.unsatisfied_constraints(w)
+    for i in failed:
+        print(f" [x] Constraint {i} FAILED")
+
+    # Succinct check: the verifier only sees the proof and the public "result"
+    print_slow("\n>>> PROVING (Groth16)...")
+    cache = groth16.KeyCache(key_cache) if key_cache else None
+    pk, vk = cache.get(r1cs) if cache else groth16.setup(r1cs)
+    proof = groth16.prove(pk, r1cs, w)
+    public = [w[i] for i in range(1, r1cs.num_public + 1)]
+    verified = not failed and groth16.verify(vk, public, proof)
 
     print("-" * 40)
     
@@ -112,5 +111,23 @@ def id_card_circuit():
     else:
         print(" CRITICAL ERROR: PROOF INVALID.")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Zero-knowledge identity scanner demo")
+    parser.add_argument("--quiet", action="store_true",
+                        help="No typewriter delays and no library logging")
+    parser.add_argument("--key-cache", metavar="DIR",
+                        help="Cache Groth16 keys in DIR (keyed by circuit hash) instead of running setup every time")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Append per-stage timing records to PATH as JSON lines")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    id_card_circuit()
\ No newline at end of file
+    args = parse_args()
+    logging.basicConfig(format="%(message)s")
+    instrument.set_log_level(logging.WARNING if args.quiet else logging.DEBUG)
+    if args.quiet:
+        SLOW_DELAY = 0
+    if args.profile:
+        instrument.add_sink(instrument.JsonLinesSink(args.profile))
+        instrument.configure(track_memory=True)
+    id_card_circuit(args.key_cache)
\ No newline at end of file
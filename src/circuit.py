@@ -1,56 +1,335 @@
+from array import array
+
+from src.finite_field import FieldElement
+from src.sparse import SparseMatrix
+
+# Linear combinations longer than this stop being folded and get their own
+# variable instead, so long addition chains don't copy ever-growing dicts.
+MAX_LC_TERMS = 32
+
+# Gate opcodes, as stored in FlatCircuit.gate_ops (and run by the witness tape)
+OP_ADD = 0
+OP_SUB = 1
+OP_MUL = 2
+OP_SCALE = 3
+OPCODES = {'ADD': OP_ADD, 'SUB': OP_SUB, 'MUL': OP_MUL, 'SCALE': OP_SCALE}
+OP_NAMES = {code: name for name, code in OPCODES.items()}
+
+
+class Wire(int):
+    """
+    A wire ID: a dense integer assigned when the wire is allocated.
+
+    It is an int, so it indexes arrays directly, but a distinct type, so a
+    wire is never mistaken for an integer constant operand.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"Wire({int(self)})"
+
+
+class LinearCombination:
+    """
+    sum(coeff * wire) over circuit wire IDs, e.g. {3: 1, 4: -1} for w3 - w4.
+    A constant term is a coefficient on the 'one' wire (ID 0).
+
+    Additions, subtractions and scalings don't need a constraint of their own
+    in R1CS: they can ride along inside the A, B or C row of whichever
+    multiplication consumes them.
+    """
+    __slots__ = ('terms',)
+
+    def __init__(self, terms=None):
+        self.terms = {w: c for w, c in (terms or {}).items() if c != 0}
+
+    def _combine(self, other, sign):
+        terms = dict(self.terms)
+        for wire, coeff in other.terms.items():
+            value = terms.get(wire, 0) + sign * coeff
+            if value:
+                terms[wire] = value
+            else:
+                terms.pop(wire, None)
+        lc = LinearCombination()
+        lc.terms = terms
+        return lc
+
+    def __add__(self, other):
+        return self._combine(other, 1)
+
+    def __sub__(self, other):
+        return self._combine(other, -1)
+
+    def __neg__(self):
+        return self.scale(-1)
+
+    def scale(self, k):
+        return LinearCombination({w: c * k for w, c in self.terms.items()})
+
+    def __len__(self):
+        return len(self.terms)
+
+    def items(self):
+        return self.terms.items()
+
+    def is_constant(self, one):
+        """True if this only involves the constant wire (including the zero LC)."""
+        return all(w == one for w in self.terms)
+
+    def constant_value(self, one):
+        return self.terms.get(one, 0)
+
+    def key(self):
+        """A hashable, order-independent form (used for common-subexpression checks)."""
+        return tuple(sorted(self.terms.items()))
+
+    def __repr__(self):
+        return " + ".join(f"{c}*w{w}" for w, c in self.terms.items()) or "0"
+
+
 class FlatCircuit:
     """
     Represents an Arithmetic Circuit that records operations
     to later be converted into R1CS (Rank-1 Constraint System).
+
+    Wires are dense integer IDs (Wire objects) handed out by allocate();
+    wire 0 is the constant 'one'. Names are optional and only live in a side
+    table, so wires can still be referred to by name (e.g. circuit.mul("x", "y")
+    allocates input wires "x" and "y" on first use).
+
+    Operands are wires, names or constants (ints / FieldElements). A constant
+    is not a wire: it becomes a coefficient on the 'one' wire, so it needs no
+    witness entry, no input and no QAP polynomial.
+
+    Inputs can be declared public (part of the statement) or private; any
+    undeclared wire that is read before being written is a private input.
+    R1CS lays variables out as [one, outputs, public inputs, private inputs,
+    internal wires], which is also the order circom uses.
+
+    Gates are stored as a struct of arrays: gate_ops, gate_lefts, gate_rights
+    and gate_outputs. An operand >= 0 is a wire ID; an operand < 0 is ~k, a
+    reference to self.constants[k].
+
+    Every linear wire (ADD / SUB / SCALE output, or a MUL by a constant)
+    carries its LinearCombination in self.lcs. Those wires are "folded": they
+    don't get an R1CS variable or constraint unless they are declared as
+    outputs, so only real multiplications cost a row. Constraint rows are
+    emitted as gates are recorded, in wire-ID columns, into self.rows; R1CS
+    only has to permute the columns into the final layout.
     """
     def __init__(self):
-        self.operations = [] # List of {'left', 'right', 'output', 'op'}
-        self.variable_counter = 1 # Start at 1 (0 is usually reserved for the constant '1')
-        self.one = 'one' # Represents the constant 1
+        self.one = Wire(0) # Represents the constant 1
+        self.names = {self.one: 'one'} # Wire -> name, for named wires only
+        self.wire_ids = {'one': self.one} # name -> Wire
+        self.produced = bytearray(1) # produced[w] == 1 if a gate writes wire w
+
+        self.gate_ops = array('B')
+        self.gate_lefts = array('q')
+        self.gate_rights = array('q')
+        self.gate_outputs = array('q')
+        self.constants = [] # Constant operand pool (plain ints)
+        self._constant_refs = {} # value -> ~index into self.constants
+
+        self.lcs = {} # Folded wire -> LinearCombination of the wires it stands for
+        self.rows = (SparseMatrix(), SparseMatrix(), SparseMatrix()) # A, B, C over wire IDs
+        self.outputs = [] # Wires that must appear in the witness (public)
+        self._output_set = set()
+        self.public_inputs = []
+        self.private_inputs = []
+
+    @property
+    def num_wires(self):
+        return len(self.produced)
+
+    @property
+    def num_gates(self):
+        return len(self.gate_ops)
 
     def allocate(self, name=None):
         """Allocates a new variable (wire) in the circuit."""
-        var_name = name if name else f"v{self.variable_counter}"
-        self.variable_counter += 1
-        return var_name
+        if name is not None and name in self.wire_ids:
+            raise ValueError(f"Wire '{name}' already exists")
+        wire = Wire(len(self.produced))
+        self.produced.append(0)
+        if name is not None:
+            self.names[wire] = name
+            self.wire_ids[name] = wire
+        return wire
+
+    def wire(self, name):
+        """The wire with this name (or ID), allocated on first use of a name."""
+        if isinstance(name, int):
+            if not 0 <= name < len(self.produced):
+                raise ValueError(f"No wire with ID {name}")
+            return Wire(name)
+        wire = self.wire_ids.get(name)
+        return wire if wire is not None else self.allocate(name)
+
+    def name_of(self, wire):
+        return self.names.get(wire, f"v{int(wire)}")
+
+    def _declare_input(self, name, declared, other, kind):
+        wire = self.wire(name)
+        if wire in other:
+            raise ValueError(f"'{self.name_of(wire)}' is already declared {kind}")
+        if self.produced[wire]:
+            raise ValueError(f"Input '{self.name_of(wire)}' is the output of a gate")
+        if wire not in declared:
+            declared.append(wire)
+        return wire
+
+    def public_input(self, name):
+        """Declares a public input wire (known to the verifier)."""
+        return self._declare_input(name, self.public_inputs, self.private_inputs, "private")
+
+    def private_input(self, name):
+        """Declares a private input wire (known only to the prover)."""
+        return self._declare_input(name, self.private_inputs, self.public_inputs, "public")
+
+    @staticmethod
+    def is_constant(operand):
+        return isinstance(operand, (int, FieldElement)) and not isinstance(operand, Wire)
+
+    def _constant(self, value):
+        if isinstance(value, FieldElement):
+            value = value.value
+        ref = self._constant_refs.get(value)
+        if ref is None:
+            ref = self._constant_refs[value] = ~len(self.constants)
+            self.constants.append(value)
+        return ref
+
+    def _operand(self, operand):
+        """Encodes an operand: a wire ID (>= 0) or a constant reference (< 0)."""
+        if self.is_constant(operand):
+            return self._constant(operand)
+        return self.wire(operand)
+
+    def _lc(self, ref):
+        if ref < 0:
+            return LinearCombination({self.one: self.constants[~ref]})
+        folded = self.lcs.get(ref)
+        return folded if folded is not None else LinearCombination({ref: 1})
+
+    def lc(self, operand):
+        """The LinearCombination an operand stands for (a wire itself, unless it was folded)."""
+        return self._lc(self._operand(operand))
+
+    def is_folded(self, wire):
+        return self.wire(wire) in self.lcs
+
+    def _fold(self, wire, lc):
+        # Past MAX_LC_TERMS the wire stays a real variable with its own constraint
+        if len(lc) <= MAX_LC_TERMS:
+            self.lcs[wire] = lc
+            return True
+        return False
+
+    def _emit_row(self, a, b, c):
+        A, B, C = self.rows
+        A.append_row(a.items())
+        B.append_row(b.items())
+        C.append_row(c.items())
+
+    def _gate(self, op, left, right, output_name):
+        left, right = self._operand(left), self._operand(right)
+        return self._record(op, left, right, self.allocate(output_name))
+
+    def _record(self, op, left, right, out):
+        """Appends an encoded gate writing wire out, folding it or emitting its R1CS row."""
+        if self.produced[out]:
+            raise ValueError(f"Wire '{self.name_of(out)}' is already written by a gate")
+        self.produced[out] = 1
+        self.gate_ops.append(op)
+        self.gate_lefts.append(left)
+        self.gate_rights.append(right)
+        self.gate_outputs.append(out)
+
+        a, b = self._lc(left), self._lc(right)
+        if op == OP_MUL:
+            # Multiplying by a constant is just a scaling: constant-fold it
+            if a.is_constant(self.one):
+                lc = b.scale(a.constant_value(self.one))
+            elif b.is_constant(self.one):
+                lc = a.scale(b.constant_value(self.one))
+            else:
+                self._emit_row(a, b, LinearCombination({out: 1}))
+                return out
+        elif op == OP_ADD:
+            lc = a + b
+        elif op == OP_SUB:
+            lc = a - b
+        elif op == OP_SCALE:
+            lc = a.scale(self.constants[~right])
+        else:
+            raise ValueError(f"Unknown Op: {op}")
+
+        if not self._fold(out, lc):
+            self._emit_row(lc, LinearCombination({self.one: 1}), LinearCombination({out: 1}))
+        return out
 
     def add(self, left, right, output_name=None):
         """Records an Addition gate: left + right = output"""
-        out = self.allocate(output_name)
-        self.operations.append({
-            'left': left,
-            'right': right,
-            'output': out,
-            'op': 'ADD'
-        })
-        return out
+        return self._gate(OP_ADD, left, right, output_name)
 
     def sub(self, left, right, output_name=None):
         """Records a Subtraction (basically Addition with neg): left - right = output"""
-        # For simplicity in R1CS, we often treat this just like add, or handle constants.
-        # Here we just record it as SUB for the flattener to handle.
-        out = self.allocate(output_name)
-        self.operations.append({
-            'left': left,
-            'right': right,
-            'output': out,
-            'op': 'SUB'
-        })
-        return out
+        return self._gate(OP_SUB, left, right, output_name)
+
+    def scale(self, wire, k, output_name=None):
+        """Records a Scaling by an integer constant: wire * k = output"""
+        return self._record(OP_SCALE, self._operand(wire), self._constant(k), self.allocate(output_name))
 
     def mul(self, left, right, output_name=None):
         """Records a Multiplication gate: left * right = output"""
-        out = self.allocate(output_name)
-        self.operations.append({
-            'left': left,
-            'right': right,
-            'output': out,
-            'op': 'MUL'
-        })
-        return out
+        return self._gate(OP_MUL, left, right, output_name)
+
+    def output(self, wire):
+        """Declares a wire as a (public) circuit output: it keeps its own witness entry."""
+        if self.is_constant(wire):
+            raise ValueError("A constant can't be an output wire")
+        wire = self.wire(wire)
+        if wire not in self._output_set:
+            self.outputs.append(wire)
+            self._output_set.add(wire)
+            # A folded wire has no row of its own yet: pin it with lc(wire) * one = wire
+            if wire in self.lcs:
+                self._emit_row(self.lcs[wire], LinearCombination({self.one: 1}), LinearCombination({wire: 1}))
+        return wire
+
+    @property
+    def operations(self):
+        """
+        The gates as a list of {'left', 'right', 'output', 'op'} dicts, as this
+        attribute has always been, decoded from the gate arrays on each access
+        (constant operands come back as their values). Prefer the arrays in
+        hot paths.
+        """
+        decode = lambda ref: Wire(ref) if ref >= 0 else self.constants[~ref]
+        return [{'left': decode(l), 'right': decode(r), 'output': Wire(o), 'op': OP_NAMES[op]}
+                for op, l, r, o in zip(self.gate_ops, self.gate_lefts, self.gate_rights, self.gate_outputs)]
+
+    def constraints(self):
+        """
+        Yields one (A, B, C) triple of LinearCombinations per R1CS constraint,
+        in the order they were emitted:
+        - every unfolded MUL:                  lc(left) * lc(right) = out
+        - every unfolded linear gate:          lc(expression) * one = out
+        - every folded wire declared output:   lc(wire) * one = wire
+        """
+        A, B, C = self.rows
+        for i in range(len(A)):
+            yield (LinearCombination(dict(A.row(i))), LinearCombination(dict(B.row(i))),
+                   LinearCombination(dict(C.row(i))))
+
+    def num_constraints(self):
+        """Number of R1CS constraints this circuit compiles to."""
+        return len(self.rows[0])
 
     def print_circuit(self):
         print("--- Arithmetic Circuit ---")
+        show = lambda x: self.name_of(x) if isinstance(x, Wire) else x
         for op in self.operations:
-            print(f"{op['output']} = {op['left']} {op['op']} {op['right']}")
-        print("--------------------------")
\ No newline at end of file
+            print(f"{show(op['output'])} = {show(op['left'])} {op['op']} {show(op['right'])}")
+        print("--------------------------")
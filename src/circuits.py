@@ -0,0 +1,32 @@
+"""
+Named circuit builders: zero-argument functions returning a FlatCircuit.
+
+They are plain module-level functions so a worker process can be handed one
+(pickled by reference) and compile the circuit itself.
+"""
+from src.circuit import FlatCircuit
+
+
+def id_card(current_year=2026, threshold=21):
+    """
+    The identity-scanner demo: proves knowledge of a dob with public output
+    "result" = current_year - dob - threshold. This is not a private age
+    check: the constants are public, so anyone can recover
+    dob = current_year - threshold - result from the output. The holder is old
+    enough exactly when result is non-negative (a small field element rather
+    than one near p), and that is for the verifier to check; the circuit has
+    no range constraint of its own.
+    """
+    circuit = FlatCircuit()
+
+    # Constants are coefficients on the 'one' wire: no witness entry, no input
+    dob = circuit.private_input("dob")
+    age = circuit.sub(current_year, dob, output_name="age")
+    result = circuit.sub(age, threshold, output_name="result")
+    circuit.output(result)  # Keep "result" in the witness (linear wires are folded)
+    return circuit
+
+
+REGISTRY = {
+    "id_card": id_card,
+}
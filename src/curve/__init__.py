@@ -0,0 +1,12 @@
+"""BN254 (alt_bn128) elliptic curve groups G1 and G2, and the pairing between them."""
+from src.curve.fields import Q, Fq2, Fq12
+from src.curve.points import (CURVE_ORDER, G1Point, G2Point, G1_GENERATOR, G2_GENERATOR,
+                              JacobianPoint, wnaf)
+from src.curve.fixed_base import FixedBaseTable, optimal_window
+from src.curve.msm import msm, window_size
+from src.curve.pairing import pairing, pairing_product
+
+__all__ = [
+    "Q", "Fq2", "Fq12", "CURVE_ORDER", "G1Point", "G2Point", "G1_GENERATOR", "G2_GENERATOR",
+    "JacobianPoint", "wnaf", "FixedBaseTable", "optimal_window", "msm", "window_size", "pairing", "pairing_product",
+]
@@ -0,0 +1,277 @@
+"""
+Base fields of BN254 (alt_bn128): Fq for G1 coordinates and
+Fq2 = Fq[u] / (u^2 + 1) for G2 coordinates.
+
+Fq elements are plain ints mod Q (the hot G1 formulas inline their own
+reductions); Fq2 elements are a small class with operator overloads.
+"""
+from src import field_backends
+
+# Base field modulus. Not to be confused with the scalar field r (the PRIME
+# used everywhere else in the repo), which is the order of G1 and G2.
+Q = 21888242871839275222246405745257275088696311157297823662689037894645226208583
+
+
+def fq_inv(a):
+    if a % Q == 0:
+        raise ZeroDivisionError("Fq inverse of zero")
+    return field_backends.current.inverse(a, Q)
+
+
+class Fq2:
+    """c0 + c1 * u with u^2 = -1, both coefficients ints mod Q."""
+    __slots__ = ('c0', 'c1')
+
+    def __init__(self, c0, c1=0):
+        self.c0 = c0 % Q
+        self.c1 = c1 % Q
+
+    @classmethod
+    def _raw(cls, c0, c1):
+        # Skips the reduction for already-reduced coefficients
+        obj = object.__new__(cls)
+        obj.c0 = c0
+        obj.c1 = c1
+        return obj
+
+    @classmethod
+    def zero(cls):
+        return cls._raw(0, 0)
+
+    @classmethod
+    def one(cls):
+        return cls._raw(1, 0)
+
+    def __add__(self, other):
+        if isinstance(other, int):
+            return Fq2._raw((self.c0 + other) % Q, self.c1)
+        return Fq2._raw((self.c0 + other.c0) % Q, (self.c1 + other.c1) % Q)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, int):
+            return Fq2._raw((self.c0 - other) % Q, self.c1)
+        return Fq2._raw((self.c0 - other.c0) % Q, (self.c1 - other.c1) % Q)
+
+    def __rsub__(self, other):
+        return Fq2._raw((other - self.c0) % Q, -self.c1 % Q)
+
+    def __neg__(self):
+        return Fq2._raw(-self.c0 % Q, -self.c1 % Q)
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return Fq2._raw(self.c0 * other % Q, self.c1 * other % Q)
+        a0, a1, b0, b1 = self.c0, self.c1, other.c0, other.c1
+        # Karatsuba: 3 multiplications instead of 4
+        t0, t1 = a0 * b0, a1 * b1
+        return Fq2._raw((t0 - t1) % Q, ((a0 + a1) * (b0 + b1) - t0 - t1) % Q)
+
+    __rmul__ = __mul__
+
+    def square(self):
+        a0, a1 = self.c0, self.c1
+        return Fq2._raw((a0 + a1) * (a0 - a1) % Q, 2 * a0 * a1 % Q)
+
+    def inverse(self):
+        # 1 / (a + bu) = (a - bu) / (a^2 + b^2)
+        norm_inv = fq_inv(self.c0 * self.c0 + self.c1 * self.c1)
+        return Fq2._raw(self.c0 * norm_inv % Q, -self.c1 * norm_inv % Q)
+
+    def __truediv__(self, other):
+        if isinstance(other, int):
+            return self * fq_inv(other)
+        return self * other.inverse()
+
+    def __pow__(self, exponent):
+        result, base = Fq2.one(), self
+        while exponent:
+            if exponent & 1:
+                result = result * base
+            base = base.square()
+            exponent >>= 1
+        return result
+
+    def conjugate(self):
+        return Fq2._raw(self.c0, -self.c1 % Q)
+
+    def is_zero(self):
+        return self.c0 == 0 and self.c1 == 0
+
+    def __bool__(self):
+        return not self.is_zero()
+
+    def __eq__(self, other):
+        if isinstance(other, int):
+            return self.c0 == other % Q and self.c1 == 0
+        return isinstance(other, Fq2) and self.c0 == other.c0 and self.c1 == other.c1
+
+    def __hash__(self):
+        return hash((self.c0, self.c1))
+
+    def __repr__(self):
+        return f"Fq2({self.c0}, {self.c1})"
+
+
+def fq2_batch_inverse(values):
+    """Montgomery's trick over Fq2 (one inversion for the whole list). Zeros map to zero."""
+    prefix, acc = [], Fq2.one()
+    for v in values:
+        prefix.append(acc)
+        if not v.is_zero():
+            acc = acc * v
+    inv_acc = acc.inverse()
+    out = [Fq2.zero()] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        v = values[i]
+        if v.is_zero():
+            continue
+        out[i] = prefix[i] * inv_acc
+        inv_acc = inv_acc * v
+    return out
+
+
+class Fq12:
+    """
+    Fq12 = Fq[w] / (w^12 - 18 w^6 + 82), stored as 12 ints mod Q.
+
+    This is the flat form of the usual tower: w^6 = 9 + u, so Fq2 sits
+    inside as c0 + c1 * u = (c0 - 9 c1) + c1 * w^6. It is the target group
+    of the pairing.
+    """
+    __slots__ = ('c',)
+    DEGREE = 12
+    _frobenius = None  # (w^i)^Q for i < 12, built on first use
+
+    def __init__(self, coeffs):
+        if len(coeffs) != 12:
+            raise ValueError("Fq12 needs 12 coefficients")
+        self.c = [x % Q for x in coeffs]
+
+    @classmethod
+    def _raw(cls, coeffs):
+        obj = object.__new__(cls)
+        obj.c = coeffs
+        return obj
+
+    @classmethod
+    def one(cls):
+        return cls._raw([1] + [0] * 11)
+
+    @classmethod
+    def zero(cls):
+        return cls._raw([0] * 12)
+
+    @classmethod
+    def from_fq2(cls, value):
+        c = [0] * 12
+        c[0], c[6] = (value.c0 - 9 * value.c1) % Q, value.c1
+        return cls._raw(c)
+
+    @staticmethod
+    def _reduce(prod):
+        # w^12 = 18 w^6 - 82, folded from the top down
+        for i in range(len(prod) - 1, 11, -1):
+            top = prod[i]
+            if top:
+                prod[i - 6] += 18 * top
+                prod[i - 12] -= 82 * top
+        return [x % Q for x in prod[:12]]
+
+    def __add__(self, other):
+        return Fq12._raw([(x + y) % Q for x, y in zip(self.c, other.c)])
+
+    def __sub__(self, other):
+        return Fq12._raw([(x - y) % Q for x, y in zip(self.c, other.c)])
+
+    def __neg__(self):
+        return Fq12._raw([-x % Q for x in self.c])
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return Fq12._raw([x * other % Q for x in self.c])
+        b = other.c
+        prod = [0] * 23
+        for i, ai in enumerate(self.c):
+            if ai:
+                for j, bj in enumerate(b):
+                    prod[i + j] += ai * bj
+        return Fq12._raw(Fq12._reduce(prod))
+
+    __rmul__ = __mul__
+
+    def square(self):
+        a = self.c
+        prod = [0] * 23
+        for i, ai in enumerate(a):
+            if ai:
+                prod[2 * i] += ai * ai
+                ai2 = 2 * ai
+                for j in range(i + 1, 12):
+                    prod[i + j] += ai2 * a[j]
+        return Fq12._raw(Fq12._reduce(prod))
+
+    def __pow__(self, exponent):
+        result, base = Fq12.one(), self
+        while exponent:
+            if exponent & 1:
+                result = result * base
+            base = base.square()
+            exponent >>= 1
+        return result
+
+    def frobenius(self, times=1):
+        """x -> x^(Q^times). Fq-linear, so a 12 x 12 matrix product per application."""
+        table = Fq12._frobenius_table()
+        out = self.c
+        for _ in range(times % 12):
+            acc = [0] * 12
+            for ci, image in zip(out, table):
+                if ci:
+                    for k, v in enumerate(image):
+                        acc[k] += ci * v
+            out = [x % Q for x in acc]
+        return Fq12._raw(out)
+
+    @classmethod
+    def _frobenius_table(cls):
+        if cls._frobenius is None:
+            wq = Fq12._raw([0, 1] + [0] * 10) ** Q
+            table, power = [], Fq12.one()
+            for _ in range(12):
+                table.append(power.c)
+                power = power * wq
+            cls._frobenius = table
+        return cls._frobenius
+
+    def conjugate(self):
+        """x^(Q^6): w -> -w, i.e. negate the odd coefficients."""
+        return Fq12._raw([x if i % 2 == 0 else -x % Q for i, x in enumerate(self.c)])
+
+    def inverse(self):
+        # The norm f * f^Q * ... * f^(Q^11) lies in Fq, so
+        # 1 / f = (f^Q * ... * f^(Q^11)) / norm: no polynomial gcd needed
+        others, g = Fq12.one(), self
+        for _ in range(11):
+            g = g.frobenius()
+            others = others * g
+        norm = (self * others).c
+        if norm[0] == 0:
+            raise ZeroDivisionError("Fq12 inverse of zero")
+        return others * fq_inv(norm[0])
+
+    def __truediv__(self, other):
+        return self * other.inverse()
+
+    def is_one(self):
+        return self.c[0] == 1 and not any(self.c[1:])
+
+    def __eq__(self, other):
+        return isinstance(other, Fq12) and self.c == other.c
+
+    def __hash__(self):
+        return hash(tuple(self.c))
+
+    def __repr__(self):
+        return f"Fq12({self.c})"
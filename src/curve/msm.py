@@ -0,0 +1,120 @@
+"""
+Multi-scalar multiplication: sum(k_i * P_i) with Pippenger's bucket method.
+
+Scalars are cut into c-bit windows. For each window, every point is added
+into the bucket of its c-bit digit (one mixed addition per point), and the
+buckets are summed with the running-sum trick
+
+    sum_j j * bucket_j = bucket_top + (bucket_top + bucket_top-1) + ...
+
+which costs 2 * 2^c additions. The windows are then combined with c
+doublings each. Total: ~(254 / c) * (n + 2^(c+1)) additions instead of
+~n * 300 for n separate scalar multiplications; c is picked per input size
+by minimizing that count.
+
+Large inputs are split into chunks that run in a process pool (the GIL rules
+out threads for this pure-Python arithmetic); the partial sums are added at
+the end. The default pool is the one src.pool keeps for the life of the
+program (shared with the four-step NTT), and a process that is itself a
+pool worker (the proving service, the four-step NTT) runs serially instead
+of starting a nested pool. Group addition is exact, so the result is identical to the naive
+sum however the work is split: msm() always returns the point normalized to
+Z = 1, so even the representation is the same.
+"""
+import multiprocessing
+import os
+
+from src.curve.points import CURVE_ORDER
+from src.pool import shared_pool
+
+# Below this many points per worker, pickling costs more than it saves
+PARALLEL_MIN_CHUNK = 1024
+MAX_WINDOW = 16
+
+
+def window_size(n, scalar_bits=None):
+    """The window c minimizing ceil(bits / c) * (n + 2^(c+1)) additions."""
+    bits = scalar_bits or CURVE_ORDER.bit_length()
+    if n <= 1:
+        return 1
+    cost = lambda c: -(-bits // c) * (n + (2 << c))
+    return min(range(1, MAX_WINDOW + 1), key=cost)
+
+
+def _pippenger(point_type, affine_points, scalars, window):
+    """Serial bucket method over affine points and reduced int scalars (Jacobian result)."""
+    infinity = point_type.infinity
+    bits = max((k.bit_length() for k in scalars), default=0)
+    if bits == 0:
+        return infinity()
+    mask = (1 << window) - 1
+
+    result = infinity()
+    for shift in range(((bits - 1) // window) * window, -1, -window):
+        for _ in range(window):
+            result = result.double()
+        buckets = [None] * (mask + 1)
+        for (x, y), k in zip(affine_points, scalars):
+            digit = (k >> shift) & mask
+            if digit:
+                bucket = buckets[digit]
+                buckets[digit] = bucket._add_affine(x, y) if bucket is not None else point_type(x, y, point_type.ONE)
+
+        running, total = infinity(), infinity()
+        for digit in range(mask, 0, -1):
+            if buckets[digit] is not None:
+                running = running._add(buckets[digit])
+            total = total._add(running)
+        result = result._add(total)
+    return result
+
+
+def _msm_chunk(point_type, affine_points, scalars, window):
+    # Process-pool entry point: hand back affine coordinates (cheap to pickle)
+    return _pippenger(point_type, affine_points, scalars, window).to_affine()
+
+
+def msm(points, scalars, window=None, workers=None, executor=None):
+    """
+    sum(k_i * P_i) for Jacobian points (all of one type) and int / FieldElement scalars.
+
+    window:   bucket width in bits (default: chosen from len(points)).
+    workers:  processes to split the work over (default: all cores, or 1
+              inside a pool worker). Inputs too small to amortize the
+              pickling stay in this process.
+    executor: an existing concurrent.futures executor to use (pass its size
+              as workers); otherwise the shared pool from src.pool is used.
+    """
+    if len(points) != len(scalars):
+        raise ValueError(f"msm: {len(points)} points but {len(scalars)} scalars")
+    if not points:
+        raise ValueError("msm: no points (the point type is unknown)")
+    point_type = type(points[0])
+
+    # Drop trivial terms, then normalize once so every bucket add is a mixed add
+    pairs = [(p, k if isinstance(k, int) else k.value) for p, k in zip(points, scalars)]
+    pairs = [(p, k % CURVE_ORDER) for p, k in pairs if k % CURVE_ORDER and not p.is_infinity()]
+    if not pairs:
+        return point_type.infinity()
+    affine = point_type.normalize_batch([p for p, _ in pairs])
+    ks = [k for _, k in pairs]
+
+    if executor is None and multiprocessing.parent_process() is not None:
+        workers = 1  # Already a pool worker: never start a pool of our own
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers, len(ks) // PARALLEL_MIN_CHUNK)
+    if chunks <= 1:
+        result = _pippenger(point_type, affine, ks, window or window_size(len(ks)))
+    else:
+        size = -(-len(ks) // chunks)
+        window = window or window_size(size)
+        jobs = [(affine[i:i + size], ks[i:i + size]) for i in range(0, len(ks), size)]
+        pool = executor or shared_pool(workers)
+        partials = list(pool.map(_msm_chunk, [point_type] * len(jobs),
+                                 [pts for pts, _ in jobs], [k for _, k in jobs],
+                                 [window] * len(jobs)))
+        result = point_type.infinity()
+        for partial in partials:
+            result = result._add(point_type.from_affine(partial))
+
+    return point_type.from_affine(result.to_affine())
@@ -0,0 +1,365 @@
+"""
+BN254 G1 (y^2 = x^3 + 3 over Fq) and G2 (the sextic twist
+y^2 = x^3 + 3 / (9 + u) over Fq2) in Jacobian coordinates.
+
+A Jacobian point (X, Y, Z) stands for the affine point (X / Z^2, Y / Z^3),
+so additions and doublings need no field inversion; only converting back to
+affine does, and normalize_batch() shares one inversion across many points.
+Z == 0 is the point at infinity.
+
+Scalar multiplication uses width-5 wNAF: the odd multiples P, 3P, ... 15P
+are precomputed (and normalized, so every addition is a cheaper mixed
+Jacobian + affine one), and the signed digits need ~254 doublings and only
+~254 / 6 additions.
+"""
+from abc import ABC, abstractmethod
+
+from src.curve.fields import Q, Fq2, fq2_batch_inverse
+from src.finite_field import PrimeField
+
+# Order of G1 and G2: the scalar field, i.e. the PRIME used by the rest of the repo
+CURVE_ORDER = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+WNAF_WINDOW = 5
+
+
+def wnaf(k, width):
+    """Signed digits of k (least significant first), each 0 or odd in (-2^(w-1), 2^(w-1))."""
+    digits = []
+    full, half = 1 << width, 1 << (width - 1)
+    while k:
+        if k & 1:
+            d = k & (full - 1)
+            if d >= half:
+                d -= full
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+class JacobianPoint(ABC):
+    """
+    Shared algorithms; subclasses supply the coordinate field and the
+    double / add / mixed-add formulas (a = 0 curves). Those are abstract,
+    so a subclass that misses one fails when it is instantiated.
+
+    Scalars are reduced mod CURVE_ORDER: points are assumed to be in the
+    prime-order subgroup (always true on G1, checked by in_subgroup() on G2).
+    """
+    __slots__ = ('x', 'y', 'z')
+    ZERO = ONE = B = None  # Set by subclasses
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+    @classmethod
+    def infinity(cls):
+        return cls(cls.ONE, cls.ONE, cls.ZERO)
+
+    @classmethod
+    def from_affine(cls, point):
+        """(x, y) -> point; None is the point at infinity."""
+        if point is None:
+            return cls.infinity()
+        return cls(point[0], point[1], cls.ONE)
+
+    def is_infinity(self):
+        return self.z == self.ZERO
+
+    # --- Field helpers (slow path: equality, normalization, checks) ---
+
+    @staticmethod
+    @abstractmethod
+    def _mul(a, b):
+        """a * b in the coordinate field."""
+
+    @staticmethod
+    @abstractmethod
+    def _neg(a):
+        """-a in the coordinate field."""
+
+    @staticmethod
+    @abstractmethod
+    def _reduce(a):
+        """a in canonical form, so == compares values."""
+
+    @classmethod
+    @abstractmethod
+    def _batch_inverse(cls, values):
+        """Inverses of many coordinates (0 -> 0) with one field inversion."""
+
+    # --- Formulas ---
+
+    @abstractmethod
+    def double(self):
+        """2 * self."""
+
+    @abstractmethod
+    def _add(self, other):
+        """self + other, both Jacobian."""
+
+    @abstractmethod
+    def _add_affine(self, x2, y2):
+        """self + (x2, y2, 1): the mixed addition."""
+
+    def to_affine(self):
+        return self.normalize_batch([self])[0]
+
+    @classmethod
+    def normalize_batch(cls, points):
+        """Converts many points to affine (x, y) tuples with a single field inversion."""
+        mul = cls._mul
+        z_invs = cls._batch_inverse([p.z for p in points])
+        out = []
+        for p, z_inv in zip(points, z_invs):
+            if p.is_infinity():
+                out.append(None)
+                continue
+            z_inv2 = mul(z_inv, z_inv)
+            out.append((mul(p.x, z_inv2), mul(p.y, mul(z_inv2, z_inv))))
+        return out
+
+    def is_on_curve(self):
+        if self.is_infinity():
+            return True
+        x, y = self.to_affine()
+        mul = self._mul
+        return mul(y, y) == self._reduce(mul(mul(x, x), x) + self.B)
+
+    def in_subgroup(self):
+        return self._wnaf_mul(CURVE_ORDER).is_infinity()
+
+    def __add__(self, other):
+        return self._add(other)
+
+    def __neg__(self):
+        return type(self)(self.x, self._neg(self.y), self.z)
+
+    def __sub__(self, other):
+        return self._add(-other)
+
+    def __mul__(self, k):
+        if not isinstance(k, int):
+            k = k.value  # FieldElement scalars
+        return self._wnaf_mul(k % CURVE_ORDER)
+
+    __rmul__ = __mul__
+
+    def _wnaf_mul(self, k):
+        if k == 0 or self.is_infinity():
+            return self.infinity()
+        digits = wnaf(k, WNAF_WINDOW)
+
+        # Odd multiples P, 3P, 5P, ... in affine form (and their negatives)
+        double = self.double()
+        odd = [self]
+        for _ in range((1 << (WNAF_WINDOW - 2)) - 1):
+            odd.append(odd[-1]._add(double))
+        table = self.normalize_batch(odd)
+        neg = self._neg
+
+        acc = self.infinity()
+        for d in reversed(digits):
+            acc = acc.double()
+            if d > 0:
+                x, y = table[d >> 1]
+                acc = acc._add_affine(x, y)
+            elif d < 0:
+                x, y = table[(-d) >> 1]
+                acc = acc._add_affine(x, neg(y))
+        return acc
+
+    def __eq__(self, other):
+        if not isinstance(other, type(self)):
+            return NotImplemented
+        if self.is_infinity() or other.is_infinity():
+            return self.is_infinity() and other.is_infinity()
+        mul = self._mul
+        z1z1, z2z2 = mul(self.z, self.z), mul(other.z, other.z)
+        return (mul(self.x, z2z2) == mul(other.x, z1z1) and
+                mul(self.y, mul(z2z2, other.z)) == mul(other.y, mul(z1z1, self.z)))
+
+    def __hash__(self):
+        return hash(self.to_affine())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_affine()})"
+
+
+class G1Point(JacobianPoint):
+    """A point of G1: coordinates are ints mod Q."""
+    __slots__ = ()
+    ZERO, ONE, B = 0, 1, 3
+
+    @staticmethod
+    def _mul(a, b):
+        return a * b % Q
+
+    @staticmethod
+    def _neg(a):
+        return -a % Q
+
+    @staticmethod
+    def _reduce(a):
+        return a % Q
+
+    @classmethod
+    def _batch_inverse(cls, values):
+        return PrimeField(Q).batch_inverse(values, allow_zero=True)
+
+    def double(self):
+        # dbl-2009-l
+        X, Y, Z = self.x, self.y, self.z
+        if Z == 0 or Y == 0:
+            return G1Point(1, 1, 0)
+        A = X * X % Q
+        B = Y * Y % Q
+        C = B * B % Q
+        D = 2 * ((X + B) * (X + B) - A - C) % Q
+        E = 3 * A % Q
+        X3 = (E * E - 2 * D) % Q
+        Y3 = (E * (D - X3) - 8 * C) % Q
+        Z3 = 2 * Y * Z % Q
+        return G1Point(X3, Y3, Z3)
+
+    def _add(self, other):
+        # add-2007-bl
+        if self.z == 0:
+            return other
+        if other.z == 0:
+            return self
+        X1, Y1, Z1 = self.x, self.y, self.z
+        X2, Y2, Z2 = other.x, other.y, other.z
+        Z1Z1 = Z1 * Z1 % Q
+        Z2Z2 = Z2 * Z2 % Q
+        U1 = X1 * Z2Z2 % Q
+        U2 = X2 * Z1Z1 % Q
+        S1 = Y1 * Z2 * Z2Z2 % Q
+        S2 = Y2 * Z1 * Z1Z1 % Q
+        H = (U2 - U1) % Q
+        r = 2 * (S2 - S1) % Q
+        if H == 0:
+            return self.double() if r == 0 else G1Point(1, 1, 0)
+        I = 4 * H * H % Q
+        J = H * I % Q
+        V = U1 * I % Q
+        X3 = (r * r - J - 2 * V) % Q
+        Y3 = (r * (V - X3) - 2 * S1 * J) % Q
+        Z3 = ((Z1 + Z2) * (Z1 + Z2) - Z1Z1 - Z2Z2) * H % Q
+        return G1Point(X3, Y3, Z3)
+
+    def _add_affine(self, x2, y2):
+        # madd-2007-bl: other has Z = 1
+        X1, Y1, Z1 = self.x, self.y, self.z
+        if Z1 == 0:
+            return G1Point(x2, y2, 1)
+        Z1Z1 = Z1 * Z1 % Q
+        U2 = x2 * Z1Z1 % Q
+        S2 = y2 * Z1 * Z1Z1 % Q
+        H = (U2 - X1) % Q
+        r = 2 * (S2 - Y1) % Q
+        if H == 0:
+            return self.double() if r == 0 else G1Point(1, 1, 0)
+        HH = H * H % Q
+        I = 4 * HH % Q
+        J = H * I % Q
+        V = X1 * I % Q
+        X3 = (r * r - J - 2 * V) % Q
+        Y3 = (r * (V - X3) - 2 * Y1 * J) % Q
+        Z3 = ((Z1 + H) * (Z1 + H) - Z1Z1 - HH) % Q
+        return G1Point(X3, Y3, Z3)
+
+
+class G2Point(JacobianPoint):
+    """A point of G2 on the twist: coordinates are Fq2 elements."""
+    __slots__ = ()
+    ZERO, ONE = Fq2.zero(), Fq2.one()
+    B = Fq2(3) / Fq2(9, 1)
+
+    @staticmethod
+    def _mul(a, b):
+        return a * b
+
+    @staticmethod
+    def _neg(a):
+        return -a
+
+    @staticmethod
+    def _reduce(a):
+        return a
+
+    @classmethod
+    def _batch_inverse(cls, values):
+        return fq2_batch_inverse(values)
+
+    def double(self):
+        X, Y, Z = self.x, self.y, self.z
+        if Z.is_zero() or Y.is_zero():
+            return G2Point.infinity()
+        A = X.square()
+        B = Y.square()
+        C = B.square()
+        D = ((X + B).square() - A - C) * 2
+        E = A * 3
+        X3 = E.square() - D * 2
+        Y3 = E * (D - X3) - C * 8
+        Z3 = Y * Z * 2
+        return G2Point(X3, Y3, Z3)
+
+    def _add(self, other):
+        if self.z.is_zero():
+            return other
+        if other.z.is_zero():
+            return self
+        X1, Y1, Z1 = self.x, self.y, self.z
+        X2, Y2, Z2 = other.x, other.y, other.z
+        Z1Z1 = Z1.square()
+        Z2Z2 = Z2.square()
+        U1 = X1 * Z2Z2
+        U2 = X2 * Z1Z1
+        S1 = Y1 * Z2 * Z2Z2
+        S2 = Y2 * Z1 * Z1Z1
+        H = U2 - U1
+        r = (S2 - S1) * 2
+        if H.is_zero():
+            return self.double() if r.is_zero() else G2Point.infinity()
+        I = (H * 2).square()
+        J = H * I
+        V = U1 * I
+        X3 = r.square() - J - V * 2
+        Y3 = r * (V - X3) - S1 * J * 2
+        Z3 = ((Z1 + Z2).square() - Z1Z1 - Z2Z2) * H
+        return G2Point(X3, Y3, Z3)
+
+    def _add_affine(self, x2, y2):
+        X1, Y1, Z1 = self.x, self.y, self.z
+        if Z1.is_zero():
+            return G2Point(x2, y2, Fq2.one())
+        Z1Z1 = Z1.square()
+        U2 = x2 * Z1Z1
+        S2 = y2 * Z1 * Z1Z1
+        H = U2 - X1
+        r = (S2 - Y1) * 2
+        if H.is_zero():
+            return self.double() if r.is_zero() else G2Point.infinity()
+        HH = H.square()
+        I = HH * 4
+        J = H * I
+        V = X1 * I
+        X3 = r.square() - J - V * 2
+        Y3 = r * (V - X3) - Y1 * J * 2
+        Z3 = (Z1 + H).square() - Z1Z1 - HH
+        return G2Point(X3, Y3, Z3)
+
+
+G1_GENERATOR = G1Point(1, 2, 1)
+G2_GENERATOR = G2Point(
+    Fq2(10857046999023057135944570762232829481370756359578518086990519993285655852781,
+        11559732032986387107991004021392285783925812861821192530917403151452391805634),
+    Fq2(8495653923123431417604973247489272438418190587263600148770280649306958101930,
+        4082367875863433681332203403145435568316851327593401208105741076214120093531),
+    Fq2.one(),
+)
@@ -0,0 +1,293 @@
+from collections import OrderedDict
+
+from src.finite_field import FieldElement, PrimeField
+from src.polynomial import Polynomial
+from src import ntt
+
+# Domains kept by EvaluationDomain.get(): each holds its points, and possibly a
+# subproduct tree and barycentric weights, so a long-running process that sees
+# many point sets must not keep them all
+CACHE_SIZE = 32
+
+
+def _to_int(x):
+    return x.value if isinstance(x, FieldElement) else x
+
+
+class EvaluationDomain:
+    """
+    A fixed set of distinct x-coordinates that polynomials are interpolated
+    over (and evaluated on).
+
+    - If the points are the n-th roots of unity (n a power of two), or a coset
+      g * w^i of them, interpolation and evaluation are a single (coset)
+      NTT: O(n log n).
+    - For arbitrary points (e.g. x = 1, 2, 3 for gates 1, 2, 3) we build a
+      subproduct tree once and reuse it: O(n log^2 n) per interpolation.
+
+    Every column of a circuit is interpolated over the same points, so domains
+    are cached: use EvaluationDomain.get(...) rather than the constructor.
+    The cache keeps the CACHE_SIZE most recently used domains.
+    """
+    _cache = OrderedDict()  # (prime, points) -> domain, least recently used first
+
+    def __init__(self, points, prime):
+        self.prime = prime
+        self.points = [_to_int(x) % prime for x in points]
+        self.size = len(self.points)
+        if self.size == 0:
+            raise ValueError("Evaluation domain needs at least one point")
+
+        self.shift = self.points[0]
+        self.omega = self._detect_roots_of_unity()
+        self._tree = None
+        self._weights = None
+        self._index = None  # point -> position, built on first evaluate_interpolant()
+
+    @classmethod
+    def get(cls, points, prime):
+        """Returns the (cached) domain over the given x-coordinates."""
+        key = (prime, tuple(_to_int(x) % prime for x in points))
+        domain = cls._cache.get(key)
+        if domain is None:
+            domain = cls._cache[key] = cls(key[1], prime)
+            if len(cls._cache) > CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        else:
+            cls._cache.move_to_end(key)
+        return domain
+
+    @classmethod
+    def roots_of_unity(cls, size, prime):
+        """Returns the (cached) domain {1, w, w^2, ..., w^(size-1)}."""
+        w = ntt.root_of_unity(size, prime)
+        points = [1] * size
+        for i in range(1, size):
+            points[i] = points[i - 1] * w % prime
+        return cls.get(points, prime)
+
+    @classmethod
+    def coset(cls, size, prime, shift=None):
+        """Returns the (cached) domain {g, g*w, ..., g*w^(size-1)}, g = coset_generator by default."""
+        shift = (shift or ntt.coset_generator(prime)) % prime
+        w = ntt.root_of_unity(size, prime)
+        points = [shift] * size
+        for i in range(1, size):
+            points[i] = points[i - 1] * w % prime
+        return cls.get(points, prime)
+
+    @property
+    def is_radix2(self):
+        return self.omega is not None
+
+    def _detect_roots_of_unity(self):
+        # Also accepts a coset shift * w^i of the roots (shift = points[0])
+        n, p, shift = self.size, self.prime, self.shift
+        if n == 1 or shift == 0 or not ntt.supports_size(n, p):
+            return None
+        w = ntt.root_of_unity(n, p)
+        if self.points[1] != shift * w % p:
+            return None
+        for i in range(2, n):
+            if self.points[i] != self.points[i - 1] * w % p:
+                return None
+        return w
+
+    # --- Subproduct tree (arbitrary points) ---
+
+    def _subproduct_tree(self):
+        """
+        levels[0] holds the leaves (x - x_i); each node above is the product of
+        its two children (an odd node out is carried up unchanged).
+        The root is M(x) = prod(x - x_i).
+        """
+        if self._tree is None:
+            p = self.prime
+            level = [[(-x) % p, 1] for x in self.points]
+            levels = [level]
+            while len(level) > 1:
+                nxt = []
+                for i in range(0, len(level) - 1, 2):
+                    nxt.append(ntt.multiply(level[i], level[i + 1], p))
+                if len(level) % 2:
+                    nxt.append(level[-1])
+                levels.append(nxt)
+                level = nxt
+            self._tree = levels
+        return self._tree
+
+    def _remainder_tree(self, coeffs):
+        """Evaluates a coefficient list at every point by reducing down the tree."""
+        p = self.prime
+        levels = self._subproduct_tree()
+        _, rem = ntt.divmod_poly(coeffs, levels[-1][0], p)
+        rems = [rem]
+        # Node i on a level has parent i // 2 on the level above
+        for level in reversed(levels[1:-1]):
+            rems = [ntt.divmod_poly(rems[i // 2], node, p)[1] for i, node in enumerate(level)]
+
+        values = []
+        for i, x in enumerate(self.points):
+            # What's left above each leaf has degree <= 1: finish with Horner
+            r = rems[i // 2] if len(levels) > 1 else rems[0]
+            acc = 0
+            for c in reversed(r):
+                acc = (acc * x + c) % p
+            values.append(acc)
+        return values
+
+    def _barycentric_weights(self):
+        """w_i = 1 / M'(x_i) = 1 / prod_{j != i} (x_i - x_j)."""
+        if self._weights is None:
+            p = self.prime
+            root = self._subproduct_tree()[-1][0]
+            derivative = [i * c % p for i, c in enumerate(root)][1:]
+            denominators = self._remainder_tree(derivative)
+            try:
+                self._weights = PrimeField(p).batch_inverse(denominators)
+            except ZeroDivisionError:
+                raise ValueError("Evaluation domain points must be distinct") from None
+        return self._weights
+
+    # --- Public API ---
+
+    def interpolate(self, y_points):
+        """Returns the unique Polynomial of degree < size through (x_i, y_i)."""
+        p = self.prime
+        ys = [_to_int(y) % p for y in y_points]
+        if len(ys) != self.size:
+            raise ValueError(f"Expected {self.size} values, got {len(ys)}")
+
+        if self.is_radix2:
+            coeffs = ntt.intt(ys, p) if self.shift == 1 else ntt.coset_intt(ys, p, self.shift)
+        else:
+            # Lagrange in "combine up the tree" form:
+            # P = sum(y_i * w_i * M(x) / (x - x_i))
+            weights = self._barycentric_weights()
+            combos = [[y * w % p] for y, w in zip(ys, weights)]
+            for level in self._subproduct_tree()[:-1]:
+                nxt = []
+                for i in range(0, len(combos) - 1, 2):
+                    left = ntt.multiply(combos[i], level[i + 1], p)
+                    right = ntt.multiply(combos[i + 1], level[i], p)
+                    if len(left) < len(right):
+                        left, right = right, left
+                    nxt.append([(c + (right[k] if k < len(right) else 0)) % p for k, c in enumerate(left)])
+                if len(combos) % 2:
+                    nxt.append(combos[-1])
+                combos = nxt
+            coeffs = combos[0]
+
+        return Polynomial([FieldElement(c, p) for c in ntt.trim(coeffs)] or [FieldElement(0, p)])
+
+    def vanishing_polynomial(self):
+        """Z(x) = prod(x - x_i), which is just x^n - g^n on a (coset of a) roots-of-unity domain."""
+        p = self.prime
+        if self.is_radix2:
+            coeffs = [-pow(self.shift, self.size, p) % p] + [0] * (self.size - 1) + [1]
+        else:
+            coeffs = self._subproduct_tree()[-1][0]
+        return Polynomial([FieldElement(c, p) for c in coeffs])
+
+    def divide_by_vanishing(self, poly):
+        """
+        Returns H = poly / Z for a poly that vanishes on the whole domain
+        (raises ValueError if it doesn't).
+
+        On a roots-of-unity domain Z = x^n - 1, so instead of long division we
+        evaluate poly on a coset g*D' (where Z is never zero), divide pointwise
+        and interpolate back. Z(g*w^i) only takes |D'|/n distinct values, so
+        the denominators cost a single batch inversion.
+        """
+        p = self.prime
+        if not self.is_radix2 or self.shift != 1:
+            quotient, remainder = poly / self.vanishing_polynomial()
+            if not remainder.is_zero():
+                raise ValueError("Polynomial does not vanish on the domain")
+            return quotient
+
+        n = self.size
+        coeffs = [c.value for c in poly.coeffs]
+        if poly.is_zero():
+            return Polynomial._from_ints([], p)
+        if len(coeffs) <= n:
+            raise ValueError("Polynomial does not vanish on the domain")
+
+        m = n
+        while m < len(coeffs):
+            m *= 2
+        g = ntt.coset_generator(p)
+        evals = ntt.coset_ntt(coeffs + [0] * (m - len(coeffs)), p, g)
+
+        # Z(g * w_m^i) = g^n * (w_m^n)^i - 1 repeats with period m / n
+        period = m // n
+        w_period = ntt.root_of_unity(period, p)
+        g_n = pow(g, n, p)
+        z_vals = [(g_n * pow(w_period, i, p) - 1) % p for i in range(period)]
+        z_inv = PrimeField(p).batch_inverse(z_vals)
+
+        h = ntt.coset_intt([e * z_inv[i % period] % p for i, e in enumerate(evals)], p, g)
+        h = ntt.trim(h[:len(coeffs) - n])
+
+        # Cheap O(deg) check that H * (x^n - 1) really reproduces poly
+        for i, c in enumerate(coeffs):
+            expected = (h[i - n] if 0 <= i - n < len(h) else 0) - (h[i] if i < len(h) else 0)
+            if (expected - c) % p:
+                raise ValueError("Polynomial does not vanish on the domain")
+        return Polynomial._from_ints(h, p)
+
+    def evaluate(self, poly):
+        """Evaluates a Polynomial at every point of the domain (in order)."""
+        p = self.prime
+        coeffs = [c.value for c in poly.coeffs]
+
+        if self.is_radix2:
+            n = self.size
+            if self.shift != 1:
+                # P(g * w^i) is the NTT of the coefficients c_k * g^k
+                power = 1
+                for i in range(len(coeffs)):
+                    coeffs[i] = coeffs[i] * power % p
+                    power = power * self.shift % p
+            # Reduce mod x^n - 1 first (x^n = 1 on this domain)
+            folded = [0] * n
+            for i, c in enumerate(coeffs):
+                folded[i % n] += c
+            values = ntt.ntt(folded, p)
+        else:
+            values = self._remainder_tree(coeffs)
+
+        return [FieldElement(v, p) for v in values]
+
+    def evaluate_interpolant(self, y_points, x):
+        """
+        The value at x of the polynomial through (x_i, y_i), without
+        interpolating it: the barycentric form
+
+            P(x) = Z(x) * sum(w_i * y_i / (x - x_i)),   w_i = 1 / Z'(x_i)
+
+        is O(n) with one batch inversion. On a (coset) roots-of-unity domain
+        Z'(x_i) = n * g^n / x_i, so the weights need no subproduct tree.
+        """
+        p = self.prime
+        x = _to_int(x) % p
+        ys = [_to_int(y) % p for y in y_points]
+        if len(ys) != self.size:
+            raise ValueError(f"Expected {self.size} values, got {len(ys)}")
+        if self._index is None:
+            self._index = {xi: i for i, xi in enumerate(self.points)}
+        if x in self._index:
+            return FieldElement(ys[self._index[x]], p)
+
+        inverses = PrimeField(p).batch_inverse([x - xi for xi in self.points])
+        if self.is_radix2:
+            g_n = pow(self.shift, self.size, p)
+            z = (pow(x, self.size, p) - g_n) % p
+            scale = pow(self.size * g_n, -1, p)
+            acc = sum(y * xi * inv for y, xi, inv in zip(ys, self.points, inverses)) % p * scale
+        else:
+            z = 0
+            for c in reversed(self._subproduct_tree()[-1][0]):
+                z = (z * x + c) % p
+            acc = sum(y * w * inv for y, w, inv in zip(ys, self._barycentric_weights(), inverses))
+        return FieldElement(z * acc, p)
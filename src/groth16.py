@@ -0,0 +1,409 @@
+"""
+Groth16 over BN254: setup, prove, verify.
+
+Setup samples the toxic waste (tau, alpha, beta, gamma, delta), evaluates
+every QAP column at tau and multiplies the generators by the results:
+
+    u_j(tau), v_j(tau), w_j(tau)   from the Lagrange basis of the NTT domain,
+                                   L_i(tau) = Z(tau) / n * w^i / (tau - w^i),
+                                   so one pass over the sparse A, B, C rows
+                                   plus the public binding rows x_j * 0 = 0
+    [tau^i * Z(tau) / delta]_1     for the coefficients of H(x)
+
+Prove is three MSMs over the witness plus one over H(x) (from QAP), with
+fresh blinding r, s. Verify checks
+
+    e(A, B) = e(alpha, beta) * e(sum_j x_j IC_j, gamma) * e(C, delta)
+
+with one shared final exponentiation and e(alpha, beta) precomputed.
+
+KeyCache stores setup output on disk under the sha256 of the circuit's
+.r1cs encoding, so a process that proves the same circuit again skips setup
+entirely; the large proving-key queries are only decoded from the mmap'd
+file when a proof first needs them.
+"""
+import logging
+import mmap
+import os
+import random
+import shutil
+import struct
+import weakref
+
+from src.curve import (CURVE_ORDER, G1_GENERATOR, G2_GENERATOR, G1Point, G2Point, Fq2,
+                       FixedBaseTable, msm)
+from src.curve.pairing import pairing, pairing_product
+from src.finite_field import PrimeField
+from src.instrument import stage
+from src.qap import QAP
+from src.serialization import r1cs_digest
+
+logger = logging.getLogger(__name__)
+
+_FQ_BYTES = 32
+_G1_BYTES = 2 * _FQ_BYTES
+_G2_BYTES = 4 * _FQ_BYTES
+_U32 = struct.Struct("<I")
+
+PK_MAGIC = b"g16p"
+VK_MAGIC = b"g16v"
+FORMAT_VERSION = 2  # 2: keys include the public-input binding rows
+
+
+class Proof:
+    __slots__ = ('a', 'b', 'c')
+
+    def __init__(self, a, b, c):
+        self.a, self.b, self.c = a, b, c  # G1, G2, G1
+
+    def __eq__(self, other):
+        return isinstance(other, Proof) and (self.a, self.b, self.c) == (other.a, other.b, other.c)
+
+    def __repr__(self):
+        return f"Proof(a={self.a}, b={self.b}, c={self.c})"
+
+    def to_bytes(self):
+        """A || B || C in the key files' point encoding (256 bytes)."""
+        return _g1_bytes(self.a) + _g2_bytes(self.b) + _g1_bytes(self.c)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) != 2 * _G1_BYTES + _G2_BYTES:
+            raise ValueError(f"A proof is {2 * _G1_BYTES + _G2_BYTES} bytes, got {len(data)}")
+        return cls(_read_g1(data, 0), _read_g2(data, _G1_BYTES), _read_g1(data, _G1_BYTES + _G2_BYTES))
+
+
+class VerifyingKey:
+    def __init__(self, alpha_g1, beta_g2, gamma_g2, delta_g2, ic):
+        self.alpha_g1 = alpha_g1
+        self.beta_g2 = beta_g2
+        self.gamma_g2 = gamma_g2
+        self.delta_g2 = delta_g2
+        self.ic = ic  # [IC_j]_1 for 'one' and every public variable
+        self._alpha_beta = None
+
+    @property
+    def num_public(self):
+        return len(self.ic) - 1
+
+    @property
+    def alpha_beta(self):
+        """e(alpha, beta): the same for every proof, so computed once."""
+        if self._alpha_beta is None:
+            self._alpha_beta = pairing(self.beta_g2, self.alpha_g1)
+        return self._alpha_beta
+
+
+class ProvingKey:
+    """
+    The prover's share of the setup output. The per-variable queries can be
+    large, so a key loaded from disk decodes each one on first access.
+    """
+    QUERIES = ('a_query', 'b_g1_query', 'b_g2_query', 'l_query', 'h_query')
+
+    def __init__(self, alpha_g1, beta_g1, beta_g2, delta_g1, delta_g2, num_public, **queries):
+        self.alpha_g1 = alpha_g1
+        self.beta_g1 = beta_g1
+        self.beta_g2 = beta_g2
+        self.delta_g1 = delta_g1
+        self.delta_g2 = delta_g2
+        self.num_public = num_public
+        self._queries = dict(queries)  # name -> list of points, or a zero-arg loader
+        self.digest = None
+
+    def _query(self, name):
+        query = self._queries[name]
+        if callable(query):
+            query = self._queries[name] = query()
+        return query
+
+    a_query = property(lambda self: self._query('a_query'))        # [u_j(tau)]_1
+    b_g1_query = property(lambda self: self._query('b_g1_query'))  # [v_j(tau)]_1
+    b_g2_query = property(lambda self: self._query('b_g2_query'))  # [v_j(tau)]_2
+    l_query = property(lambda self: self._query('l_query'))        # private j: [(b u_j + a v_j + w_j) / delta]_1
+    h_query = property(lambda self: self._query('h_query'))        # [tau^i Z(tau) / delta]_1
+
+
+# --- Setup ---
+
+def _column_evaluations(r1cs, lagrange, p):
+    """(u_j(tau), v_j(tau), w_j(tau)) for every variable j: one pass over the nonzeros."""
+    columns = []
+    for matrix in (r1cs.A, r1cs.B, r1cs.C):
+        acc = [0] * r1cs.num_vars
+        indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+        for i in range(matrix.num_rows):
+            l_i = lagrange[i]
+            for k in range(indptr[i], indptr[i + 1]):
+                acc[indices[k]] += data[k] * l_i
+        columns.append(acc)
+    # Binding row m + j is x_j * 0 = 0: it only adds L_(m+j) to u_j
+    m, u = len(r1cs.A), columns[0]
+    for j in range(QAP.binding_rows(r1cs)):
+        u[j] += lagrange[m + j]
+    return [[x % p for x in acc] for acc in columns]
+
+
+def _nonzero(rng, p):
+    return rng.randrange(1, p)
+
+
+def _points(point_type, affine):
+    return [point_type.from_affine(a) for a in affine]
+
+
+def setup(r1cs, rng=None):
+    """
+    Runs the (trusted) setup for an R1CS over the BN254 scalar field and
+    returns (ProvingKey, VerifyingKey). The toxic waste never leaves this call.
+    """
+    rng = rng or random.SystemRandom()
+    p = CURVE_ORDER
+    pre = QAP.precompute(r1cs, p, bind_public=True)
+    n, field = pre.size, PrimeField(p)
+    num_public = r1cs.num_public
+
+    with stage("groth16.setup", constraints=len(r1cs.A), variables=r1cs.num_vars, domain_size=n):
+        tau = _nonzero(rng, p)
+        while pre.vanishing_at(tau) == 0:  # tau must avoid the domain
+            tau = _nonzero(rng, p)
+        alpha, beta, gamma, delta = (_nonzero(rng, p) for _ in range(4))
+        gamma_inv, delta_inv = field.batch_inverse([gamma, delta])
+
+        # Lagrange basis of the NTT domain at tau
+        z_tau = pre.vanishing_at(tau)
+        roots = [1] * n
+        for i in range(1, n):
+            roots[i] = roots[i - 1] * pre.omega % p
+        inv = field.batch_inverse([tau - w for w in roots])
+        scale = z_tau * pow(n, p - 2, p) % p
+        lagrange = [scale * w % p * d % p for w, d in zip(roots, inv)]
+        u, v, w = _column_evaluations(r1cs, lagrange, p)
+
+        k = [(beta * u_j + alpha * v_j + w_j) % p for u_j, v_j, w_j in zip(u, v, w)]
+        powers = [z_tau * delta_inv % p]
+        for _ in range(n - 2):
+            powers.append(powers[-1] * tau % p)
+
+        g1_scalars = (u, v, [x * delta_inv % p for x in k[num_public + 1:]], powers)
+        g1 = FixedBaseTable.for_count(G1_GENERATOR, sum(map(len, g1_scalars)) + num_public + 4)
+        g2 = FixedBaseTable.for_count(G2_GENERATOR, len(v) + 3)
+        a_query, b_g1, l_query, h_query = (_points(G1Point, g1.batch_mul(s, affine=True)) for s in g1_scalars)
+        b_g2 = _points(G2Point, g2.batch_mul(v, affine=True))
+        ic = _points(G1Point, g1.batch_mul([x * gamma_inv % p for x in k[:num_public + 1]], affine=True))
+
+        fixed = lambda table, x: table.point_type.from_affine(table.mul(x).to_affine())
+        pk = ProvingKey(fixed(g1, alpha), fixed(g1, beta), fixed(g2, beta), fixed(g1, delta),
+                        fixed(g2, delta), num_public, a_query=a_query, b_g1_query=b_g1,
+                        b_g2_query=b_g2, l_query=l_query, h_query=h_query)
+        vk = VerifyingKey(pk.alpha_g1, pk.beta_g2, fixed(g2, gamma), pk.delta_g2, ic)
+    return pk, vk
+
+
+# --- Prove / verify ---
+
+def _msm(point_type, points, scalars, **pool):
+    return msm(points, scalars, **pool) if points else point_type.infinity()
+
+
+def prove(pk, r1cs, witness, rng=None, workers=None, executor=None):
+    """
+    A Groth16 proof that witness satisfies r1cs: a FieldVector / FieldElement
+    witness over the BN254 scalar field, or plain ints (taken mod CURVE_ORDER).
+    workers / executor are handed to every msm() call.
+    """
+    rng = rng or random.SystemRandom()
+    p = CURVE_ORDER
+    values, prime = r1cs._witness_values(witness, None)
+    if prime is not None and prime != p:
+        raise ValueError("Groth16 over BN254 needs a witness in the BN254 scalar field")
+
+    with stage("groth16.prove", variables=r1cs.num_vars):
+        h = QAP(r1cs, values, p, bind_public=True)._h
+        h = h[:len(pk.h_query)]  # deg H <= n - 2
+        r, s = rng.randrange(p), rng.randrange(p)
+        private = values[pk.num_public + 1:]
+        pool = {"workers": workers, "executor": executor}
+
+        a = pk.alpha_g1 + _msm(G1Point, pk.a_query, values, **pool) + pk.delta_g1 * r
+        b = pk.beta_g2 + _msm(G2Point, pk.b_g2_query, values, **pool) + pk.delta_g2 * s
+        b1 = pk.beta_g1 + _msm(G1Point, pk.b_g1_query, values, **pool) + pk.delta_g1 * s
+        c = (_msm(G1Point, pk.l_query, private, **pool) + _msm(G1Point, pk.h_query, h, **pool)
+             + a * s + b1 * r - pk.delta_g1 * (r * s % p))
+    return Proof(a, b, c)
+
+
+def verify(vk, public_inputs, proof):
+    """
+    public_inputs are the witness entries 1 .. num_public (outputs, then
+    public inputs), as ints or FieldElements.
+    """
+    public = [x if isinstance(x, int) else x.value for x in public_inputs]
+    if len(public) != vk.num_public:
+        raise ValueError(f"Expected {vk.num_public} public inputs, got {len(public)}")
+    with stage("groth16.verify", public=len(public)):
+        acc = vk.ic[0] + _msm(G1Point, vk.ic[1:], public)
+        # e(-A, B) e(acc, gamma) e(C, delta) == 1 / e(alpha, beta)
+        product = pairing_product([(proof.b, -proof.a), (vk.gamma_g2, acc), (vk.delta_g2, proof.c)])
+        return (product * vk.alpha_beta).is_one()
+
+
+# --- On-disk cache ---
+
+def _g1_bytes(point):
+    affine = point.to_affine()
+    if affine is None:
+        return bytes(_G1_BYTES)  # (0, 0) is not on the curve, so it can mark infinity
+    return b"".join(c.to_bytes(_FQ_BYTES, "little") for c in affine)
+
+
+def _g2_bytes(point):
+    affine = point.to_affine()
+    if affine is None:
+        return bytes(_G2_BYTES)
+    return b"".join(c.to_bytes(_FQ_BYTES, "little") for f in affine for c in (f.c0, f.c1))
+
+
+def _read_g1(buf, offset):
+    x = int.from_bytes(buf[offset:offset + 32], "little")
+    y = int.from_bytes(buf[offset + 32:offset + 64], "little")
+    return G1Point.from_affine(None if x == y == 0 else (x, y))
+
+
+def _read_g2(buf, offset):
+    c = [int.from_bytes(buf[offset + 32 * i:offset + 32 * (i + 1)], "little") for i in range(4)]
+    if not any(c):
+        return G2Point.infinity()
+    return G2Point.from_affine((Fq2(c[0], c[1]), Fq2(c[2], c[3])))
+
+
+def _write_points(f, points, encode):
+    f.write(_U32.pack(len(points)))
+    f.write(b"".join(encode(pt) for pt in points))
+
+
+class _PointReader:
+    """Walks a key file: fixed points are decoded now, queries only recorded for later."""
+    def __init__(self, buf, magic, path):
+        if buf[:4] != magic or _U32.unpack_from(buf, 4)[0] != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a version {FORMAT_VERSION} {magic.decode()} file")
+        self.buf, self.offset = buf, 8
+
+    def u32(self):
+        value = _U32.unpack_from(self.buf, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def g1(self):
+        point = _read_g1(self.buf, self.offset)
+        self.offset += _G1_BYTES
+        return point
+
+    def g2(self):
+        point = _read_g2(self.buf, self.offset)
+        self.offset += _G2_BYTES
+        return point
+
+    def points(self, size):
+        """Skips over a query, returning (count, start offset)."""
+        count, start = self.u32(), self.offset
+        self.offset += count * size
+        return count, start
+
+    def read_all(self, read, size):
+        count, start = self.points(size)
+        return [read(self.buf, start + i * size) for i in range(count)]
+
+
+def save_keys(directory, pk, vk):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "pk.bin"), "wb") as f:
+        f.write(PK_MAGIC + _U32.pack(FORMAT_VERSION) + _U32.pack(pk.num_public))
+        for point in (pk.alpha_g1, pk.beta_g1, pk.delta_g1):
+            f.write(_g1_bytes(point))
+        for point in (pk.beta_g2, pk.delta_g2):
+            f.write(_g2_bytes(point))
+        for name in ProvingKey.QUERIES:
+            _write_points(f, getattr(pk, name), _g2_bytes if name == 'b_g2_query' else _g1_bytes)
+    with open(os.path.join(directory, "vk.bin"), "wb") as f:
+        f.write(VK_MAGIC + _U32.pack(FORMAT_VERSION))
+        f.write(_g1_bytes(vk.alpha_g1))
+        for point in (vk.beta_g2, vk.gamma_g2, vk.delta_g2):
+            f.write(_g2_bytes(point))
+        _write_points(f, vk.ic, _g1_bytes)
+
+
+def load_verifying_key(directory):
+    path = os.path.join(directory, "vk.bin")
+    with open(path, "rb") as f:
+        reader = _PointReader(f.read(), VK_MAGIC, path)
+    alpha = reader.g1()
+    beta, gamma, delta = reader.g2(), reader.g2(), reader.g2()
+    return VerifyingKey(alpha, beta, gamma, delta, reader.read_all(_read_g1, _G1_BYTES))
+
+
+def load_proving_key(directory):
+    """Reads the fixed points now; each query is decoded from the mmap'd file on first use."""
+    path = os.path.join(directory, "pk.bin")
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    reader = _PointReader(buf, PK_MAGIC, path)
+    num_public = reader.u32()
+    alpha, beta1, delta1 = reader.g1(), reader.g1(), reader.g1()
+    beta2, delta2 = reader.g2(), reader.g2()
+
+    queries = {}
+    for name in ProvingKey.QUERIES:
+        read, size = (_read_g2, _G2_BYTES) if name == 'b_g2_query' else (_read_g1, _G1_BYTES)
+        count, start = reader.points(size)
+        queries[name] = (lambda read=read, size=size, count=count, start=start:
+                         [read(buf, start + i * size) for i in range(count)])
+    return ProvingKey(alpha, beta1, beta2, delta1, delta2, num_public, **queries)
+
+
+class KeyCache:
+    """
+    Setup output on disk, content-addressed: <root>/<sha256 of the .r1cs encoding>-v<format>/,
+    so keys written by an older format are never picked up.
+    Keys are also kept in memory, so repeated proofs in one process pay for
+    neither setup nor loading, and the digest is computed once per R1CS.
+    """
+    def __init__(self, root):
+        self.root = root
+        self._keys = {}  # digest -> (pk, vk)
+        self._digests = weakref.WeakKeyDictionary()  # r1cs -> {(constraints, vars): digest}
+
+    def digest(self, r1cs):
+        per_shape = self._digests.setdefault(r1cs, {})
+        shape = (len(r1cs.A), r1cs.num_vars)  # R1CS.sync() can grow the circuit
+        if shape not in per_shape:
+            per_shape[shape] = r1cs_digest(r1cs, CURVE_ORDER)
+        return per_shape[shape]
+
+    def path(self, digest):
+        return os.path.join(self.root, f"{digest}-v{FORMAT_VERSION}")
+
+    def get(self, r1cs, rng=None):
+        """(pk, vk) for r1cs: from memory, then disk, running setup only on a miss."""
+        digest = self.digest(r1cs)
+        if digest in self._keys:
+            return self._keys[digest]
+
+        directory = self.path(digest)
+        if os.path.exists(os.path.join(directory, "vk.bin")):
+            logger.info("Loading Groth16 keys for %s", digest[:16])
+            keys = (load_proving_key(directory), load_verifying_key(directory))
+        else:
+            logger.info("Running Groth16 setup for %s", digest[:16])
+            keys = setup(r1cs, rng)
+            # Write to a private directory and rename it into place, so readers
+            # never see a half-written key and racing writers don't collide
+            tmp = f"{directory}.tmp-{os.getpid()}"
+            save_keys(tmp, *keys)
+            try:
+                os.rename(tmp, directory)
+            except OSError:  # Someone else finished first: theirs is just as good
+                shutil.rmtree(tmp, ignore_errors=True)
+        keys[0].digest = digest
+        self._keys[digest] = keys
+        return keys
@@ -0,0 +1,140 @@
+"""
+Stage-level instrumentation for the circuit -> R1CS -> witness -> verification
+pipeline.
+
+Two separate knobs:
+
+1. Logging. Every module logs through a child of the "src" logger, at DEBUG
+   (per-variable detail) or INFO (per-stage progress). Nothing is printed
+   unless the application configures logging, so the hot paths are silent by
+   default. set_log_level() is a shortcut for the package logger.
+
+2. Hooks. Wrap work in `with stage("name") as rec:` and, when at least one
+   sink is registered, a record is emitted on exit with the wall time, peak
+   memory and any counters the stage filled in (gates, constraints,
+   field_ops, ...). A sink is any callable taking the record dict;
+   JsonLinesSink writes one JSON object per line.
+
+    from src import instrument
+    instrument.add_sink(instrument.JsonLinesSink("profile.jsonl"))
+    instrument.configure(track_memory=True)
+"""
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+PACKAGE_LOGGER = "src"
+
+_sinks = []
+_stack = []  # Open stages, innermost last (used for nesting and peak memory)
+_settings = {"track_memory": False}
+
+
+def set_log_level(level):
+    """Sets the level for every library logger (e.g. logging.WARNING to go quiet)."""
+    logging.getLogger(PACKAGE_LOGGER).setLevel(level)
+
+
+def configure(track_memory=None):
+    """
+    track_memory=True measures each stage's peak Python allocation with
+    tracemalloc. It's accurate but slows allocation-heavy code noticeably,
+    so it is off by default (max RSS is always reported where available).
+    """
+    if track_memory is not None:
+        _settings["track_memory"] = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def add_sink(sink):
+    """Registers a callable that receives every finished stage record."""
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    _sinks.remove(sink)
+
+
+def enabled():
+    return bool(_sinks)
+
+
+class JsonLinesSink:
+    """Appends each record as one JSON line to a path or an open text file."""
+    def __init__(self, target):
+        self.target = target
+
+    def __call__(self, record):
+        line = json.dumps(record, sort_keys=True, default=str) + "\n"
+        if isinstance(self.target, str):
+            with open(self.target, "a") as f:
+                f.write(line)
+        else:
+            self.target.write(line)
+            self.target.flush()
+
+
+class MemorySink:
+    """Keeps records in a list. Handy for tests and notebooks."""
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Times a pipeline stage. The yielded dict can be filled with counters
+    while the stage runs; it is sent to every sink when the stage exits.
+    With no sinks registered this is close to free.
+    """
+    record = dict(fields)
+    if not _sinks:
+        yield record
+        return
+
+    tracking = _settings["track_memory"] and tracemalloc.is_tracing()
+    if tracking:
+        if _stack:
+            _stack[-1]["_peak"] = max(_stack[-1]["_peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    frame = {"_peak": 0, "name": name}
+    _stack.append(frame)
+
+    start_wall = time.time()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        elapsed = time.perf_counter() - start
+        _stack.pop()
+
+        record["stage"] = name
+        record["start_time"] = start_wall
+        record["wall_time_s"] = elapsed
+        if _stack:
+            record["parent"] = _stack[-1].get("name")
+        if tracking:
+            peak = max(frame["_peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            if _stack:
+                _stack[-1]["_peak"] = max(_stack[-1]["_peak"], peak)
+            record["peak_memory_bytes"] = peak
+        if resource is not None:
+            record["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        for sink in list(_sinks):
+            sink(record)
@@ -0,0 +1,285 @@
+"""
+Radix-2 Number-Theoretic Transform (NTT).
+
+The NTT is the finite-field version of the FFT: it evaluates a polynomial at
+every n-th root of unity in O(n log n). Multiplying two polynomials then becomes
+"evaluate both, multiply pointwise, interpolate back" instead of a double loop.
+
+Everything in here works on plain lists of ints (already reduced mod p) so the
+inner loops don't allocate a FieldElement per operation. The BN254 scalar field
+has p - 1 = 2^28 * t, so it has roots of unity for every power-of-two size up
+to 2^28.
+
+Transforms of PARALLEL_MIN_SIZE points or more are handed to the four-step
+NTT in src/four_step.py, which splits them over a process pool, when there
+is more than one core to split over.
+"""
+import multiprocessing
+import os
+
+# Below this many coefficients (in the smaller operand) schoolbook wins.
+NTT_THRESHOLD = 64
+
+_ROOT_CACHE = {}     # prime -> (two-adicity s, element of order exactly 2^s)
+_TWIDDLE_CACHE = {}  # (prime, n, inverse) -> [w^0, w^1, ..., w^(n/2 - 1)]
+_BITREV_CACHE = {}   # n -> bit-reversal permutation of range(n)
+
+
+def two_adicity(prime):
+    """Returns s, the largest power such that 2^s divides (p - 1)."""
+    return _max_root(prime)[0]
+
+
+def _max_root(prime):
+    """Finds the 2-adicity s of the field and a root of unity of order 2^s."""
+    if prime in _ROOT_CACHE:
+        return _ROOT_CACHE[prime]
+
+    s, t = 0, prime - 1
+    while t % 2 == 0:
+        s += 1
+        t //= 2
+
+    # Any quadratic non-residue z gives z^t of order exactly 2^s
+    z = 2
+    while pow(z, (prime - 1) // 2, prime) != prime - 1:
+        z += 1
+
+    _ROOT_CACHE[prime] = (s, pow(z, t, prime))
+    return _ROOT_CACHE[prime]
+
+
+def supports_size(n, prime):
+    """True if the field has an n-th root of unity (n a power of two)."""
+    return n > 0 and n & (n - 1) == 0 and (n.bit_length() - 1) <= two_adicity(prime)
+
+
+def root_of_unity(n, prime):
+    """Returns a primitive n-th root of unity. n must be a power of two."""
+    if not supports_size(n, prime):
+        raise ValueError(f"No {n}-th root of unity in field of size {prime}")
+    s, root = _max_root(prime)
+    # Squaring halves the order, so square (s - log n) times
+    return pow(root, 1 << (s - (n.bit_length() - 1)), prime)
+
+
+def _twiddles(n, prime, inverse=False):
+    key = (prime, n, inverse)
+    if key not in _TWIDDLE_CACHE:
+        w = root_of_unity(n, prime)
+        if inverse:
+            w = pow(w, prime - 2, prime)
+        table = [1] * max(n // 2, 1)
+        for i in range(1, n // 2):
+            table[i] = table[i - 1] * w % prime
+        _TWIDDLE_CACHE[key] = table
+    return _TWIDDLE_CACHE[key]
+
+
+def _bit_reversal(n):
+    if n not in _BITREV_CACHE:
+        bits = n.bit_length() - 1
+        rev = [0] * n
+        for i in range(1, n):
+            rev[i] = (rev[i >> 1] >> 1) | ((i & 1) << (bits - 1))
+        _BITREV_CACHE[n] = rev
+    return _BITREV_CACHE[n]
+
+
+def _transform(values, prime, inverse):
+    n = len(values)
+    if n == 1:
+        return [values[0] % prime]
+    if not supports_size(n, prime):
+        raise ValueError(f"NTT size {n} is not a supported power of two for this field")
+
+    # Iterative Cooley-Tukey: bit-reverse the input, then butterfly upwards
+    rev = _bit_reversal(n)
+    a = [values[rev[i]] % prime for i in range(n)]
+    twiddles = _twiddles(n, prime, inverse)
+
+    size = 2
+    while size <= n:
+        half = size // 2
+        step_twiddles = twiddles[::n // size]
+        for start in range(0, n, size):
+            for j in range(half):
+                u = a[start + j]
+                v = a[start + j + half] * step_twiddles[j] % prime
+                a[start + j] = (u + v) % prime
+                a[start + j + half] = (u - v) % prime
+        size *= 2
+
+    if inverse:
+        n_inv = pow(n, prime - 2, prime)
+        a = [x * n_inv % prime for x in a]
+    return a
+
+
+def _parallel(n):
+    # Only from the main process: pool workers (msm, the service, four-step
+    # itself) must not each start a pool of their own
+    from src.four_step import PARALLEL_MIN_SIZE
+    return (n >= PARALLEL_MIN_SIZE and (os.cpu_count() or 1) > 1
+            and multiprocessing.parent_process() is None)
+
+
+def ntt(values, prime):
+    """
+    Forward transform: coefficients -> evaluations at w^0, w^1, ..., w^(n-1).
+    len(values) must be a power of two.
+    """
+    if _parallel(len(values)):
+        from src.four_step import four_step_ntt
+        return four_step_ntt(values, prime)
+    return _transform(values, prime, inverse=False)
+
+
+def intt(values, prime):
+    """Inverse transform: evaluations at the n-th roots of unity -> coefficients."""
+    if _parallel(len(values)):
+        from src.four_step import four_step_intt
+        return four_step_intt(values, prime)
+    return _transform(values, prime, inverse=True)
+
+
+def coset_generator(prime):
+    """
+    Returns a small g outside the 2-power subgroup, so the coset g*D never
+    meets any power-of-two domain D (and x^n - 1 never vanishes on it).
+    """
+    s = two_adicity(prime)
+    g = 2
+    while pow(g, 1 << s, prime) == 1:
+        g += 1
+    return g
+
+
+def coset_ntt(values, prime, shift=None):
+    """Evaluates coefficients at shift * w^i (shift defaults to coset_generator)."""
+    shift = shift or coset_generator(prime)
+    scaled = list(values)
+    power = 1
+    for i in range(len(scaled)):
+        scaled[i] = scaled[i] * power % prime
+        power = power * shift % prime
+    return ntt(scaled, prime)
+
+
+def coset_intt(values, prime, shift=None):
+    """Inverse of coset_ntt: evaluations on shift * D -> coefficients."""
+    shift = shift or coset_generator(prime)
+    coeffs = intt(values, prime)
+    shift_inv = pow(shift, prime - 2, prime)
+    power = 1
+    for i in range(len(coeffs)):
+        coeffs[i] = coeffs[i] * power % prime
+        power = power * shift_inv % prime
+    return coeffs
+
+
+def _schoolbook(a, b, prime):
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x == 0:
+            continue
+        for j, y in enumerate(b):
+            result[i + j] += x * y
+    return [c % prime for c in result]
+
+
+def multiply(a, b, prime):
+    """
+    Multiplies two coefficient lists (ints mod p, lowest degree first).
+    Uses schoolbook for small inputs and NTT convolution for large ones.
+    """
+    if not a or not b:
+        return []
+
+    result_len = len(a) + len(b) - 1
+    n = 1
+    while n < result_len:
+        n *= 2
+
+    if min(len(a), len(b)) <= NTT_THRESHOLD or not supports_size(n, prime):
+        return _schoolbook(a, b, prime)
+
+    fa = ntt(list(a) + [0] * (n - len(a)), prime)
+    if a is b:
+        fb = fa  # Squaring: one forward transform is enough
+    else:
+        fb = ntt(list(b) + [0] * (n - len(b)), prime)
+
+    product = intt([x * y % prime for x, y in zip(fa, fb)], prime)
+    return product[:result_len]
+
+
+# --- Division helpers (coefficient lists, lowest degree first) ---
+
+def trim(a):
+    """Strips trailing zero coefficients. The zero polynomial becomes []."""
+    end = len(a)
+    while end and a[end - 1] == 0:
+        end -= 1
+    return a[:end]
+
+
+def inverse_series(a, n, prime):
+    """
+    Returns b with a * b = 1 (mod x^n) using Newton iteration.
+    Each round doubles the precision: b <- b * (2 - a * b).
+    """
+    if not a or a[0] % prime == 0:
+        raise ZeroDivisionError("Constant term must be non-zero to invert a power series")
+    b = [pow(a[0], prime - 2, prime)]
+    precision = 1
+    while precision < n:
+        precision = min(2 * precision, n)
+        ab = multiply(a[:precision], b, prime)[:precision]
+        correction = [(-c) % prime for c in ab]
+        correction[0] = (correction[0] + 2) % prime
+        b = multiply(b, correction, prime)[:precision]
+    return b
+
+
+def _long_divmod(a, b, prime):
+    # Classic long division, but updating the remainder in place instead of
+    # building and subtracting a whole (divisor * term) polynomial per step
+    db = len(b) - 1
+    inv_lead = pow(b[-1], prime - 2, prime)
+    r = list(a)
+    q = [0] * (len(a) - db)
+    for i in range(len(a) - 1 - db, -1, -1):
+        coef = r[i + db] * inv_lead % prime
+        q[i] = coef
+        if coef:
+            for j in range(db + 1):
+                r[i + j] = (r[i + j] - coef * b[j]) % prime
+    return trim(q), trim(r[:db])
+
+
+def divmod_poly(a, b, prime):
+    """
+    Returns (quotient, remainder) of a / b.
+    Large divisions use the reversal trick with a Newton-inverted divisor,
+    which costs a constant number of multiplications: O(n log n).
+    """
+    a, b = trim(a), trim(b)
+    if not b:
+        raise ZeroDivisionError("Divide by Zero Poly")
+    if len(a) < len(b):
+        return [], a
+
+    m = len(a) - len(b) + 1  # Number of quotient coefficients
+    if min(m, len(b)) <= NTT_THRESHOLD:
+        return _long_divmod(a, b, prime)
+
+    # rev(q) = rev(a) / rev(b) mod x^m
+    rev_b_inv = inverse_series(b[::-1], m, prime)
+    q = multiply(a[::-1][:m], rev_b_inv, prime)[:m]
+    q = q + [0] * (m - len(q))
+    q = q[::-1]
+
+    qb = multiply(q, b, prime)
+    r = [(x - y) % prime for x, y in zip(a[:len(b) - 1], qb)]
+    return trim(q), trim(r)
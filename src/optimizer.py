@@ -0,0 +1,114 @@
+from src.circuit import FlatCircuit, OP_MUL, OP_SCALE
+
+
+class OptimizationReport:
+    """Constraint counts before / after each optimization stage."""
+    def __init__(self, naive, folded, optimized, cse_merged, dead_removed, dce_applied):
+        self.naive = naive               # One constraint per gate (the old compiler)
+        self.folded = folded             # After folding linear gates and constants
+        self.optimized = optimized       # After CSE and dead-wire removal
+        self.cse_merged = cse_merged
+        self.dead_removed = dead_removed
+        self.dce_applied = dce_applied   # False when the circuit declares no outputs
+
+    @property
+    def constraints_before(self):
+        return self.naive
+
+    @property
+    def constraints_after(self):
+        return self.optimized
+
+    def __repr__(self):
+        lines = [
+            f"Constraints: {self.naive} -> {self.optimized}",
+            f"  one per gate:            {self.naive}",
+            f"  after linear folding:    {self.folded}",
+            f"  after CSE + dead wires:  {self.optimized}",
+            f"  merged duplicate MULs:   {self.cse_merged}",
+            f"  removed dead gates:      {self.dead_removed}",
+        ]
+        if not self.dce_applied:
+            lines.append("  (no outputs declared: dead-wire removal skipped)")
+        return "\n".join(lines)
+
+
+def _live_gates(circuit, outputs):
+    """Walks the gates backwards from the outputs, keeping the indices of what they depend on."""
+    live = bytearray(circuit.num_wires)
+    for wire in outputs:
+        live[wire] = 1
+    kept = []
+    lefts, rights, outs = circuit.gate_lefts, circuit.gate_rights, circuit.gate_outputs
+    for i in range(circuit.num_gates - 1, -1, -1):
+        if not live[outs[i]]:
+            continue
+        kept.append(i)
+        # Negative operands are constants, not wires
+        if lefts[i] >= 0:
+            live[lefts[i]] = 1
+        if rights[i] >= 0:
+            live[rights[i]] = 1
+    kept.reverse()
+    return kept
+
+
+def optimize(circuit, outputs=None):
+    """
+    Returns (optimized FlatCircuit, OptimizationReport).
+
+    Passes, in order:
+    1. Linear folding and constant folding: ADD / SUB / SCALE and MUL-by-constant
+       are folded into LinearCombinations (FlatCircuit does this as gates
+       are recorded); here we just measure it.
+    2. Dead-wire removal: gates that no declared output depends on are dropped.
+       Skipped when there are no outputs, since then every wire is observable.
+    3. Common-subexpression elimination: a MUL whose (A, B) pair was already
+       computed becomes a free alias (SCALE by 1) of the earlier result.
+
+    Wire IDs, names and input declarations are preserved, so Wires of the
+    original circuit, input maps and var_map lookups keep working.
+    """
+    outputs = [circuit.wire(w) for w in (outputs if outputs is not None else circuit.outputs)]
+
+    if outputs:
+        gates = _live_gates(circuit, outputs)
+    else:
+        gates = range(circuit.num_gates)
+    dead_removed = circuit.num_gates - len(gates)
+
+    new = FlatCircuit()
+    new.names, new.wire_ids = dict(circuit.names), dict(circuit.wire_ids)
+    new.produced = bytearray(circuit.num_wires)
+    new.constants, new._constant_refs = list(circuit.constants), dict(circuit._constant_refs)
+    new.public_inputs, new.private_inputs = list(circuit.public_inputs), list(circuit.private_inputs)
+    one = new._constant(1)
+    seen = {}  # (A key, B key) -> output wire of the first MUL with those rows
+    cse_merged = 0
+
+    ops, lefts, rights, outs = circuit.gate_ops, circuit.gate_lefts, circuit.gate_rights, circuit.gate_outputs
+    for i in gates:
+        op, left, right, out = ops[i], lefts[i], rights[i], outs[i]
+        if op == OP_MUL:
+            a, b = new._lc(left), new._lc(right)
+            a_key, b_key = a.key(), b.key()
+            key = (min(a_key, b_key), max(a_key, b_key))  # a*b == b*a
+            if key in seen and not a.is_constant(new.one) and not b.is_constant(new.one):
+                new._record(OP_SCALE, seen[key], one, out)
+                cse_merged += 1
+                continue
+            seen.setdefault(key, out)
+        new._record(op, left, right, out)
+
+    for wire in outputs:
+        new.output(wire)
+
+    report = OptimizationReport(
+        naive=circuit.num_gates,
+        folded=circuit.num_constraints(),
+        optimized=new.num_constraints(),
+        cse_merged=cse_merged,
+        dead_removed=dead_removed,
+        dce_applied=bool(outputs),
+    )
+    return new, report
@@ -1,4 +1,9 @@
-from src.finite_field import FieldElement
+from src.finite_field import FieldElement, FieldVector
+from src import ntt
+
+# Up to this many points, evaluate_many() runs Horner per point rather than
+# building a subproduct tree
+HORNER_MAX_POINTS = 8
 
 class Polynomial:
     def __init__(self, coeffs):
@@ -38,61 +43,49 @@ class Polynomial:
 
     def __mul__(self, other):
         if isinstance(other, Polynomial):
-            result_len = len(self.coeffs) + len(other.coeffs) - 1
-            # Initialize with proper FieldElement zero
             prime = self.coeffs[0].prime
-            result_coeffs = [FieldElement(0, prime) for _ in range(result_len)]
-
-            for i, c1 in enumerate(self.coeffs):
-                for j, c2 in enumerate(other.coeffs):
-                    result_coeffs[i+j] = result_coeffs[i+j] + (c1 * c2)
-            return Polynomial(result_coeffs)
+            # Work on raw ints; ntt.multiply picks schoolbook or NTT by size
+            a = [c.value for c in self.coeffs]
+            b = a if other is self else [c.value for c in other.coeffs]
+            result_coeffs = ntt.multiply(a, b, prime)
+            return Polynomial([FieldElement(v, prime) for v in result_coeffs])
         return NotImplemented
 
     def __truediv__(self, other):
         """
-        Polynomial Long Division. 
+        Polynomial Long Division.
         Returns (Quotient, Remainder).
+
+        Small divisions run classic long division directly on the coefficient
+        lists (O(n^2)); large ones use Newton iteration (O(n log n)).
+        See ntt.divmod_poly.
         """
         if isinstance(other, Polynomial):
-            quotient = []
-            remainder = Polynomial(self.coeffs[:]) # Copy
-            divisor = other
-
-            if divisor.degree() < 0: raise ValueError("Divide by Zero Poly")
-            if remainder.degree() < divisor.degree():
-                # Self is smaller than divisor -> Quotient is 0, Remainder is self
-                prime = self.coeffs[0].prime
-                return Polynomial([FieldElement(0, prime)]), remainder
-
-            # While remainder is larger than divisor, keep dividing
-            while remainder.degree() >= divisor.degree():
-                # Lead coeff of remainder / Lead coeff of divisor
-                lead_rem = remainder.coeffs[-1]
-                lead_div = divisor.coeffs[-1]
-                factor = lead_rem / lead_div
-                
-                # The degree difference
-                deg_diff = remainder.degree() - divisor.degree()
-                
-                # Construct the subtraction term (factor * x^deg_diff)
-                prime = remainder.coeffs[0].prime
-                term_coeffs = [FieldElement(0, prime)] * deg_diff + [factor]
-                term_poly = Polynomial(term_coeffs)
-                
-                # Update quotient
-                # (Ideally we'd accumulate this, but for QAP checks we mostly care about remainder == 0)
-                # For this basic implementation, we just need to reduce the remainder.
-                
-                to_subtract = divisor * term_poly
-                remainder = remainder - to_subtract
-                
-            # Note: We are not tracking the full quotient list here to keep it simple
-            # We strictly need Remainder to be Zero for the proof check.
-            return None, remainder 
-            
+            if other.is_zero(): raise ValueError("Divide by Zero Poly")
+            prime = self.coeffs[0].prime
+            q, r = ntt.divmod_poly([c.value for c in self.coeffs], [c.value for c in other.coeffs], prime)
+            return self._from_ints(q, prime), self._from_ints(r, prime)
         return NotImplemented
 
+    def __divmod__(self, other):
+        return self.__truediv__(other)
+
+    def __floordiv__(self, other):
+        result = self.__truediv__(other)
+        return result if result is NotImplemented else result[0]
+
+    def __mod__(self, other):
+        result = self.__truediv__(other)
+        return result if result is NotImplemented else result[1]
+
+    def is_zero(self):
+        return all(c.value == 0 for c in self.coeffs)
+
+    @staticmethod
+    def _from_ints(values, prime):
+        """Wraps a list of ints as a Polynomial (empty list -> zero polynomial)."""
+        return Polynomial([FieldElement(v, prime) for v in values] or [FieldElement(0, prime)])
+
     def evaluate(self, x):
         """Evaluate P(x) using Horner's Method"""
         if isinstance(x, int):
@@ -103,6 +96,29 @@ class Polynomial:
             result = (result * x) + coeff
         return result
 
+    def evaluate_many(self, points):
+        """
+        Evaluates P at every x in points (FieldElements or ints), in order.
+
+        A roots-of-unity domain or a coset of one costs a single NTT; other
+        point sets go down a subproduct tree, O(n log^2 n) instead of n
+        Horner passes. The EvaluationDomain is cached, so evaluating many
+        polynomials at the same points only builds the tree once.
+        """
+        prime = self.coeffs[0].prime
+        if len(points) <= HORNER_MAX_POINTS:
+            coeffs = [c.value for c in reversed(self.coeffs)]
+            values = []
+            for x in points:
+                x = x.value if isinstance(x, FieldElement) else x
+                acc = 0
+                for c in coeffs:
+                    acc = (acc * x + c) % prime
+                values.append(FieldElement(acc, prime))
+            return values
+        from src.domain import EvaluationDomain  # Avoid circular import
+        return EvaluationDomain.get(points, prime).evaluate(self)
+
     def __repr__(self):
         # Pretty print: 3x^2 + 2x + 1
         s = []
@@ -114,30 +130,128 @@ def lagrange_interpolation(x_points, y_points, prime):
     """
     Given points (x, y), find the lowest degree Polynomial P(x) that passes through them.
     P(x) = Sum( y_i * L_i(x) )
+
+    The heavy lifting lives in EvaluationDomain, which is cached per set of
+    x-coordinates, so interpolating many columns over the same points is cheap.
+    """
+    from src.domain import EvaluationDomain  # Avoid circular import
+    return EvaluationDomain.get(x_points, prime).interpolate(y_points)
+
+
+class LagrangePolynomial(Polynomial):
     """
-    total_poly = Polynomial([FieldElement(0, prime)])
-    
-    for i in range(len(x_points)):
-        xi, yi = x_points[i], y_points[i]
-        
-        numerator = Polynomial([FieldElement(1, prime)])
-        denominator = FieldElement(1, prime)
-        
-        for j in range(len(x_points)):
-            if i == j: continue
-            xj = x_points[j]
-            
-            # (x - xj)
-            term = Polynomial([FieldElement(0, prime) - xj, FieldElement(1, prime)])
-            numerator = numerator * term
-            denominator = denominator * (xi - xj)
-            
-        inv_denom = FieldElement(1, prime) / denominator
-        scaled_coeffs = [c * inv_denom for c in numerator.coeffs]
-        L_i = Polynomial(scaled_coeffs)
-        
-        # Add yi * L_i(x)
-        term_coeffs = [c * yi for c in L_i.coeffs]
-        total_poly = total_poly + Polynomial(term_coeffs)
-        
-    return total_poly
\ No newline at end of file
+    A polynomial of degree < n held by its values on an n-point
+    EvaluationDomain (the Lagrange basis) rather than by coefficients.
+
+    Addition, subtraction, negation and scaling are pointwise, O(n). So is a
+    product whose degree still fits the domain, tracked through
+    degree_bound; a bigger product re-evaluates both factors on a
+    roots-of-unity domain large enough to hold it, and stays in evaluation
+    form there. Coefficients are interpolated only when something asks for
+    them (.coeffs, division, printing) and are then cached, so everything
+    inherited from Polynomial keeps working.
+    """
+    def __init__(self, domain, values, degree_bound=None, coeffs=None):
+        if len(values) != domain.size:
+            raise ValueError(f"Expected {domain.size} values, got {len(values)}")
+        self.domain = domain
+        self.values = values if isinstance(values, FieldVector) else FieldVector(values, domain.prime)
+        self.degree_bound = domain.size - 1 if degree_bound is None else degree_bound
+        self._coeffs = coeffs
+
+    @classmethod
+    def from_polynomial(cls, poly, domain):
+        """Evaluates a coefficient-form Polynomial of degree < domain.size on the domain."""
+        if isinstance(poly, LagrangePolynomial) and poly.domain is domain:
+            return poly
+        if poly.degree() >= domain.size:
+            raise ValueError(f"Degree {poly.degree()} does not fit a domain of {domain.size} points")
+        return cls(domain, domain.evaluate(poly), poly.degree(), poly.coeffs)
+
+    @property
+    def coeffs(self):
+        if self._coeffs is None:
+            self._coeffs = self.domain.interpolate(self.values.values).coeffs
+        return self._coeffs
+
+    @property
+    def prime(self):
+        return self.domain.prime
+
+    def is_zero(self):
+        return not any(self.values.values)
+
+    def _wrap(self, values, degree_bound):
+        return LagrangePolynomial(self.domain, values, degree_bound)
+
+    def _on_domain(self, other):
+        """other as a LagrangePolynomial over self.domain, or None if it doesn't fit."""
+        if isinstance(other, LagrangePolynomial) and other.domain is self.domain:
+            return other
+        if isinstance(other, Polynomial) and other.degree() < self.domain.size:
+            return LagrangePolynomial.from_polynomial(other, self.domain)
+        return None
+
+    def __add__(self, other):
+        rhs = self._on_domain(other)
+        if rhs is None:
+            return Polynomial.__add__(self, other)
+        return self._wrap(self.values + rhs.values, max(self.degree_bound, rhs.degree_bound))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        rhs = self._on_domain(other)
+        if rhs is None:
+            return Polynomial.__sub__(self, other)
+        return self._wrap(self.values - rhs.values, max(self.degree_bound, rhs.degree_bound))
+
+    def __rsub__(self, other):
+        result = self.__sub__(other)
+        return -result if isinstance(result, LagrangePolynomial) else Polynomial.__sub__(other, self)
+
+    def __neg__(self):
+        return self._wrap(-self.values, self.degree_bound)
+
+    def __mul__(self, other):
+        if isinstance(other, (int, FieldElement)):
+            return self._wrap(self.values.scale(other), self.degree_bound)
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        other_bound = other.degree_bound if isinstance(other, LagrangePolynomial) else other.degree()
+        bound = self.degree_bound + other_bound
+        if bound < self.domain.size:
+            rhs = self._on_domain(other)
+            return self._wrap(self.values * rhs.values, bound)
+
+        # Too big for this domain: move both factors to one that holds the product
+        from src.domain import EvaluationDomain  # Avoid circular import
+        size = 1
+        while size <= bound:
+            size *= 2
+        if not ntt.supports_size(size, self.prime):
+            return Polynomial.__mul__(self, other)
+        domain = EvaluationDomain.roots_of_unity(size, self.prime)
+        lhs = self.extend(domain)
+        rhs = lhs if other is self else LagrangePolynomial.from_polynomial(other, domain)
+        return LagrangePolynomial(domain, lhs.values * rhs.values, bound)
+
+    __rmul__ = __mul__
+
+    def extend(self, domain):
+        """The same polynomial in evaluation form on another (e.g. larger) domain."""
+        if domain is self.domain:
+            return self
+        if self.degree_bound >= domain.size:
+            raise ValueError(f"Degree bound {self.degree_bound} does not fit a domain of {domain.size} points")
+        return LagrangePolynomial(domain, domain.evaluate(self), self.degree_bound, self._coeffs)
+
+    def evaluate(self, x):
+        """P(x) straight from the values (barycentric form), O(n), no interpolation."""
+        return self.domain.evaluate_interpolant(self.values.values, x)
+
+    def evaluate_many(self, points):
+        if len(points) == self.domain.size and [
+                x.value if isinstance(x, FieldElement) else x % self.prime for x in points] == self.domain.points:
+            return list(self.values)
+        return Polynomial.evaluate_many(self, points)
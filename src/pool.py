@@ -0,0 +1,26 @@
+"""
+The process pool shared by the parallel kernels (msm, the four-step NTT).
+
+Both run in bursts (prove() makes five MSMs and a handful of transforms back
+to back), so the pool is created on first use and kept for the life of the
+program. A single pool serves both: two of them, each sized to the core
+count, would oversubscribe the machine.
+"""
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+_workers = 0  # Size of _pool
+
+
+def shared_pool(workers):
+    """The shared pool with the given number of processes, (re)created as needed."""
+    global _pool, _workers
+    if _pool is None or _workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        else:
+            atexit.register(lambda: _pool and _pool.shutdown())
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _workers = workers
+    return _pool
@@ -0,0 +1,146 @@
+import random
+import weakref
+
+from src.finite_field import FieldElement
+from src.polynomial import Polynomial
+from src import ntt
+from src.instrument import stage
+
+
+class QAPPrecomputation:
+    """
+    Everything about a QAP that depends only on the circuit (not the witness):
+    the power-of-two domain size, its root of unity, the coset shift and the
+    constant value of Z(x) = x^n - 1 on that coset.
+
+    num_constraints counts every row pinned to the domain, including any
+    public-input binding rows (see QAP).
+    """
+    def __init__(self, num_constraints, prime):
+        self.prime = prime
+        self.size = 1
+        while self.size < num_constraints:
+            self.size *= 2
+        self.omega = ntt.root_of_unity(self.size, prime)
+        self.shift = ntt.coset_generator(prime)
+        # Z(g * w^i) = g^n * 1 - 1 for every i: one inversion covers the coset
+        self.z_coset_inv = pow(pow(self.shift, self.size, prime) - 1, prime - 2, prime)
+
+    def vanishing_at(self, x):
+        return (pow(x, self.size, self.prime) - 1) % self.prime
+
+
+class QAP:
+    """
+    Quadratic Arithmetic Program for one R1CS and one witness.
+
+    Constraint i is pinned to the domain point w^i. Rather than interpolating
+    every variable column u_j(x) and summing w_j * u_j(x), we use the fact that
+    A(w^i) = (A.w)_i: one sparse mat-vec product gives A(x) in evaluation form,
+    and a single inverse NTT turns it into coefficients. The same goes for B
+    and C. Then
+
+        H(x) = (A(x) * B(x) - C(x)) / Z(x),   Z(x) = x^n - 1
+
+    is computed on a coset g*D where Z is a nonzero constant, so the whole
+    transform is O(n log n) in the number of constraints.
+
+    bind_public=True appends one row x_i * 0 = 0 for 'one' and every public
+    variable (indices 0 .. num_public), as Groth16 needs: it makes the u_i
+    linearly independent, so a public input that no constraint reads still
+    gets a nonzero verifying-key term and cannot be swapped after proving.
+    Every witness satisfies these rows, so H(x) stays well defined.
+
+    The circuit-only data is cached per R1CS, so proving many witnesses for
+    the same circuit reuses it.
+    """
+    _precomputed = weakref.WeakKeyDictionary()  # r1cs -> {(prime, rows): QAPPrecomputation}
+
+    def __init__(self, r1cs, witness, prime=None, bind_public=False):
+        self.r1cs = r1cs
+        values, prime = r1cs._witness_values(witness, prime)
+        if prime is None:
+            raise ValueError("QAP needs a prime field: pass prime= or a FieldElement witness")
+        self.prime = prime
+        self.pre = QAP.precompute(r1cs, prime, bind_public)
+
+        n, p = self.pre.size, prime
+        with stage("qap.compute", constraints=len(r1cs.A), domain_size=n) as rec:
+            a_evals = r1cs.A.dot(values, p)
+            b_evals = r1cs.B.dot(values, p)
+            c_evals = r1cs.C.dot(values, p)
+            if bind_public:
+                binding = QAP.binding_rows(r1cs)
+                a_evals += [x % p for x in values[:binding]]
+                b_evals += [0] * binding
+                c_evals += [0] * binding
+            # Padding rows are 0 * 0 = 0, which every witness satisfies
+            padding = [0] * (n - len(a_evals))
+            self._a = ntt.intt(a_evals + padding, p)
+            self._b = ntt.intt(b_evals + padding, p)
+            self._c = ntt.intt(c_evals + padding, p)
+            self._h = self._compute_h()
+            # nnz mat-vec products + 7 transforms of (n/2) log n butterflies + pointwise work
+            rec["field_ops"] = r1cs.nnz + 7 * (n // 2) * (n.bit_length() - 1) + 10 * n
+
+    @staticmethod
+    def binding_rows(r1cs):
+        """The number of public-input binding rows: 'one' plus every public variable."""
+        return r1cs.num_public + 1
+
+    @classmethod
+    def precompute(cls, r1cs, prime, bind_public=False):
+        # Keyed on the row count too: R1CS.sync() can grow the circuit
+        rows = len(r1cs.A) + (cls.binding_rows(r1cs) if bind_public else 0)
+        per_shape = cls._precomputed.setdefault(r1cs, {})
+        key = (prime, rows)
+        if key not in per_shape:
+            per_shape[key] = QAPPrecomputation(rows, prime)
+        return per_shape[key]
+
+    def _compute_h(self):
+        # deg(A*B - C) <= 2n - 2, so deg(H) <= n - 2 and n coset points are enough
+        p, g = self.prime, self.pre.shift
+        a = ntt.coset_ntt(self._a, p, g)
+        b = ntt.coset_ntt(self._b, p, g)
+        c = ntt.coset_ntt(self._c, p, g)
+        z_inv = self.pre.z_coset_inv
+        h_evals = [(x * y - z) * z_inv % p for x, y, z in zip(a, b, c)]
+        return ntt.coset_intt(h_evals, p, g)
+
+    def _poly(self, coeffs):
+        return Polynomial._from_ints(ntt.trim(list(coeffs)), self.prime)
+
+    @property
+    def A(self):
+        return self._poly(self._a)
+
+    @property
+    def B(self):
+        return self._poly(self._b)
+
+    @property
+    def C(self):
+        return self._poly(self._c)
+
+    @property
+    def H(self):
+        return self._poly(self._h)
+
+    @property
+    def Z(self):
+        n, p = self.pre.size, self.prime
+        return self._poly([p - 1] + [0] * (n - 1) + [1])
+
+    def check(self, x=None):
+        """
+        Spot-checks A(x) * B(x) - C(x) == H(x) * Z(x) at a random point.
+        This only holds (w.h.p.) when the witness satisfies the R1CS.
+        """
+        p = self.prime
+        if x is None:
+            x = random.SystemRandom().randrange(p)
+        x = FieldElement(x.value if isinstance(x, FieldElement) else x, p)
+        lhs = self.A.evaluate(x) * self.B.evaluate(x) - self.C.evaluate(x)
+        rhs = self.H.evaluate(x) * self.pre.vanishing_at(x.value)
+        return lhs == rhs
@@ -1,99 +1,253 @@
-import numpy as np
+import logging
+import random
+from array import array
+
+from src.finite_field import FieldElement, FieldVector
+from src.instrument import stage
+
+logger = logging.getLogger(__name__)
 
 class R1CS:
     def __init__(self, flat_circuit):
         self.circuit = flat_circuit
-        self.var_map = {} # Maps variable names "v1" -> index 0, 1, 2...
-        self.A = []
-        self.B = []
-        self.C = []
-        
-        self._build_var_map()
-        self._compile_constraints()
+        self._compile()
+
+    def _compile(self):
+        circuit = self.circuit
+        with stage("r1cs.compile", gates=circuit.num_gates) as rec:
+            # The circuit emitted its rows (A, B, C over wire IDs) as gates were
+            # recorded, with ADD / SUB / scalings already folded into the rows of
+            # the multiplications that use them. All that's left is to lay out
+            # the variables and renumber the columns: O(wires + nnz), no sorting.
+            self._build_var_map()
+            self.A, self.B, self.C = (m.permute_columns(self.index, self.num_vars) for m in circuit.rows)
+            self._synced = self._layout_key() + (len(self.A),)
+            rec.update(constraints=len(self.A), variables=self.num_vars, nnz=self.nnz)
+
+    def _layout_key(self):
+        c = self.circuit
+        return (len(c.outputs), len(c.public_inputs), len(c.private_inputs))
 
     def _build_var_map(self):
         """
-        Assigns a unique index to every variable in the circuit.
-        Index 0 is always reserved for the constant 'one'.
+        Assigns a unique index to every variable in the circuit, in the layout
+        [one, outputs, public inputs, private inputs, internal wires].
+        Index 0 is always reserved for the constant 'one', and the public part
+        (indices 1 .. num_public) comes first, as a verifier expects it.
+        Folded (linear) wires have no index unless they are outputs.
+        Within each group, wires keep the order they were declared / allocated in.
+
+        self.index maps wire ID -> variable index (-1 for wires with no
+        variable) and self.wires is its inverse.
         """
-        # 1. Start with the constant 'one'
-        variables = set([self.circuit.one])
-        
-        # 2. Collect all used variables from operations
-        for op in self.circuit.operations:
-            variables.add(op['left'])
-            variables.add(op['right'])
-            variables.add(op['output'])
-            
-        # 3. Create the map
-        # Sort them to ensure deterministic order (important for verifying later!)
-        sorted_vars = sorted(list(variables))
-        # Ensure 'one' is at index 0
-        if self.circuit.one in sorted_vars:
-            sorted_vars.remove(self.circuit.one)
-            sorted_vars.insert(0, self.circuit.one)
-            
-        for i, var in enumerate(sorted_vars):
-            self.var_map[var] = i
-            
-        self.num_vars = len(self.var_map)
-        print(f"Variable Mapping: {self.var_map}")
-
-    def _get_vector(self, variable_name):
-        """Creates a vector of size N with a 1 at the variable's index."""
-        vec = [0] * self.num_vars
-        if variable_name in self.var_map:
-            idx = self.var_map[variable_name]
-            vec[idx] = 1
-        return vec
-        
-    def _compile_constraints(self):
+        circuit = self.circuit
+        produced = circuit.produced
+        n = circuit.num_wires
+
+        # 1. Every wire the constraints actually use
+        used = bytearray(n)
+        for matrix in circuit.rows:
+            for w in set(matrix.indices):
+                used[w] = 1
+
+        self.index = array('q', [-1]) * n
+        self.wires = array('q')
+        index, wires = self.index, self.wires
+
+        def place(w):
+            if index[w] < 0:
+                index[w] = len(wires)
+                wires.append(w)
+
+        # 2. 'one', then the public statement, then the declared private inputs
+        for w in [circuit.one] + circuit.outputs + circuit.public_inputs:
+            place(w)
+        num_public = len(wires) - 1
+        for w in circuit.private_inputs:
+            place(w)
+        # Undeclared wires that no gate writes are private inputs too
+        for w in range(n):
+            if used[w] and not produced[w]:
+                place(w)
+        self.num_private_inputs = len(wires) - 1 - num_public
+
+        # 3. Internal wires, in allocation order
+        for w in range(n):
+            if used[w]:
+                place(w)
+
+        self.num_vars = len(wires)
+        self.num_outputs = len(circuit.outputs)
+        self.num_public_inputs = num_public - self.num_outputs
+        self._var_map = None
+        logger.debug("Variable Mapping: %s", self.var_map if self.num_vars <= 64 else f"{self.num_vars} variables")
+
+    @property
+    def num_public(self):
+        """Outputs + public inputs (not counting 'one'): they sit at indices 1 .. num_public."""
+        return self.num_outputs + self.num_public_inputs
+
+    @property
+    def var_map(self):
+        """Maps variable names ("v7" for unnamed wires) -> index 0, 1, 2... Built on demand."""
+        if self._var_map is None:
+            name_of = self.circuit.name_of
+            self._var_map = {name_of(w): i for i, w in enumerate(self.wires)}
+        return self._var_map
+
+    def index_of(self, wire):
+        """The variable index of a wire (given as a Wire, ID or name)."""
+        if not isinstance(wire, int):
+            wire = self.circuit.wire_ids[wire]
+        idx = self.index[wire] if 0 <= wire < len(self.index) else -1
+        if idx < 0:
+            raise KeyError(f"Wire '{self.circuit.name_of(wire)}' has no R1CS variable (folded or unused)")
+        return idx
+
+    def sync(self):
         """
-        Converts each operation into A * B = C vectors.
+        Picks up the gates recorded on the circuit since this R1CS was built,
+        without rebuilding it: their rows are appended and new internal wires
+        take the next variable indices. Only a change to the public / private
+        part of the layout (a new output or input) forces a full recompile.
+        Returns the number of constraints added.
+
+        Witness generators compiled against the old shape must be recreated.
         """
-        for op in self.circuit.operations:
-            # Initialize empty vectors for this constraint
-            a_vec = [0] * self.num_vars
-            b_vec = [0] * self.num_vars
-            c_vec = [0] * self.num_vars
-            
-            # Get indices
-            left_idx = self.var_map[op['left']]
-            right_idx = self.var_map[op['right']]
-            out_idx = self.var_map[op['output']]
-            one_idx = self.var_map[self.circuit.one]
-
-            if op['op'] == 'MUL':
-                # Logic: left * right = output
-                # A: [left], B: [right], C: [output]
-                a_vec[left_idx] = 1
-                b_vec[right_idx] = 1
-                c_vec[out_idx] = 1
-            
-            elif op['op'] == 'ADD':
-                # Logic: (left + right) * 1 = output
-                # A: [left, right], B: [one], C: [output]
-                a_vec[left_idx] = 1
-                a_vec[right_idx] = 1
-                b_vec[one_idx] = 1
-                c_vec[out_idx] = 1
-
-            elif op['op'] == 'SUB':
-                # Logic: (left - right) * 1 = output
-                # A: [left, -right], B: [one], C: [output]
-                a_vec[left_idx] = 1
-                a_vec[right_idx] = -1 # Negative!
-                b_vec[one_idx] = 1
-                c_vec[out_idx] = 1
-            
-            self.A.append(a_vec)
-            self.B.append(b_vec)
-            self.C.append(c_vec)
+        circuit = self.circuit
+        done = self._synced[-1]
+        total = len(circuit.rows[0])
+        if self._layout_key() != self._synced[:-1]:
+            self._compile()
+            return total - done
+
+        # New wires referenced by the new rows; numbered in allocation (wire ID)
+        # order below, as _build_var_map() numbers internal wires
+        known = len(self.index)
+        fresh = set()
+        for matrix in circuit.rows:
+            for k in range(matrix.indptr[done], matrix.nnz):
+                w = matrix.indices[k]
+                if w >= known or self.index[w] < 0:
+                    fresh.add(w)
+        if any(not circuit.produced[w] for w in fresh):
+            # A new undeclared input belongs in the private block
+            self._compile()
+            return total - done
+
+        self.index.extend([-1] * (circuit.num_wires - known))
+        for w in sorted(fresh):
+            self.index[w] = len(self.wires)
+            self.wires.append(w)
+        self.num_vars = len(self.wires)
+        self._var_map = None
+
+        index = self.index
+        for source, target in zip(circuit.rows, (self.A, self.B, self.C)):
+            for i in range(done, total):
+                target.append_row((index[j], c) for j, c in source.row(i))
+            target.num_cols = self.num_vars
+        self._synced = self._layout_key() + (total,)
+        return total - done
+
+    @property
+    def nnz(self):
+        return self.A.nnz + self.B.nnz + self.C.nnz
+
+    def to_dense(self):
+        """Opt-in dense export of (A, B, C) as lists of lists. Debugging only: O(constraints * vars)."""
+        return self.A.to_dense(), self.B.to_dense(), self.C.to_dense()
+
+    def _witness_values(self, witness, prime):
+        """Unwraps a witness (FieldElements or ints) into ints, inferring the prime."""
+        if isinstance(witness, FieldVector):
+            if len(witness) != self.num_vars:
+                raise ValueError(f"Witness has {len(witness)} entries, expected {self.num_vars}")
+            return witness.values, prime or witness.prime
+
+        values = []
+        for x in witness:
+            if isinstance(x, FieldElement):
+                if prime is None:
+                    prime = x.prime
+                values.append(x.value)
+            else:
+                values.append(int(x))
+        if len(values) != self.num_vars:
+            raise ValueError(f"Witness has {len(values)} entries, expected {self.num_vars}")
+        return values, prime
+
+    def evaluate(self, witness, prime=None):
+        """
+        Computes (A.w, B.w, C.w) as three sparse mat-vec products.
+        With no prime (and plain int witness) the arithmetic is over the integers.
+        """
+        values, prime = self._witness_values(witness, prime)
+        return self.A.dot(values, prime), self.B.dot(values, prime), self.C.dot(values, prime)
+
+    def unsatisfied_constraints(self, witness, prime=None, first_only=False):
+        """
+        Returns the indices of every constraint where (A.w) * (B.w) != (C.w).
+        Only the nonzeros are touched, so this is O(nnz), not O(constraints * vars).
+        """
+        values, prime = self._witness_values(witness, prime)
+        failed = []
+        with stage("r1cs.check", constraints=len(self.A)) as rec:
+            rows = zip(self._row_dots(self.A, values), self._row_dots(self.B, values), self._row_dots(self.C, values))
+            for i, (a, b, c) in enumerate(rows):
+                diff = a * b - c
+                if (diff % prime if prime else diff) != 0:
+                    failed.append(i)
+                    if first_only:
+                        break
+            # One multiply per nonzero plus a*b per row (an upper bound on early exit)
+            rec.update(field_ops=self.nnz + len(self.A), failed=len(failed))
+        return failed
+
+    def is_satisfied(self, witness, prime=None, probabilistic=False, chunk_size=256):
+        """
+        True if the witness satisfies every constraint.
+
+        probabilistic=True checks a random linear combination sum(r_i * (a_i*b_i - c_i))
+        instead of every row on its own. The r_i are 64-bit draws from a PRNG seeded
+        once from SystemRandom, and the sum is only reduced once per chunk: a row
+        costs one small-by-large multiply instead of a reduction mod p. Satisfied
+        rows contribute exactly 0, so a nonzero partial sum over any chunk is a
+        definite failure and we exit early; a failing chunk sums to 0 with
+        probability <= 2^-64.
+        """
+        if not probabilistic:
+            return not self.unsatisfied_constraints(witness, prime, first_only=True)
+
+        values, prime = self._witness_values(witness, prime)
+        coefficient = random.Random(random.SystemRandom().getrandbits(128)).getrandbits
+        acc = 0
+        with stage("r1cs.check", constraints=len(self.A), probabilistic=True) as rec:
+            rec["field_ops"] = self.nnz + 2 * len(self.A)
+            rows = zip(self._row_dots(self.A, values), self._row_dots(self.B, values), self._row_dots(self.C, values))
+            for i, (a, b, c) in enumerate(rows, 1):
+                acc += coefficient(64) * (a * b - c)
+                if i % chunk_size == 0:
+                    if (acc % prime if prime else acc) != 0:
+                        return False
+                    acc = 0
+            return (acc % prime if prime else acc) == 0
+
+    @staticmethod
+    def _row_dots(matrix, values):
+        """Lazily yields row_i . values (unreduced), so callers can stop early."""
+        indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+        for i in range(matrix.num_rows):
+            acc = 0
+            for k in range(indptr[i], indptr[i + 1]):
+                acc += data[k] * values[indices[k]]
+            yield acc
 
     def print_r1cs(self):
+        A, B, C = self.to_dense()
         print("\n--- R1CS Constraints (A * B = C) ---")
-        for i in range(len(self.A)):
+        for i in range(len(A)):
             print(f"Constraint {i+1}:")
-            print(f"  A: {self.A[i]}")
-            print(f"  B: {self.B[i]}")
-            print(f"  C: {self.C[i]}")
\ No newline at end of file
+            print(f"  A: {A[i]}")
+            print(f"  B: {B[i]}")
+            print(f"  C: {C[i]}")
\ No newline at end of file
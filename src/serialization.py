@@ -0,0 +1,354 @@
+"""
+Binary (de)serialization of constraint systems and witnesses, in circom's
+.r1cs and .wtns layouts, so files can be shared with snarkjs / circom tools.
+
+Both formats are little-endian and made of sections:
+
+    magic (4 bytes) | version u32 | n_sections u32
+    then per section: type u32 | size u64 | payload
+
+.r1cs (version 1)
+    1 header:      n8 u32 | prime (n8 bytes) | n_wires u32 | n_pub_out u32 |
+                   n_pub_in u32 | n_prv_in u32 | n_labels u64 | n_constraints u32
+    2 constraints: for each of A, B, C: nnz u32, then nnz * (wire u32 | coeff n8 bytes)
+    3 wire->label: n_wires * u64
+
+.wtns (version 2)
+    1 header:      n8 u32 | prime (n8 bytes) | n_witness u32
+    2 values:      n_witness * n8 bytes
+
+Coefficients and witness values are stored reduced mod the prime, in
+normal (non-Montgomery) form. Our R1CS variable layout is already circom's
+[one, outputs, public inputs, private inputs, internal], so wire i of the
+file is variable i of the R1CS.
+
+The readers memory-map the file and decode on demand: constraints are
+parsed one at a time as they are iterated, so a worker can open a large
+system instantly, several processes share the same pages, and the system
+can be larger than RAM.
+"""
+import hashlib
+import mmap
+import struct
+from array import array
+
+from src.finite_field import FieldElement, FieldVector, PrimeField
+from src.sparse import SparseMatrix
+
+R1CS_MAGIC = b"r1cs"
+WTNS_MAGIC = b"wtns"
+R1CS_VERSION = 1
+WTNS_VERSION = 2
+
+SECTION_HEADER = 1
+SECTION_CONSTRAINTS = 2
+SECTION_WIRE_LABELS = 3
+SECTION_WITNESS = 2
+
+_U32 = struct.Struct("<I")
+_SECTION = struct.Struct("<IQ")
+_R1CS_COUNTS = struct.Struct("<IIIIQI")
+
+
+def field_size(prime):
+    """Bytes per field element: circom rounds up to a multiple of 8."""
+    return ((prime.bit_length() + 63) // 64) * 8
+
+
+def _write_preamble(f, magic, version, num_sections):
+    f.write(magic)
+    f.write(_U32.pack(version))
+    f.write(_U32.pack(num_sections))
+
+
+def write_r1cs(r1cs, path, prime):
+    """
+    Writes an R1CS to path (or a binary file object) in circom's .r1cs
+    format. The constraints are streamed straight from the sparse matrices,
+    so nothing is materialized.
+    """
+    if hasattr(path, "write"):
+        _write_r1cs(r1cs, path, prime)
+    else:
+        with open(path, "wb") as f:
+            _write_r1cs(r1cs, f, prime)
+
+
+class _HashWriter:
+    def __init__(self):
+        self.hash = hashlib.sha256()
+
+    def write(self, data):
+        self.hash.update(data)
+
+
+def r1cs_digest(r1cs, prime):
+    """sha256 (hex) of the .r1cs encoding: a content address for the compiled circuit."""
+    writer = _HashWriter()
+    _write_r1cs(r1cs, writer, prime)
+    return writer.hash.hexdigest()
+
+
+def _write_r1cs(r1cs, f, prime):
+    n8 = field_size(prime)
+    A, B, C = r1cs.A, r1cs.B, r1cs.C
+    num_constraints = len(A)
+    entry = 4 + n8
+
+    _write_preamble(f, R1CS_MAGIC, R1CS_VERSION, 3)
+
+    header = (_U32.pack(n8) + prime.to_bytes(n8, "little") + _R1CS_COUNTS.pack(
+        r1cs.num_vars, r1cs.num_outputs, r1cs.num_public_inputs,
+        r1cs.num_private_inputs, r1cs.num_vars, num_constraints))
+    f.write(_SECTION.pack(SECTION_HEADER, len(header)))
+    f.write(header)
+
+    size = 3 * 4 * num_constraints + entry * (A.nnz + B.nnz + C.nnz)
+    f.write(_SECTION.pack(SECTION_CONSTRAINTS, size))
+    for i in range(num_constraints):
+        chunk = bytearray()
+        for matrix in (A, B, C):
+            start, end = matrix.indptr[i], matrix.indptr[i + 1]
+            chunk += _U32.pack(end - start)
+            for k in range(start, end):
+                chunk += _U32.pack(matrix.indices[k])
+                chunk += (matrix.data[k] % prime).to_bytes(n8, "little")
+        f.write(chunk)
+
+    # Labels: the circuit wire ID behind each variable
+    f.write(_SECTION.pack(SECTION_WIRE_LABELS, 8 * r1cs.num_vars))
+    f.write(struct.pack(f"<{r1cs.num_vars}Q", *r1cs.wires))
+
+
+def write_wtns(witness, path, prime=None):
+    """
+    Writes a witness (FieldVector, FieldElements or ints) in circom's .wtns
+    format. The prime is taken from the witness unless given.
+    """
+    if isinstance(witness, FieldVector):
+        values, prime = witness.values, prime or witness.prime
+    else:
+        values = []
+        for x in witness:
+            if isinstance(x, FieldElement):
+                prime = prime or x.prime
+                x = x.value
+            values.append(int(x))
+    if prime is None:
+        raise ValueError("write_wtns needs a prime: pass prime= or a FieldElement witness")
+
+    n8 = field_size(prime)
+    with open(path, "wb") as f:
+        _write_preamble(f, WTNS_MAGIC, WTNS_VERSION, 2)
+        header = _U32.pack(n8) + prime.to_bytes(n8, "little") + _U32.pack(len(values))
+        f.write(_SECTION.pack(SECTION_HEADER, len(header)))
+        f.write(header)
+        f.write(_SECTION.pack(SECTION_WITNESS, n8 * len(values)))
+        f.write(b"".join((v % prime).to_bytes(n8, "little") for v in values))
+
+
+class _MappedFile:
+    """
+    A read-only memory map of a sectioned circom file. Subclasses read their
+    own header fields in _read_header(); if anything in the header is bad,
+    the map and the file are closed before the error propagates.
+    """
+    def __init__(self, path, magic):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ValueError(f"{path}: empty file") from None
+
+        try:
+            if self.buffer[:4] != magic:
+                raise ValueError(f"{path}: not a {magic.decode()} file")
+            self._read_sections()
+            self._read_header()
+        except struct.error as exc:  # An unpack ran off the end of the file
+            self.close()
+            raise ValueError(f"{path}: truncated or malformed header ({exc})") from None
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_sections(self):
+        self.version = _U32.unpack_from(self.buffer, 4)[0]
+        num_sections = _U32.unpack_from(self.buffer, 8)[0]
+
+        # Section type -> (payload offset, size); only the 12-byte headers are read
+        self.sections = {}
+        offset = 12
+        for _ in range(num_sections):
+            kind, size = _SECTION.unpack_from(self.buffer, offset)
+            if offset + _SECTION.size + size > len(self.buffer):
+                raise ValueError(f"{self.path}: section {kind} runs past the end of the file")
+            self.sections.setdefault(kind, (offset + _SECTION.size, size))
+            offset += _SECTION.size + size
+
+    def section(self, kind):
+        if kind not in self.sections:
+            raise ValueError(f"{self.path}: missing section {kind}")
+        return self.sections[kind]
+
+    def _read_field_header(self):
+        offset, _ = self.section(SECTION_HEADER)
+        self.n8 = _U32.unpack_from(self.buffer, offset)[0]
+        self.prime = int.from_bytes(self.buffer[offset + 4:offset + 4 + self.n8], "little")
+        return offset + 4 + self.n8
+
+    def close(self):
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class R1CSFile(_MappedFile):
+    """
+    A memory-mapped .r1cs file. Header fields are read eagerly; constraints
+    are decoded lazily, one at a time, as (A, B, C) lists of (wire, coeff).
+    """
+    def __init__(self, path):
+        self._offsets = None  # Byte offset of every constraint, built on first random access
+        super().__init__(path, R1CS_MAGIC)
+
+    def _read_header(self):
+        offset = self._read_field_header()
+        (self.num_vars, self.num_outputs, self.num_public_inputs, self.num_private_inputs,
+         self.num_labels, self.num_constraints) = _R1CS_COUNTS.unpack_from(self.buffer, offset)
+
+    @property
+    def num_public(self):
+        return self.num_outputs + self.num_public_inputs
+
+    def __len__(self):
+        return self.num_constraints
+
+    def _read_lc(self, offset):
+        buf, n8 = self.buffer, self.n8
+        nnz = _U32.unpack_from(buf, offset)[0]
+        offset += 4
+        lc = []
+        for _ in range(nnz):
+            wire = _U32.unpack_from(buf, offset)[0]
+            lc.append((wire, int.from_bytes(buf[offset + 4:offset + 4 + n8], "little")))
+            offset += 4 + n8
+        return lc, offset
+
+    def _read_constraint(self, offset):
+        a, offset = self._read_lc(offset)
+        b, offset = self._read_lc(offset)
+        c, offset = self._read_lc(offset)
+        return (a, b, c), offset
+
+    def constraints(self):
+        """Lazily yields every constraint as (A, B, C) lists of (wire, coeff)."""
+        offset, _ = self.section(SECTION_CONSTRAINTS)
+        for _ in range(self.num_constraints):
+            constraint, offset = self._read_constraint(offset)
+            yield constraint
+
+    def __iter__(self):
+        return self.constraints()
+
+    def _skip_lc(self, offset):
+        nnz = _U32.unpack_from(self.buffer, offset)[0]
+        return offset + 4 + nnz * (4 + self.n8)
+
+    def __getitem__(self, i):
+        if not -self.num_constraints <= i < self.num_constraints:
+            raise IndexError("constraint index out of range")
+        if self._offsets is None:
+            # Constraints are variable-length: one skim over the nnz counts
+            offset, _ = self.section(SECTION_CONSTRAINTS)
+            self._offsets = array('q')
+            for _ in range(self.num_constraints):
+                self._offsets.append(offset)
+                offset = self._skip_lc(self._skip_lc(self._skip_lc(offset)))
+        return self._read_constraint(self._offsets[i])[0]
+
+    def wire_labels(self):
+        """The label (circuit wire ID) of every variable, if the file has them."""
+        offset, size = self.section(SECTION_WIRE_LABELS)
+        return list(struct.unpack_from(f"<{size // 8}Q", self.buffer, offset))
+
+    def matrices(self):
+        """Materializes (A, B, C) as SparseMatrix objects."""
+        A, B, C = (SparseMatrix(self.num_vars) for _ in range(3))
+        for a, b, c in self.constraints():
+            A.append_row(a)
+            B.append_row(b)
+            C.append_row(c)
+        return A, B, C
+
+    def unsatisfied_constraints(self, witness, first_only=False):
+        """
+        Streams the constraints and returns the indices where
+        (A.w) * (B.w) != (C.w). witness is any indexable sequence of ints
+        (e.g. a WTNSFile), so neither side has to be loaded into memory.
+        """
+        if len(witness) != self.num_vars:
+            raise ValueError(f"Witness has {len(witness)} entries, expected {self.num_vars}")
+        p = self.prime
+        dot = lambda lc: sum(coeff * witness[wire] for wire, coeff in lc)
+        failed = []
+        for i, (a, b, c) in enumerate(self.constraints()):
+            if (dot(a) * dot(b) - dot(c)) % p:
+                failed.append(i)
+                if first_only:
+                    break
+        return failed
+
+    def is_satisfied(self, witness):
+        return not self.unsatisfied_constraints(witness, first_only=True)
+
+
+class WTNSFile(_MappedFile):
+    """
+    A memory-mapped .wtns file: a read-only sequence of ints, decoded on
+    access, usable anywhere a witness list of ints is.
+    """
+    def __init__(self, path):
+        super().__init__(path, WTNS_MAGIC)
+
+    def _read_header(self):
+        offset = self._read_field_header()
+        self.num_values = _U32.unpack_from(self.buffer, offset)[0]
+        self._start, size = self.section(SECTION_WITNESS)
+        if size < self.num_values * self.n8:
+            raise ValueError(f"{self.path}: witness section holds fewer than {self.num_values} values")
+
+    def __len__(self):
+        return self.num_values
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.num_values
+        if not 0 <= i < self.num_values:
+            raise IndexError("witness index out of range")
+        start = self._start + i * self.n8
+        return int.from_bytes(self.buffer[start:start + self.n8], "little")
+
+    def __iter__(self):
+        n8, buf = self.n8, self.buffer
+        for start in range(self._start, self._start + self.num_values * n8, n8):
+            yield int.from_bytes(buf[start:start + n8], "little")
+
+    def to_vector(self):
+        """Loads the witness as a FieldVector over the file's prime."""
+        return FieldVector(list(self), PrimeField(self.prime))
+
+
+def read_r1cs(path):
+    return R1CSFile(path)
+
+
+def read_wtns(path):
+    return WTNSFile(path)
@@ -0,0 +1,493 @@
+"""
+A long-running proving service: newline-delimited JSON over a Unix socket
+or localhost TCP.
+
+    -> {"id": 1, "op": "prove", "circuit": "id_card", "inputs": {"dob": 1990}}
+    <- {"id": 1, "ok": true, "result": {"proof": "<hex>", "public": ["15"]}}
+
+ops
+    witness    inputs         -> {"witness": [...]}
+    check      inputs         -> {"satisfied": bool, "failed": [constraint indices]}
+    prove      inputs         -> {"proof": hex, "public": [...]}   (Groth16 over BN254)
+    verify     proof, public  -> {"valid": bool}
+    circuits                  -> {"circuits": [names]}
+    stats                     -> request / batch counters
+
+Field values go out as decimal strings (most JSON clients lose precision
+past 2^53); inputs may be JSON integers or decimal strings. Failures come
+back as {"id": ..., "ok": false, "error": "..."}. Every response carries its
+request's id and they may arrive out of order, so a connection can pipeline.
+
+Staying warm: each worker process compiles a circuit once (R1CS, witness
+tape, QAP precomputation, Groth16 keys) and keeps it for its lifetime.
+Groth16 setup runs once per circuit, on first use, into a KeyCache
+directory that every worker then loads from, so all proofs verify under
+the same key.
+
+Batching: requests for the same (circuit, op) are queued together and
+dispatched as one batch of up to max_batch jobs: one pool round trip, and
+the witnesses of a batch come from one generate_batch() pass over the tape.
+A batch waits at most max_delay for company when the pool is idle; when it
+is busy, requests pile up in the queue and the next batch takes them all.
+
+Backpressure: at most 2 batches per worker are in the pool, and at most
+max_pending requests are admitted. Past that a connection's reader stops
+reading, so clients are slowed by ordinary socket flow control instead of
+the service buffering without bound.
+
+    python -m src.service --socket /tmp/zksnark.sock --key-cache keys/
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+
+from src import groth16
+from src.circuits import REGISTRY
+from src.curve import CURVE_ORDER
+from src.finite_field import FieldElement, PrimeField
+from src.qap import QAP
+from src.r1cs import R1CS
+from src.witness import WitnessGenerator
+
+logger = logging.getLogger(__name__)
+
+PRIME = CURVE_ORDER
+OPS = ("witness", "check", "prove", "verify")
+KEYED_OPS = ("prove", "verify")
+MAX_LINE = 1 << 24  # Longest request line accepted (bytes)
+
+
+class JobError(Exception):
+    """A request the service could not run: bad input, unknown circuit or op, ..."""
+
+
+# --- Worker side (runs in the pool processes) ---
+
+class _Compiled:
+    """Everything a worker keeps warm for one circuit."""
+    def __init__(self, builder, key_dir):
+        self.circuit = builder()
+        self.r1cs = R1CS(self.circuit)
+        self.generator = WitnessGenerator(self.circuit, self.r1cs)
+        self.field = PrimeField(PRIME)
+        self.keys = groth16.KeyCache(key_dir)
+        QAP.precompute(self.r1cs, PRIME, bind_public=True)
+
+
+_compiled = {}  # Per worker process: circuit name -> _Compiled
+
+
+def _compile(name, builder, key_dir):
+    entry = _compiled.get(name)
+    if entry is None:
+        logger.info("Compiling circuit %s", name)
+        entry = _compiled[name] = _Compiled(builder, key_dir)
+    return entry
+
+
+def _ensure_keys(name, builder, key_dir):
+    """Runs (or loads) Groth16 setup for a circuit; returns the key digest."""
+    entry = _compile(name, builder, key_dir)
+    return entry.keys.get(entry.r1cs)[0].digest
+
+
+# Every op returns one outcome per job, ("ok", result) or ("error", message),
+# so a bad job fails on its own and the rest of its batch runs exactly once.
+
+def _error(exc):
+    return str(exc) if isinstance(exc, JobError) else f"{type(exc).__name__}: {exc}"
+
+
+def _attempt(fn, *args):
+    try:
+        return ("ok", fn(*args))
+    except Exception as exc:
+        return ("error", _error(exc))
+
+
+def _each(outcomes, fn):
+    """Applies fn to every successful outcome; an exception fails only that job."""
+    return [_attempt(fn, value) if status == "ok" else (status, value) for status, value in outcomes]
+
+
+def _field_inputs(entry, payload):
+    inputs = payload.get("inputs")
+    if not isinstance(inputs, dict):
+        raise JobError("'inputs' must be an object mapping input names to values")
+    missing = [name for name in entry.generator.input_slots if name not in inputs]
+    if missing:
+        raise JobError(f"missing input {missing[0]!r}")
+    return {name: FieldElement(_field_value(name, value), entry.field) for name, value in inputs.items()}
+
+
+def _field_value(name, value):
+    """A JSON integer or decimal string as an int; anything else (1990.7, true, ...) is rejected."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value, 10)
+        except ValueError:
+            pass
+    raise JobError(f"input {name!r} must be an integer or a decimal string, got {value!r}")
+
+
+def _witnesses(entry, payloads):
+    """Witness outcomes: inputs are checked per job, then the valid ones share one generate_batch() pass."""
+    parsed = [_attempt(_field_inputs, entry, p) for p in payloads]
+    generated = iter(entry.generator.generate_batch([inputs for status, inputs in parsed if status == "ok"]))
+    return [(status, next(generated) if status == "ok" else value) for status, value in parsed]
+
+
+def _op_witness(entry, payloads):
+    return _each(_witnesses(entry, payloads), lambda w: {"witness": [str(v) for v in w.values]})
+
+
+def _op_check(entry, payloads):
+    def check(w):
+        failed = entry.r1cs.unsatisfied_constraints(w)
+        return {"satisfied": not failed, "failed": failed}
+    return _each(_witnesses(entry, payloads), check)
+
+
+def _op_prove(entry, payloads):
+    pk, _ = entry.keys.get(entry.r1cs)
+    num_public = entry.r1cs.num_public
+
+    def prove(w):
+        failed = entry.r1cs.unsatisfied_constraints(w, first_only=True)
+        if failed:
+            raise JobError(f"inputs do not satisfy constraint {failed[0]}")
+        # The pool already spreads jobs over the cores: the MSMs stay in this worker
+        proof = groth16.prove(pk, entry.r1cs, w, workers=1)
+        return {"proof": proof.to_bytes().hex(), "public": [str(v) for v in w.values[1:num_public + 1]]}
+    return _each(_witnesses(entry, payloads), prove)
+
+
+def _op_verify(entry, payloads):
+    _, vk = entry.keys.get(entry.r1cs)
+
+    def verify(payload):
+        proof = groth16.Proof.from_bytes(bytes.fromhex(payload["proof"]))
+        public = [int(x) for x in payload["public"]]
+        # Points come from the client: reject anything off the curve or outside G2's subgroup
+        valid = (proof.a.is_on_curve() and proof.c.is_on_curve() and proof.b.is_on_curve()
+                 and proof.b.in_subgroup() and groth16.verify(vk, public, proof))
+        return {"valid": valid}
+    return _each([("ok", payload) for payload in payloads], verify)
+
+
+_BATCH_OPS = {"witness": _op_witness, "check": _op_check, "prove": _op_prove, "verify": _op_verify}
+
+
+def _run_batch(name, builder, key_dir, op, payloads):
+    """Worker entry point: runs one batch, returning ("ok", result) or ("error", message) per job."""
+    try:
+        return _BATCH_OPS[op](_compile(name, builder, key_dir), payloads)
+    except Exception as exc:  # Nothing job-specific: compiling or loading keys failed
+        return [("error", _error(exc))] * len(payloads)
+
+
+# --- Service (asyncio side) ---
+
+class ProvingService:
+    """
+    circuits maps names to zero-argument builders returning a FlatCircuit
+    (module-level functions, so they can be sent to worker processes);
+    defaults to src.circuits.REGISTRY. key_dir defaults to a temporary
+    directory that is removed on close(). workers is the pool size (default:
+    all cores); when passing an executor, pass its size too, since it sets
+    how many batches are kept in flight.
+    """
+    def __init__(self, circuits=None, workers=None, key_dir=None, max_batch=32, max_delay=0.002,
+                 max_pending=1024, executor=None):
+        self.circuits = dict(REGISTRY if circuits is None else circuits)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._own_key_dir = key_dir is None
+        self.key_dir = key_dir or tempfile.mkdtemp(prefix="zksnark-keys-")
+        self._own_pool = executor is None
+        self._pool = executor or ProcessPoolExecutor(max_workers=self.workers)
+
+        self._admission = asyncio.Semaphore(max_pending)
+        self._in_flight = asyncio.Semaphore(2 * self.workers)
+        self._queues = {}    # (circuit, op) -> asyncio.Queue of (payload, future)
+        self._batchers = {}  # (circuit, op) -> task draining that queue
+        self._tasks = set()  # Running batches
+        self._key_locks = {}
+        self._keys_ready = set()
+        self._servers = []
+        self.stats = {"requests": 0, "errors": 0, "batches": 0, "jobs": 0}
+
+    # --- Requests ---
+
+    async def submit(self, request):
+        """Runs one request (a dict) and returns the response dict a connection would get."""
+        async with self._admission:
+            return await self._handle(request)
+
+    async def _handle(self, request):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        self.stats["requests"] += 1
+        try:
+            result = await self._dispatch(request)
+        except JobError as exc:
+            self.stats["errors"] += 1
+            return {"id": request_id, "ok": False, "error": str(exc)}
+        return {"id": request_id, "ok": True, "result": result}
+
+    async def _dispatch(self, request):
+        if not isinstance(request, dict):
+            raise JobError("a request must be a JSON object")
+        op = request.get("op")
+        if op == "circuits":
+            return {"circuits": sorted(self.circuits)}
+        if op == "stats":
+            return dict(self.stats)
+        if op not in OPS:
+            raise JobError(f"unknown op {op!r}; expected one of {', '.join(OPS + ('circuits', 'stats'))}")
+        name = request.get("circuit")
+        if name not in self.circuits:
+            raise JobError(f"unknown circuit {name!r}")
+        if op in KEYED_OPS:
+            await self._ensure_keys(name)
+
+        key = (name, op)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._batchers[key] = asyncio.create_task(self._batcher(name, op, queue))
+        payload = {k: v for k, v in request.items() if k not in ("id", "op", "circuit")}
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((payload, future))
+        status, value = await future
+        if status == "error":
+            raise JobError(value)
+        return value
+
+    async def _ensure_keys(self, name):
+        if name in self._keys_ready:
+            return
+        lock = self._key_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if name in self._keys_ready:
+                return
+            loop = asyncio.get_running_loop()
+            try:
+                digest = await loop.run_in_executor(
+                    self._pool, _ensure_keys, name, self.circuits[name], self.key_dir)
+            except Exception as exc:
+                raise JobError(f"setup for {name!r} failed: {_error(exc)}") from exc
+            logger.info("Groth16 keys for %s ready (%s)", name, digest[:16])
+            self._keys_ready.add(name)
+
+    async def warm(self, *names):
+        """Compiles the named circuits (default: all) and runs their setup ahead of traffic."""
+        await asyncio.gather(*(self._ensure_keys(name) for name in names or self.circuits))
+
+    # --- Batching ---
+
+    async def _batcher(self, name, op, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # While every pool slot is busy, more requests gather in the queue
+            await self._in_flight.acquire()
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.create_task(self._run(name, op, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, name, op, batch):
+        try:
+            loop = asyncio.get_running_loop()
+            payloads = [payload for payload, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._pool, _run_batch, name, self.circuits[name], self.key_dir, op, payloads)
+            except Exception as exc:  # A worker died, or the batch could not be sent
+                logger.exception("Batch of %d %s/%s jobs failed", len(batch), name, op)
+                results = [("error", _error(exc))] * len(batch)
+            self.stats["batches"] += 1
+            self.stats["jobs"] += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight.release()
+
+    # --- Connections ---
+
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        """Listens on a Unix socket at path, or on TCP host:port; returns the asyncio server."""
+        if path:
+            server = await asyncio.start_unix_server(self._serve_connection, path=path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self._serve_connection, host, port, limit=MAX_LINE)
+        self._servers.append(server)
+        logger.info("Serving on %s", path or server.sockets[0].getsockname())
+        return server
+
+    async def _serve_connection(self, reader, writer):
+        pending = set()
+        try:
+            while True:
+                # Backpressure: no new line is read until a request slot frees up
+                await self._admission.acquire()
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):  # Reset, or a line over MAX_LINE
+                    line = b""
+                if not line:
+                    self._admission.release()
+                    break
+                task = asyncio.create_task(self._respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(self, line, writer):
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as exc:
+                response = {"id": None, "ok": False, "error": f"invalid JSON: {exc}"}
+            else:
+                response = await self._handle(request)
+            writer.write(json.dumps(response).encode() + b"\n")
+            with suppress(ConnectionError):
+                await writer.drain()
+        finally:
+            self._admission.release()
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        for task in self._batchers.values():
+            task.cancel()
+        await asyncio.gather(*self._batchers.values(), *self._tasks, return_exceptions=True)
+        if self._own_pool:
+            self._pool.shutdown(cancel_futures=True)
+        if self._own_key_dir:
+            shutil.rmtree(self.key_dir, ignore_errors=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class Client:
+    """
+    A minimal client. call() sends one request and waits for its response;
+    concurrent calls share the connection and are matched up by id.
+    """
+    def __init__(self, reader, writer):
+        self._reader, self._writer = reader, writer
+        self._next_id = 0
+        self._waiting = {}  # id -> future
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, path=None, host="127.0.0.1", port=None):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._waiting.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("service closed the connection"))
+            self._waiting.clear()
+
+    async def call(self, op, **fields):
+        """Returns the request's result; raises JobError if the service reports a failure."""
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode() + b"\n")
+        await self._writer.drain()
+        response = await future
+        if not response["ok"]:
+            raise JobError(response["error"])
+        return response["result"]
+
+    async def close(self):
+        self._writer.close()
+        with suppress(ConnectionError):
+            await self._writer.wait_closed()
+        self._listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._listener
+
+
+async def _serve(args):
+    service = ProvingService(workers=args.workers, key_dir=args.key_cache, max_batch=args.max_batch,
+                             max_delay=args.max_delay_ms / 1000, max_pending=args.max_pending)
+    async with service:
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)  # Stale socket from a previous run
+        server = await service.start(path=args.socket, host=args.host, port=args.port)
+        await service.warm()
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Groth16 proving service (newline-delimited JSON)")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--socket", metavar="PATH", help="Listen on a Unix socket")
+    where.add_argument("--port", type=int, help="Listen on localhost TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--key-cache", metavar="DIR",
+                        help="Keep Groth16 keys in DIR across restarts (default: a temporary directory)")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0,
+                        help="How long an idle-pool batch waits for more requests")
+    parser.add_argument("--max-pending", type=int, default=1024,
+                        help="Requests admitted at once before connections are slowed down")
+    args = parser.parse_args(argv)
+    # Service events at INFO; the per-batch library chatter stays quiet
+    logging.basicConfig(format="%(asctime)s %(name)s %(message)s", level=logging.WARNING)
+    logger.setLevel(logging.INFO)
+    with suppress(KeyboardInterrupt):
+        asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
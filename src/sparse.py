@@ -0,0 +1,150 @@
+from array import array
+
+
+class SparseMatrix:
+    """
+    A row-major sparse matrix in CSR (Compressed Sparse Row) form.
+
+    Row i's nonzeros live in indices[indptr[i]:indptr[i+1]] (column numbers)
+    and data[indptr[i]:indptr[i+1]] (coefficients). An R1CS gate has at most
+    a handful of nonzeros per row, so memory is O(nnz) instead of
+    O(rows * cols) for the dense lists we used to build.
+    """
+    def __init__(self, num_cols=0):
+        self.num_cols = num_cols
+        self.indptr = array('q', [0])
+        self.indices = array('q')
+        # Coefficients stay in a compact int64 array until one doesn't fit
+        # (e.g. a full-size field constant), then we fall back to a list
+        self.data = array('q')
+        self._columns = None  # Lazily built CSC view for column iteration
+
+    @classmethod
+    def from_dense(cls, rows):
+        matrix = cls(len(rows[0]) if rows else 0)
+        for row in rows:
+            matrix.append_row((j, c) for j, c in enumerate(row) if c != 0)
+        return matrix
+
+    @property
+    def num_rows(self):
+        return len(self.indptr) - 1
+
+    @property
+    def shape(self):
+        return (self.num_rows, self.num_cols)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def __len__(self):
+        return self.num_rows
+
+    def append_row(self, entries):
+        """
+        Appends a row given as (column, coefficient) pairs.
+        Repeated columns are summed (x + x -> 2x) and zeros are dropped.
+        """
+        merged = {}
+        for col, coeff in entries:
+            merged[col] = merged.get(col, 0) + coeff
+
+        for col in sorted(merged):
+            coeff = merged[col]
+            if coeff == 0:
+                continue
+            self.indices.append(col)
+            try:
+                self.data.append(coeff)
+            except (OverflowError, TypeError):
+                self.data = list(self.data)
+                self.data.append(coeff)
+            if col >= self.num_cols:
+                self.num_cols = col + 1
+
+        self.indptr.append(len(self.indices))
+        self._columns = None
+
+    def permute_columns(self, index, num_cols):
+        """
+        A copy with column j renamed to index[j]. Rows keep their order, and
+        each row's entries are re-sorted by their new column, as append_row()
+        leaves them: O(nnz log k) for rows of k nonzeros.
+        Used to map wire IDs onto the final R1CS variable layout.
+        """
+        matrix = SparseMatrix(num_cols)
+        matrix.indptr = array('q', self.indptr)
+        indices, data = [], []
+        for i in range(self.num_rows):
+            start, end = self.indptr[i], self.indptr[i + 1]
+            row = sorted(zip([index[j] for j in self.indices[start:end]], self.data[start:end]))
+            indices.extend(col for col, _ in row)
+            data.extend(coeff for _, coeff in row)
+        matrix.indices = array('q', indices)
+        matrix.data = array('q', data) if isinstance(self.data, array) else data
+        return matrix
+
+    def row(self, i):
+        """Iterates (column, coefficient) for the nonzeros of row i."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[start:end], self.data[start:end])
+
+    def rows(self):
+        """Iterates every row as a list of (column, coefficient) pairs."""
+        for i in range(self.num_rows):
+            yield list(self.row(i))
+
+    def column(self, j):
+        """Iterates (row, coefficient) for the nonzeros of column j."""
+        if self._columns is None:
+            self._build_columns()
+        col_ptr, col_rows, col_data = self._columns
+        if j >= self.num_cols:
+            return iter(())
+        start, end = col_ptr[j], col_ptr[j + 1]
+        return zip(col_rows[start:end], col_data[start:end])
+
+    def _build_columns(self):
+        # Counting sort of the nonzeros by column: O(nnz + cols)
+        counts = [0] * (self.num_cols + 1)
+        for col in self.indices:
+            counts[col + 1] += 1
+        for j in range(self.num_cols):
+            counts[j + 1] += counts[j]
+
+        col_ptr = array('q', counts)
+        cursor = list(counts)
+        col_rows = array('q', [0]) * self.nnz
+        col_data = [0] * self.nnz
+        for i in range(self.num_rows):
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                col = self.indices[k]
+                col_rows[cursor[col]] = i
+                col_data[cursor[col]] = self.data[k]
+                cursor[col] += 1
+        self._columns = (col_ptr, col_rows, col_data)
+
+    def dot(self, vector, prime=None):
+        """
+        Sparse mat-vec product: returns [row_i . vector] as ints.
+        vector holds ints; results are reduced mod prime if one is given.
+        """
+        indptr, indices, data = self.indptr, self.indices, self.data
+        out = [0] * self.num_rows
+        for i in range(self.num_rows):
+            acc = 0
+            for k in range(indptr[i], indptr[i + 1]):
+                acc += data[k] * vector[indices[k]]
+            out[i] = acc % prime if prime else acc
+        return out
+
+    def to_dense(self):
+        """Exports the matrix as a list of dense Python lists (for debugging)."""
+        dense = []
+        for i in range(self.num_rows):
+            vec = [0] * self.num_cols
+            for col, coeff in self.row(i):
+                vec[col] = coeff
+            dense.append(vec)
+        return dense
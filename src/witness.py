@@ -1,47 +1,233 @@
-import numpy as np
+import heapq
+import logging
+from array import array
+
+from src.circuit import OP_ADD, OP_SUB
+from src.finite_field import FieldElement, FieldVector
+from src.instrument import stage
+
+logger = logging.getLogger(__name__)
+
 
 class WitnessGenerator:
     def __init__(self, circuit, r1cs):
         self.circuit = circuit
         self.r1cs = r1cs
-        # Start with the constant 'one': 1
-        self.values = {circuit.one: 1}
+        self._compile()
+        self._last = None      # (registers, witness values, field) of the latest generate()/update()
+        self._readers = None   # slot -> gates reading it (CSR), built on first update()
+
+    def _compile(self):
+        """
+        Turns the circuit's gate arrays into an integer instruction tape.
+
+        The register file has one slot per wire ID (slot 0 is the constant
+        'one'), followed by one pre-filled slot per constant operand, so every
+        gate is (opcode, left slot, right slot, output slot) and evaluating the
+        circuit is a loop over four int arrays: no string dispatch and no dict
+        lookups per gate.
+        """
+        c = self.circuit
+        n = c.num_wires
+        slot = lambda ref: ref if ref >= 0 else n + ~ref
+        self.ops = array('B', c.gate_ops)
+        self.lefts = array('q', [slot(ref) for ref in c.gate_lefts])
+        self.rights = array('q', [slot(ref) for ref in c.gate_rights])
+        self.outputs = array('q', c.gate_outputs)
+        self.num_slots = n + len(c.constants)
+        self.constant_slots = {n + k: value for k, value in enumerate(c.constants)}
+
+        # Inputs: declared ones, plus any wire a gate reads before anything writes it
+        read = set(w for w in c.gate_lefts if w > 0)
+        read.update(w for w in c.gate_rights if w > 0)
+        inputs = c.public_inputs + c.private_inputs
+        declared = set(inputs)
+        inputs += sorted(w for w in read if not c.produced[w] and w not in declared)
+        self.input_slots = {c.name_of(w): w for w in inputs}  # name -> slot
+
+        # Flatten into a Vector (ordered by R1CS layout): witness[idx] = regs[gather[idx]]
+        self.gather = array('q', self.r1cs.wires)
+        # Folded wires are still computed by the tape, just not gathered
+
+    def _field_of(self, input_map):
+        return next((v.field for v in input_map.values() if isinstance(v, FieldElement)), None)
+
+    def _load_inputs(self, input_map, prime):
+        """Returns {slot: int value} for every circuit input and constant operand."""
+        loaded = {slot: val % prime if prime else val for slot, val in self.constant_slots.items()}
+        for name, slot in self.input_slots.items():
+            # Inputs can be keyed by name or by Wire
+            val = input_map.get(name, input_map.get(slot))
+            if val is None:
+                raise ValueError(f"Error: Missing input '{name}'")
+            val = val.value if isinstance(val, FieldElement) else int(val)
+            loaded[slot] = val % prime if prime else val
+        return loaded
 
     def generate(self, input_map):
         """
-        Takes a dictionary of initial values (e.g., {'1990': 1990})
+        Takes a dictionary of initial values (e.g., {'dob': 1990})
         and computes the full witness vector.
+
+        The generator can be reused for any number of input sets. It keeps
+        the registers of the latest call so update() can start from them.
+        """
+        field = self._field_of(input_map)
+        prime = field.prime if field else None
+
+        with stage("witness.generate", gates=len(self.ops), field_ops=len(self.ops)):
+            # 1. Load the initial inputs (Private & Public) and the constants
+            regs = [0] * self.num_slots
+            regs[0] = 1
+            for slot, val in self._load_inputs(input_map, prime).items():
+                regs[slot] = val
+
+            # 2. Run the tape to find intermediate values
+            logger.info(">>> Computing Trace (%d gates)...", len(self.ops))
+            for op, l, r, o in zip(self.ops, self.lefts, self.rights, self.outputs):
+                if op == OP_ADD:
+                    res = regs[l] + regs[r]
+                elif op == OP_SUB:
+                    res = regs[l] - regs[r]
+                else:
+                    # MUL, or SCALE whose right slot holds the constant
+                    res = regs[l] * regs[r]
+                regs[o] = res % prime if prime else res
+
+            witness_vec = [regs[s] for s in self.gather]
+
+        self._last = (regs, witness_vec, field)
+        return self._wrap(witness_vec, field)
+
+    @staticmethod
+    def _wrap(values, field):
+        # Field inputs -> one compact FieldVector; plain int inputs -> plain list.
+        # Either way the caller gets its own copy: the cached values keep changing.
+        if field is None:
+            return list(values)
+        vec = FieldVector.zeros(0, field)
+        vec.values = list(values)  # Already reduced
+        return vec
+
+    def _reader_index(self):
+        """CSR index from each slot to the gates reading it (in tape order)."""
+        if self._readers is None:
+            counts = [0] * (self.num_slots + 1)
+            for l, r in zip(self.lefts, self.rights):
+                counts[l + 1] += 1
+                counts[r + 1] += 1
+            for i in range(self.num_slots):
+                counts[i + 1] += counts[i]
+            offsets = array('q', counts)
+            readers = array('q', bytes(8 * counts[-1]))
+            fill = counts[:-1]
+            for g, (l, r) in enumerate(zip(self.lefts, self.rights)):
+                readers[fill[l]] = g
+                fill[l] += 1
+                readers[fill[r]] = g
+                fill[r] += 1
+            self._readers = (offsets, readers)
+        return self._readers
+
+    def update(self, changed_inputs):
         """
-        # 1. Load the initial inputs (Private & Public)
-        self.values.update(input_map)
-
-        # 2. Re-run the circuit logic to find intermediate values
-        print(">>> Computing Trace...")
-        for op in self.circuit.operations:
-            # Fetch values for left and right inputs
-            val_left = self.values[op['left']]
-            val_right = self.values[op['right']]
-            
-            # Compute the output based on the op
-            if op['op'] == 'ADD':
-                res = val_left + val_right
-            elif op['op'] == 'SUB':
-                res = val_left - val_right
-            elif op['op'] == 'MUL':
-                res = val_left * val_right
-            else:
-                raise ValueError(f"Unknown Op: {op['op']}")
-            
-            # Store the result
-            self.values[op['output']] = res
-            print(f"    {op['left']}({val_left}) {op['op']} {op['right']}({val_right}) -> {op['output']}({res})")
-
-        # 3. Flatten into a Vector (ordered by R1CS var_map)
-        witness_vec = [0] * self.r1cs.num_vars
-        for var_name, idx in self.r1cs.var_map.items():
-            if var_name in self.values:
-                witness_vec[idx] = self.values[var_name]
-            else:
-                 raise ValueError(f"Error: Variable '{var_name}' was never computed!")
-                 
-        return np.array(witness_vec)
\ No newline at end of file
+        Recomputes the latest witness (from generate() or update()) with some
+        inputs changed, re-running only the gates downstream of them.
+
+        The tape is in topological order, so the gates to redo are popped off
+        a heap by tape index: every gate runs after everything it reads. A
+        gate whose output comes out unchanged doesn't wake its readers, so
+        the work is bounded by the cone of values that actually changed.
+
+        Returns (witness, dirty): the new witness and the set of witness
+        indices whose value changed.
+        """
+        if self._last is None:
+            raise ValueError("update() needs a witness to start from: call generate() first")
+        regs, values, field = self._last
+        prime = field.prime if field else None
+        offsets, readers = self._reader_index()
+        index = self.r1cs.index
+        slots = set(self.input_slots.values())
+
+        heap, queued, dirty = [], set(), set()
+
+        def changed(slot, value):
+            regs[slot] = value
+            if slot < len(index) and index[slot] >= 0:
+                values[index[slot]] = value
+                dirty.add(index[slot])
+            for k in range(offsets[slot], offsets[slot + 1]):
+                g = readers[k]
+                if g not in queued:
+                    queued.add(g)
+                    heapq.heappush(heap, g)
+
+        for key, val in changed_inputs.items():
+            slot = self.input_slots.get(key) if isinstance(key, str) else key
+            if slot not in slots:
+                raise ValueError(f"Error: '{key}' is not an input")
+            val = val.value if isinstance(val, FieldElement) else int(val)
+            val = val % prime if prime else val
+            if regs[slot] != val:
+                changed(slot, val)
+
+        ops, lefts, rights, outputs = self.ops, self.lefts, self.rights, self.outputs
+        with stage("witness.update") as rec:
+            recomputed = 0
+            while heap:
+                g = heapq.heappop(heap)
+                recomputed += 1
+                op, l, r = ops[g], regs[lefts[g]], regs[rights[g]]
+                if op == OP_ADD:
+                    res = l + r
+                elif op == OP_SUB:
+                    res = l - r
+                else:
+                    res = l * r
+                if prime:
+                    res %= prime
+                if regs[outputs[g]] != res:
+                    changed(outputs[g], res)
+            rec["gates"] = rec["field_ops"] = recomputed
+        logger.debug("Witness update: %d gates rerun, %d entries changed", recomputed, len(dirty))
+        return self._wrap(values, field), dirty
+
+    def generate_batch(self, input_maps):
+        """
+        Computes witnesses for many input sets in one pass over the tape.
+
+        Each register holds one column of values (one entry per input set), so
+        the per-gate dispatch is paid once per gate instead of once per gate
+        per witness. Returns the witness matrix as a list of rows (one
+        FieldVector, or list for int inputs, per input map).
+        """
+        if not input_maps:
+            return []
+        field = self._field_of(input_maps[0])
+        prime = field.prime if field else None
+        k = len(input_maps)
+
+        with stage("witness.generate_batch", gates=len(self.ops), witnesses=k, field_ops=len(self.ops) * k):
+            regs = [None] * self.num_slots
+            regs[0] = [1] * k
+            columns = [self._load_inputs(m, prime) for m in input_maps]
+            for slot in list(self.input_slots.values()) + list(self.constant_slots):
+                regs[slot] = [col[slot] for col in columns]
+
+            logger.info(">>> Computing %d traces (%d gates)...", k, len(self.ops))
+            for op, l, r, o in zip(self.ops, self.lefts, self.rights, self.outputs):
+                xs, ys = regs[l], regs[r]
+                if op == OP_ADD:
+                    res = [x + y for x, y in zip(xs, ys)]
+                elif op == OP_SUB:
+                    res = [x - y for x, y in zip(xs, ys)]
+                else:
+                    res = [x * y for x, y in zip(xs, ys)]
+                regs[o] = [v % prime for v in res] if prime else res
+
+            gathered = [regs[s] for s in self.gather]
+            rows = [list(row) for row in zip(*gathered)]
+        if field is None:
+            return rows
+        return [FieldVector(row, field) for row in rows]
@@ -0,0 +1,62 @@
+import importlib
+import random
+
+import pytest
+
+from src import field_backends
+from src.curve.fields import Q
+from src.finite_field import FieldElement, FieldVector, PrimeField, batch_inverse
+
+PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+BACKENDS = field_backends.available()
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        # Exercise the limb kernels even on short vectors
+        monkeypatch.setattr(importlib.import_module("src.field_backends.montgomery"), "MIN_LENGTH", 0)
+    previous = field_backends.current
+    yield field_backends.set_backend(request.param)
+    field_backends.current = previous
+
+
+def reference(name, *args):
+    return getattr(field_backends.get_backend("int"), name)(*args)
+
+
+@pytest.mark.parametrize("prime", [PRIME, Q, 2 ** 61 - 1, 97])
+def test_backend_matches_reference(backend, prime):
+    rng = random.Random(prime)
+    edges = [0, 1, 2, prime - 1, prime - 2, (1 << (prime.bit_length() - 1)) % prime]
+    a = edges + [rng.randrange(prime) for _ in range(50)]
+    b = list(reversed(edges)) + [rng.randrange(prime) for _ in range(50)]
+    for name in ("vec_add", "vec_sub", "vec_mul", "dot"):
+        assert getattr(backend, name)(a, b, prime) == reference(name, a, b, prime), name
+    assert backend.vec_neg(a, prime) == reference("vec_neg", a, prime)
+    for k in (0, 1, prime - 1, rng.randrange(prime)):
+        assert backend.vec_scale(a, k, prime) == reference("vec_scale", a, k, prime)
+    for x in a:
+        assert backend.inverse(x, prime) == (pow(x, prime - 2, prime))
+    assert backend.batch_inverse(a, prime, allow_zero=True) == reference("batch_inverse", a, prime, True)
+    with pytest.raises(ZeroDivisionError):
+        backend.batch_inverse(a, prime)
+
+
+def test_field_types_route_through_backend(backend):
+    field = PrimeField(PRIME)
+    rng = random.Random(7)
+    u = FieldVector([rng.randrange(PRIME) for _ in range(20)], field)
+    v = FieldVector([rng.randrange(1, PRIME) for _ in range(20)], field)
+    assert (u * v).values == [x * y % PRIME for x, y in zip(u.values, v.values)]
+    assert (u + v - v) == u and -(-u) == u and (u * 3).values == (3 * u).values
+    assert u.dot(v) == sum(x * y for x, y in zip(u.values, v.values)) % PRIME
+    assert all((x * y).value == 1 for x, y in zip(v, batch_inverse(v)))
+    assert FieldElement(6, PRIME) / FieldElement(3, PRIME) == 2
+    assert FieldElement(1, PRIME) / 0 == 0  # Fermat's x^(p-2) semantics are kept
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        field_backends.get_backend("fortran")
+    assert "int" in BACKENDS
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+import benchmark
+
+def test_fit_complexity_picks_the_growth_class():
+    quadratic = benchmark.fit_complexity([(n, 1e-6 * n * n) for n in (10, 100, 1000)])
+    assert quadratic["best_fit"] == "O(n^2)" and quadratic["exponent"] == pytest.approx(2)
+    linear = benchmark.fit_complexity([(n, 3e-4 * n) for n in (10, 100, 1000)])
+    assert linear["best_fit"] == "O(n)" and linear["exponent"] == pytest.approx(1)
+    assert benchmark.fit_complexity([(10, 0.1)]) == {"exponent": None, "best_fit": None}
+
+def test_baseline_regression_sets_exit_code(tmp_path):
+    current, baseline = tmp_path / "current.json", tmp_path / "baseline.json"
+    args = ["--max-gates", "100", "--max-poly", "10", "--max-curve", "10",
+            "--only", "circuit.build", "r1cs.build", "--output", str(current)]
+    benchmark.main(args)
+    report = json.loads(current.read_text())
+    assert set(report["results"]) == {"circuit.build", "r1cs.build"}
+    assert [p["n"] for p in report["results"]["r1cs.build"]["points"]] == [10, 100]
+
+    # Against itself, with generous limits: no regression, normal exit
+    baseline.write_text(current.read_text())
+    benchmark.main(args + ["--baseline", str(baseline), "--threshold", "100", "--exponent-slack", "10"])
+
+    # A baseline that got much faster with n: the growth exponent regressed
+    for res in report["results"].values():
+        res["points"][0]["seconds"], res["points"][1]["seconds"] = 1.0, 1e-6
+    baseline.write_text(json.dumps(report))
+    with pytest.raises(SystemExit) as exit_info:
+        benchmark.main(args + ["--baseline", str(baseline)])
+    assert exit_info.value.code == 1
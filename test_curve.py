@@ -0,0 +1,87 @@
+import importlib
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src import pool
+from src.curve import (CURVE_ORDER, G1_GENERATOR, G2_GENERATOR, G1Point, FixedBaseTable, Fq2,
+                       wnaf)
+
+def naive_mul(point, k):
+    acc, addend = point.infinity(), point
+    while k:
+        if k & 1:
+            acc = acc + addend
+        addend = addend.double()
+        k >>= 1
+    return acc
+
+def test_generators_and_group_law():
+    for g in (G1_GENERATOR, G2_GENERATOR):
+        assert g.is_on_curve() and g.in_subgroup()
+        assert g * 3 + g * 5 == g * 8 == (g * 4).double()
+        assert (g - g).is_infinity() and g + g.infinity() == g
+        assert (g * (CURVE_ORDER - 1)) == -g
+
+def test_wnaf_and_fixed_base_match_double_and_add():
+    rng = random.Random(1)
+    for g in (G1_GENERATOR, G2_GENERATOR):
+        table = FixedBaseTable(g, window=6)
+        for k in [0, 1, 2, 31, 32, CURVE_ORDER - 2] + [rng.randrange(CURVE_ORDER) for _ in range(3)]:
+            expected = naive_mul(g, k)
+            assert g * k == expected
+            assert table.mul(k) == expected
+    digits = wnaf(0b1011101, 4)
+    assert sum(d << i for i, d in enumerate(digits)) == 0b1011101
+
+def test_batch_normalization():
+    points = [G1_GENERATOR * k for k in (0, 5, 7)]
+    assert G1Point.normalize_batch(points) == [None] + [p.to_affine() for p in points[1:]]
+    assert G1Point.from_affine((1, 2)) == G1_GENERATOR
+    assert Fq2(3, 4) * Fq2(3, 4).inverse() == Fq2.one()
+
+def _msm_in_worker(points, scalars):
+    msm_module = importlib.import_module("src.curve.msm")
+    pool._pool, msm_module.PARALLEL_MIN_CHUNK = None, 10
+    result = msm_module.msm(points, scalars, workers=2)
+    return pool._pool is not None, result
+
+def test_msm_matches_naive_sum(monkeypatch):
+    from src.curve import msm, window_size
+    msm_module = importlib.import_module("src.curve.msm")  # The package re-exports msm()
+    rng = random.Random(2)
+    points = [G1_GENERATOR * rng.randrange(CURVE_ORDER) for _ in range(40)] + [G1_GENERATOR.infinity()]
+    scalars = [rng.randrange(CURVE_ORDER) for _ in points]
+    scalars[0] = 0
+    naive = G1_GENERATOR.infinity()
+    for p, k in zip(points, scalars):
+        naive = naive + p * k
+    serial = msm(points, scalars)
+    assert serial == naive and serial.z == 1
+
+    monkeypatch.setattr(msm_module, "PARALLEL_MIN_CHUNK", 10)
+    parallel = msm(points, scalars, workers=2)
+    assert (parallel.x, parallel.y, parallel.z) == (serial.x, serial.y, serial.z)
+    shared = pool._pool
+    assert msm(points, scalars, workers=2) == serial and pool._pool is shared  # Kept
+    assert pool._workers == 2
+
+    with ProcessPoolExecutor(max_workers=1) as outer:
+        started_pool, result = outer.submit(_msm_in_worker, points, scalars).result()
+    assert not started_pool and result == serial
+
+    g2 = [G2_GENERATOR * k for k in (3, 5)]
+    assert msm(g2, [7, 11]) == G2_GENERATOR * (21 + 55)
+    assert window_size(1) == 1 and window_size(10**6) > window_size(10**3)
+
+def test_half_implemented_point_type_cannot_be_instantiated():
+    from src.curve.points import JacobianPoint
+
+    class OnlyDoubles(JacobianPoint):
+        __slots__ = ()
+
+        def double(self):
+            return self
+    with pytest.raises(TypeError, match="_add_affine"):
+        OnlyDoubles(1, 1, 1)
@@ -0,0 +1,91 @@
+import pickle
+import random
+
+import pytest
+
+from src.circuit import FlatCircuit
+from src.finite_field import FieldElement, FieldVector, PrimeField, batch_inverse
+from src.r1cs import R1CS
+from src.witness import WitnessGenerator
+
+PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+def random_vectors(n=16, seed=1):
+    rng = random.Random(seed)
+    field = PrimeField(PRIME)
+    u = field.vector([rng.randrange(PRIME) for _ in range(n)])
+    v = field.vector([rng.randrange(PRIME) for _ in range(n)])
+    return u, v
+
+def test_prime_field_is_one_instance_per_prime():
+    field = PrimeField(PRIME)
+    assert PrimeField(PRIME) is field and PrimeField(97) is not field
+    assert pickle.loads(pickle.dumps(field)) is field
+    assert FieldElement(5, PRIME).field is field and FieldElement(5, field).field is field
+    assert field(PRIME + 5) == field.one() * 5 and field.zero() == 0
+
+def test_vector_ops_match_elementwise():
+    u, v = random_vectors()
+    pairs = list(zip(u, v))
+    assert list(u + v) == [x + y for x, y in pairs]
+    assert list(u - v) == [x - y for x, y in pairs]
+    assert list(u * v) == [x * y for x, y in pairs]
+    assert list(-u) == [-x for x in u]
+    k = FieldElement(PRIME - 3, PRIME)
+    assert list(u.scale(k)) == list(u * k) == list(k.value * u) == [x * k for x in u]
+    expected = FieldElement(0, PRIME)
+    for x, y in pairs:
+        expected = expected + x * y
+    assert u.dot(v) == expected
+    # Plain lists of ints or FieldElements are accepted as the other operand
+    assert u + list(v) == u + v.values == u + v
+
+def test_vector_construction_reduces_and_indexes():
+    field = PrimeField(PRIME)
+    vec = FieldVector([PRIME + 1, -1, FieldElement(7, PRIME)], PRIME)
+    assert vec.field is field and vec.values == [1, PRIME - 1, 7]
+    assert vec[1] == -1 and isinstance(vec[1], FieldElement) and vec[1:].values == [PRIME - 1, 7]
+    vec[0] = PRIME + 2
+    assert vec.values[0] == 2 and FieldVector.zeros(3, field).values == [0, 0, 0]
+    with pytest.raises(ValueError, match="Length mismatch"):
+        vec + [1, 2]
+
+def test_int_minus_element():
+    x = FieldElement(10, PRIME)
+    assert 3 - x == FieldElement(3 - 10, PRIME) and (3 - x).value == PRIME - 7
+    assert 3 + x == 13 and 3 * x == 30 and (x - 3) == 7
+
+def test_witness_is_a_vector_for_field_inputs_and_a_list_for_ints():
+    circuit = FlatCircuit()
+    circuit.output(circuit.mul("x", "y", output_name="out"))
+    r1cs = R1CS(circuit)
+    generator = WitnessGenerator(circuit, r1cs)
+    field_witness = generator.generate({"x": FieldElement(3, PRIME), "y": FieldElement(-1, PRIME)})
+    assert isinstance(field_witness, FieldVector) and field_witness.field is PrimeField(PRIME)
+    assert field_witness[r1cs.index_of("out")] == -3
+    int_witness = generator.generate({"x": 3, "y": -1})
+    assert type(int_witness) is list and int_witness[r1cs.index_of("out")] == -3
+
+def test_batch_inverse():
+    field = PrimeField(PRIME)
+    rng = random.Random(6)
+    values = [rng.randrange(1, PRIME) for _ in range(20)] + [1, PRIME - 1]
+    assert all(x * y % PRIME == 1 for x, y in zip(values, field.batch_inverse(values)))
+    elements = [field(v) for v in values]
+    assert all(x * y == 1 for x, y in zip(elements, batch_inverse(elements)))
+    vec = field.vector(values)
+    inverses = batch_inverse(vec)
+    assert isinstance(inverses, FieldVector) and (vec * inverses).values == [1] * len(values)
+    assert field.batch_inverse([]) == [] and batch_inverse([]) == []
+
+def test_batch_inverse_zeros():
+    field = PrimeField(PRIME)
+    with_zeros = [3, 0, PRIME, 5]  # PRIME is zero too
+    with pytest.raises(ZeroDivisionError, match="element 1"):
+        field.batch_inverse(with_zeros)
+    with pytest.raises(ZeroDivisionError):
+        batch_inverse([field(v) for v in with_zeros])
+    inverses = field.batch_inverse(with_zeros, allow_zero=True)
+    assert inverses[1] == inverses[2] == 0
+    assert inverses[0] * 3 % PRIME == 1 and inverses[3] * 5 % PRIME == 1
+    assert batch_inverse(field.vector(with_zeros), allow_zero=True).values == inverses
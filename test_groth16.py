@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from src import groth16
+from src.circuit import FlatCircuit
+from src.finite_field import PrimeField
+from src.curve import G1_GENERATOR, G2_GENERATOR, CURVE_ORDER, pairing, pairing_product
+from src.r1cs import R1CS
+from src.witness import WitnessGenerator
+from test_r1cs import build_circuit, to_field
+
+def proving_setup():
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    w = WitnessGenerator(circuit, r1cs).generate({"x": to_field(3), "y": to_field(7)})
+    return r1cs, w, [w[i] for i in range(1, r1cs.num_public + 1)]
+
+def test_pairing_is_bilinear():
+    e = pairing(G2_GENERATOR, G1_GENERATOR)
+    assert not e.is_one() and (e ** CURVE_ORDER).is_one()
+    assert pairing(G2_GENERATOR * 2, G1_GENERATOR * 3) == e ** 6
+    assert pairing_product([(G2_GENERATOR, G1_GENERATOR * 5), (G2_GENERATOR * 5, -G1_GENERATOR)]).is_one()
+
+def test_prove_and_verify():
+    r1cs, w, public = proving_setup()
+    pk, vk = groth16.setup(r1cs, random.Random(7))
+    proof = groth16.prove(pk, r1cs, w)
+    assert groth16.verify(vk, public, proof)
+    assert not groth16.verify(vk, [public[0] + 1, public[1]], proof)
+    forged = groth16.Proof(proof.a + G1_GENERATOR, proof.b, proof.c)
+    assert not groth16.verify(vk, public, forged)
+
+def test_public_input_read_by_no_multiplication_is_bound():
+    # "x" is public but no constraint reads it: only the binding row ties it to the proof
+    circuit = FlatCircuit()
+    circuit.public_input("x")
+    circuit.output(circuit.mul("y", "y", output_name="out"))
+    r1cs = R1CS(circuit)
+    w = WitnessGenerator(circuit, r1cs).generate({"x": to_field(3), "y": to_field(7)})
+    pk, vk = groth16.setup(r1cs, random.Random(7))
+    assert not any(ic.is_infinity() for ic in vk.ic)
+    proof = groth16.prove(pk, r1cs, w)
+    assert groth16.verify(vk, [w[1], w[2]], proof)
+    assert not groth16.verify(vk, [w[1], 999], proof)
+
+def test_prove_rejects_witness_over_another_field():
+    r1cs, w, public = proving_setup()
+    pk, vk = groth16.setup(r1cs, random.Random(7))
+    small = PrimeField(97).vector([x.value % 97 for x in w])
+    with pytest.raises(ValueError, match="scalar field"):
+        groth16.prove(pk, r1cs, small)
+    # Plain ints carry no field and are taken mod CURVE_ORDER
+    assert groth16.verify(vk, public, groth16.prove(pk, r1cs, [x.value for x in w]))
+
+def test_key_cache_skips_setup(tmp_path, monkeypatch):
+    r1cs, w, public = proving_setup()
+    pk, vk = groth16.KeyCache(tmp_path).get(r1cs, random.Random(7))
+
+    def no_setup(*args, **kwargs):
+        raise AssertionError("setup should come from the cache")
+    monkeypatch.setattr(groth16, "setup", no_setup)
+    cache = groth16.KeyCache(tmp_path)
+    loaded_pk, loaded_vk = cache.get(r1cs)
+    assert loaded_pk.digest == pk.digest == cache.digest(r1cs)
+    assert callable(loaded_pk._queries["h_query"])  # Not decoded until a proof needs it
+    assert loaded_pk.a_query == pk.a_query and loaded_vk.ic == vk.ic
+
+    proof = groth16.prove(loaded_pk, r1cs, w)
+    assert groth16.verify(vk, public, proof)
+    assert cache.get(r1cs)[0] is loaded_pk
@@ -0,0 +1,88 @@
+import io
+import json
+import logging
+
+import pytest
+
+from src import instrument
+from src.r1cs import R1CS
+from src.witness import WitnessGenerator
+from test_r1cs import build_circuit, to_field
+
+@pytest.fixture
+def sink():
+    memory = instrument.add_sink(instrument.MemorySink())
+    try:
+        yield memory
+    finally:
+        instrument.remove_sink(memory)
+        instrument.configure(track_memory=False)
+
+def test_stage_records_nest_under_their_parent(sink):
+    circuit = build_circuit()
+    with instrument.stage("pipeline", circuit="demo") as outer:
+        r1cs = R1CS(circuit)
+        WitnessGenerator(circuit, r1cs).generate({"x": to_field(3), "y": to_field(7)})
+        outer["done"] = True
+
+    by_stage = {r["stage"]: r for r in sink.records}
+    assert list(by_stage) == ["r1cs.compile", "witness.generate", "pipeline"]  # Emitted on exit
+    compiled = by_stage["r1cs.compile"]
+    assert (compiled["gates"], compiled["constraints"], compiled["variables"]) == (3, 2, 5)
+    assert compiled["nnz"] == r1cs.nnz
+    assert by_stage["witness.generate"]["field_ops"] == by_stage["witness.generate"]["gates"] > 0
+    for name in ("r1cs.compile", "witness.generate"):
+        assert by_stage[name]["parent"] == "pipeline"
+    pipeline = by_stage["pipeline"]
+    assert "parent" not in pipeline and pipeline["circuit"] == "demo" and pipeline["done"]
+    assert pipeline["wall_time_s"] >= compiled["wall_time_s"] >= 0
+    assert pipeline["start_time"] <= compiled["start_time"]
+    assert "peak_memory_bytes" not in pipeline  # Only with track_memory
+
+def test_removed_sink_gets_nothing():
+    memory = instrument.add_sink(instrument.MemorySink())
+    instrument.remove_sink(memory)
+    assert not instrument.enabled()
+    with instrument.stage("quiet") as rec:
+        rec["field_ops"] = 1
+    assert memory.records == [] and rec == {"field_ops": 1}
+
+def test_track_memory_reports_peaks_up_the_stack(sink):
+    instrument.configure(track_memory=True)
+    with instrument.stage("outer"):
+        with instrument.stage("inner"):
+            block = bytearray(1 << 20)
+        del block
+    inner, outer = sink.records
+    assert inner["peak_memory_bytes"] >= 1 << 20
+    assert outer["peak_memory_bytes"] >= inner["peak_memory_bytes"]
+
+def test_json_lines_sink_round_trip(tmp_path):
+    path = str(tmp_path / "profile.jsonl")
+    buffer = io.StringIO()
+    to_file, to_stream = instrument.JsonLinesSink(path), instrument.JsonLinesSink(buffer)
+    for target in (to_file, to_stream):
+        instrument.add_sink(target)
+    try:
+        with instrument.stage("first", gates=3):
+            pass
+        with instrument.stage("second", constraints=2):
+            pass
+    finally:
+        instrument.remove_sink(to_file)
+        instrument.remove_sink(to_stream)
+
+    with open(path) as f:
+        from_file = [json.loads(line) for line in f]
+    assert [json.loads(line) for line in buffer.getvalue().splitlines()] == from_file
+    assert [(r["stage"], r.get("gates"), r.get("constraints")) for r in from_file] == [
+        ("first", 3, None), ("second", None, 2)]
+
+def test_set_log_level():
+    package = logging.getLogger(instrument.PACKAGE_LOGGER)
+    previous = package.level
+    try:
+        instrument.set_log_level(logging.WARNING)
+        assert logging.getLogger("src.r1cs").getEffectiveLevel() == logging.WARNING
+    finally:
+        package.setLevel(previous)
@@ -0,0 +1,136 @@
+import random
+
+from src.finite_field import FieldElement
+from src.polynomial import LagrangePolynomial, Polynomial
+from src.domain import EvaluationDomain
+from src import domain as domain_module, ntt
+
+PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+def to_field(num):
+    return FieldElement(num, PRIME)
+
+def random_poly(length, rng):
+    return Polynomial([to_field(rng.randrange(PRIME)) for _ in range(length)])
+
+def test_bn254_two_adicity():
+    assert ntt.two_adicity(PRIME) == 28
+    w = ntt.root_of_unity(1 << 28, PRIME)
+    assert pow(w, 1 << 28, PRIME) == 1
+    assert pow(w, 1 << 27, PRIME) != 1
+
+def test_ntt_roundtrip():
+    rng = random.Random(1)
+    values = [rng.randrange(PRIME) for _ in range(256)]
+    evals = ntt.ntt(values, PRIME)
+    # Forward transform really is evaluation at the roots of unity
+    w = ntt.root_of_unity(256, PRIME)
+    poly = Polynomial([to_field(v) for v in values])
+    assert evals[5] == poly.evaluate(pow(w, 5, PRIME)).value
+    assert ntt.intt(evals, PRIME) == values
+
+def test_ntt_mul_matches_schoolbook():
+    rng = random.Random(2)
+    for len_a, len_b in [(1, 1), (3, 200), (100, 100), (257, 130)]:
+        a, b = random_poly(len_a, rng), random_poly(len_b, rng)
+        expected = ntt._schoolbook([c.value for c in a.coeffs], [c.value for c in b.coeffs], PRIME)
+        assert [c.value for c in (a * b).coeffs] == expected
+
+def test_domain_interpolation_arbitrary_points():
+    rng = random.Random(3)
+    for size in [1, 2, 3, 7, 150]:
+        xs = [to_field(x) for x in rng.sample(range(1, 10**6), size)]
+        ys = [to_field(rng.randrange(PRIME)) for _ in range(size)]
+        domain = EvaluationDomain.get(xs, PRIME)
+        poly = domain.interpolate(ys)
+        assert poly.degree() < size
+        assert domain.evaluate(poly) == ys
+        assert EvaluationDomain.get(xs, PRIME) is domain
+
+def test_domain_cache_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(EvaluationDomain, "_cache", type(EvaluationDomain._cache)())
+    monkeypatch.setattr(domain_module, "CACHE_SIZE", 3)
+    first = EvaluationDomain.get([1, 2], PRIME)
+    for start in range(10, 13):
+        EvaluationDomain.get([start, start + 1], PRIME)
+        assert EvaluationDomain.get([1, 2], PRIME) is first  # Recently used: kept
+    # [10, 11] was the least recently used when [12, 13] arrived
+    assert [points for _, points in EvaluationDomain._cache] == [(11, 12), (12, 13), (1, 2)]
+
+def test_domain_roots_of_unity():
+    rng = random.Random(4)
+    domain = EvaluationDomain.roots_of_unity(64, PRIME)
+    assert domain.is_radix2
+    ys = [to_field(rng.randrange(PRIME)) for _ in range(64)]
+    poly = domain.interpolate(ys)
+    assert [poly.evaluate(x) for x in domain.points[:4]] == ys[:4]
+    assert domain.evaluate(poly) == ys
+
+def test_division_returns_quotient_and_remainder():
+    rng = random.Random(5)
+    for len_a, len_b in [(10, 3), (300, 100), (400, 2), (5, 9)]:
+        a, b = random_poly(len_a, rng), random_poly(len_b, rng)
+        q, r = a / b
+        assert r.degree() < b.degree() or r.is_zero()
+        assert ((q * b) + r).coeffs == a.coeffs
+
+def test_divide_by_vanishing_on_coset():
+    rng = random.Random(6)
+    domain = EvaluationDomain.roots_of_unity(32, PRIME)
+    h = random_poly(40, rng)
+    product = h * domain.vanishing_polynomial()
+    assert domain.divide_by_vanishing(product).coeffs == h.coeffs
+    assert (product / domain.vanishing_polynomial())[0].coeffs == h.coeffs
+
+def test_evaluate_many_matches_horner():
+    rng = random.Random(7)
+    poly = random_poly(50, rng)
+    for points in (EvaluationDomain.roots_of_unity(64, PRIME).points,
+                   EvaluationDomain.coset(16, PRIME).points,
+                   [rng.randrange(PRIME) for _ in range(40)],
+                   [3, 1, 4]):
+        assert poly.evaluate_many(points) == [poly.evaluate(x) for x in points]
+
+def test_coset_domain_roundtrip():
+    rng = random.Random(8)
+    domain = EvaluationDomain.coset(32, PRIME)
+    assert domain.is_radix2 and domain.shift != 1
+    ys = [to_field(rng.randrange(PRIME)) for _ in range(32)]
+    poly = domain.interpolate(ys)
+    assert domain.evaluate(poly) == ys
+    assert all(domain.vanishing_polynomial().evaluate(x) == 0 for x in domain.points[:3])
+
+def test_lagrange_polynomial_stays_in_evaluation_form():
+    rng = random.Random(9)
+    domain = EvaluationDomain.roots_of_unity(16, PRIME)
+    a, b = random_poly(6, rng), random_poly(5, rng)
+    la, lb = LagrangePolynomial.from_polynomial(a, domain), LagrangePolynomial.from_polynomial(b, domain)
+
+    for result, expected in [(la + lb, a + b), (la - lb, a - b), (la * lb, a * b),
+                             (la * 3, a * Polynomial([to_field(3)])), (a - lb, a - b)]:
+        assert isinstance(result, LagrangePolynomial) and result.domain is domain
+        assert result.coeffs == expected.coeffs
+
+    # deg 10 + deg 10 no longer fits 16 points: the product moves to a 32-point domain
+    big = la * la * la * la
+    assert big.domain.size == 32 and big.degree_bound == 20
+    assert big.coeffs == (a * a * a * a).coeffs
+
+    x = rng.randrange(PRIME)
+    assert la.evaluate(x) == a.evaluate(x)
+    assert la.evaluate(domain.points[3]) == la.values[3]
+    arbitrary = EvaluationDomain.get([2, 5, 11, 17, 23, 31], PRIME)
+    lc = LagrangePolynomial.from_polynomial(b, arbitrary)
+    assert lc.evaluate(x) == b.evaluate(x) and (lc / b)[0].coeffs[0] == 1
+
+def test_four_step_matches_serial_transform():
+    from src import four_step
+    rng = random.Random(10)
+    for n in (2, 8, 32, 1024):  # Square and 1:2 splits
+        values = [rng.randrange(PRIME) for _ in range(n)]
+        for workers in (1, 2):
+            assert four_step.four_step_ntt(values, PRIME, workers=workers) == ntt.ntt(values, PRIME)
+            assert four_step.four_step_intt(values, PRIME, workers=workers) == ntt.intt(values, PRIME)
+    # The same process pool msm() uses: one pool for every parallel kernel
+    from src import pool
+    assert pool._pool is not None and pool.shared_pool(2) is pool._pool
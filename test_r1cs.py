@@ -0,0 +1,160 @@
+from src.circuit import FlatCircuit
+from src.finite_field import FieldElement
+from src.optimizer import optimize
+from src.qap import QAP
+from src.r1cs import R1CS
+from src.witness import WitnessGenerator
+
+PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+def to_field(num):
+    return FieldElement(num, PRIME)
+
+def build_circuit():
+    # out = (x * y) - (x + 5)
+    circuit = FlatCircuit()
+    x = circuit.public_input("x")
+    y = circuit.private_input("y")
+    xy = circuit.mul(x, y)
+    x5 = circuit.add(x, 5)
+    circuit.output(circuit.sub(xy, x5, output_name="out"))
+    return circuit
+
+def honest_witness(circuit, r1cs):
+    inputs = {"x": to_field(3), "y": to_field(7)}
+    return WitnessGenerator(circuit, r1cs).generate(inputs)
+
+def test_honest_witness_satisfies():
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    w = honest_witness(circuit, r1cs)
+    assert r1cs.unsatisfied_constraints(w) == []
+    assert r1cs.is_satisfied(w)
+    assert r1cs.is_satisfied(w, probabilistic=True)
+
+def test_tampered_witness_reports_failing_rows():
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    w = list(honest_witness(circuit, r1cs))
+    w[r1cs.var_map["out"]] = to_field(1)
+    # The ADD and SUB are folded, so "out" is checked by the second constraint
+    assert r1cs.unsatisfied_constraints(w) == [1]
+    assert not r1cs.is_satisfied(w)
+    assert not r1cs.is_satisfied(w, probabilistic=True)
+
+def test_constants_and_public_first_layout():
+    circuit = build_circuit()
+    t2 = circuit.mul(circuit.add("t", to_field(2)), 3)  # Undeclared input "t", folded
+    circuit.mul(t2, "y", output_name="u")
+    r1cs = R1CS(circuit)
+    # one, outputs, public inputs, private inputs; constants get no variable
+    assert r1cs.var_map == {"one": 0, "out": 1, "x": 2, "y": 3, "t": 4, "v3": 5, "u": 6}
+    assert r1cs.num_public == 2 and r1cs.num_private_inputs == 2
+    w = WitnessGenerator(circuit, r1cs).generate({"x": to_field(3), "y": to_field(7), "t": to_field(1)})
+    assert w[1] == to_field(3 * 7 - (3 + 5))
+    assert r1cs.is_satisfied(w)
+
+def test_integer_witness_without_prime():
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    w = WitnessGenerator(circuit, r1cs).generate({"x": 3, "y": 7})
+    a, b, c = r1cs.evaluate(w)
+    assert [x * y for x, y in zip(a, b)] == c
+
+def test_qap_from_r1cs():
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    w = honest_witness(circuit, r1cs)
+    qap = QAP(r1cs, w)
+    assert qap.check()
+    # A(x) really is the sum of the witness-weighted columns at each gate
+    omega = qap.pre.omega
+    a_rows, _, _ = r1cs.evaluate(w)
+    assert qap.A.evaluate(pow(omega, 1, PRIME)).value == a_rows[1]
+    assert QAP(r1cs, w).pre is qap.pre
+
+def test_qap_rejects_bad_witness():
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    w = list(honest_witness(circuit, r1cs))
+    w[r1cs.var_map["out"]] = to_field(1)
+    assert not QAP(r1cs, w).check()
+
+def test_witness_batch_matches_single():
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    wg = WitnessGenerator(circuit, r1cs)
+    inputs = [{"x": to_field(x), "y": to_field(y)} for x, y in [(1, 2), (3, 7), (0, PRIME - 1)]]
+    batch = wg.generate_batch(inputs)
+    # The same generator is reused for every single call
+    assert batch == [wg.generate(m) for m in inputs]
+    assert all(r1cs.is_satisfied(w) for w in batch)
+
+def test_optimizer_folds_merges_and_prunes():
+    circuit = FlatCircuit()
+    s = circuit.add("x", "y")
+    p1 = circuit.mul(s, "z")
+    p2 = circuit.mul("z", s)                 # Same product: CSE
+    three = circuit.scale(circuit.one, 3)
+    p3 = circuit.mul(p1, three)              # Times a constant: folded
+    circuit.mul("x", "x")                    # Nothing depends on it: dead
+    out = circuit.output(circuit.add(p2, p3, output_name="out"))
+
+    optimized, report = optimize(circuit)
+    assert report.constraints_before == 7     # One per gate
+    assert report.constraints_after == 2     # s * z = p1, (p1 + 3*p1) * 1 = out
+    assert report.cse_merged == 1 and report.dead_removed == 1
+
+    r1cs = R1CS(optimized)
+    inputs = {"x": to_field(2), "y": to_field(3), "z": to_field(4)}
+    w = WitnessGenerator(optimized, r1cs).generate(inputs)
+    assert r1cs.is_satisfied(w)
+    assert w[r1cs.index_of(out)] == to_field(80)
+
+def test_wires_are_ids_and_sync_appends_rows():
+    circuit = build_circuit()
+    xy = circuit.wire(3)
+    assert circuit.mul(xy, 3) != circuit.mul(xy, xy)   # int 3 is a constant, Wire 3 a wire
+    r1cs = R1CS(circuit)
+    before = (r1cs.num_vars, len(r1cs.A), dict(r1cs.var_map))
+
+    sq = circuit.mul(circuit.output("out"), "y", output_name="sq")  # Only known inputs
+    assert r1cs.sync() == 1
+    assert (r1cs.num_vars, len(r1cs.A)) == (before[0] + 1, before[1] + 1)
+    assert all(r1cs.var_map[k] == v for k, v in before[2].items())
+
+    fresh = R1CS(circuit)
+    assert fresh.var_map == r1cs.var_map
+    assert fresh.A.to_dense() == r1cs.A.to_dense()
+    w = WitnessGenerator(circuit, r1cs).generate({"x": to_field(3), "y": to_field(7)})
+    assert r1cs.is_satisfied(w) and w[r1cs.index_of(sq)] == to_field(13 * 7)
+
+    circuit.mul(sq, "new_input")  # A new private input reshapes the layout
+    r1cs.sync()
+    assert r1cs.var_map == R1CS(circuit).var_map
+
+def test_operations_is_still_a_list_of_gate_dicts():
+    circuit = build_circuit()
+    ops = circuit.operations
+    assert [op['op'] for op in ops] == ["MUL", "ADD", "SUB"]
+    assert ops[1]['left'] == circuit.wire("x") and ops[1]['right'] == 5  # Constants decoded
+    assert ops[2]['output'] == circuit.wire("out")
+
+def test_witness_update_reruns_only_the_changed_cone():
+    # out = (x * y) - (x + 5); z feeds a separate output
+    circuit = build_circuit()
+    z = circuit.private_input("z")
+    circuit.output(circuit.mul(z, z, output_name="zz"))
+    r1cs = R1CS(circuit)
+    wg = WitnessGenerator(circuit, r1cs)
+    before = wg.generate({"x": to_field(3), "y": to_field(7), "z": to_field(2)})
+
+    after, dirty = wg.update({"z": to_field(5)})
+    assert after == wg.generate({"x": to_field(3), "y": to_field(7), "z": to_field(5)})
+    assert dirty == {i for i in range(len(after)) if after[i] != before[i]}
+    assert dirty == {r1cs.index_of("z"), r1cs.index_of("zz")}
+
+    after, dirty = wg.update({"y": 8})
+    assert after == wg.generate({"x": to_field(3), "y": to_field(8), "z": to_field(5)})
+    assert r1cs.index_of("out") in dirty and r1cs.index_of("zz") not in dirty
+    assert wg.update({"y": 8})[1] == set()
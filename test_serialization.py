@@ -0,0 +1,61 @@
+import pytest
+
+from src import serialization
+from src.finite_field import FieldElement
+from src.r1cs import R1CS
+from src.serialization import write_r1cs, write_wtns, read_r1cs, read_wtns
+from src.witness import WitnessGenerator
+from test_r1cs import build_circuit, PRIME
+
+def to_field(num):
+    return FieldElement(num, PRIME)
+
+def test_r1cs_and_witness_round_trip(tmp_path):
+    circuit = build_circuit()
+    circuit.mul(circuit.sub("y", 7), -1, output_name="neg")  # Negative coefficients
+    circuit.output("neg")
+    r1cs = R1CS(circuit)
+    w = WitnessGenerator(circuit, r1cs).generate({"x": to_field(3), "y": to_field(7)})
+
+    write_r1cs(r1cs, tmp_path / "c.r1cs", PRIME)
+    write_wtns(w, tmp_path / "c.wtns")
+
+    with read_r1cs(tmp_path / "c.r1cs") as f, read_wtns(tmp_path / "c.wtns") as wf:
+        assert (f.prime, f.n8, f.num_vars, len(f)) == (PRIME, 32, r1cs.num_vars, len(r1cs.A))
+        assert (f.num_outputs, f.num_public_inputs, f.num_private_inputs) == (2, 1, 1)
+        assert f.wire_labels() == list(r1cs.wires)
+        A, B, C = f.matrices()
+        assert A.to_dense() == [[c % PRIME for c in row] for row in r1cs.A.to_dense()]
+        assert f[-1] == list(f)[-1]
+
+        assert list(wf) == w.values and wf[1] == w.values[1]
+        assert f.is_satisfied(wf)
+        assert r1cs.is_satisfied(wf.to_vector())
+
+    bad = list(w.values)
+    bad[r1cs.index_of("out")] += 1
+    with read_r1cs(tmp_path / "c.r1cs") as f:
+        assert f.unsatisfied_constraints(bad) == [1]
+
+
+def test_truncated_files_are_rejected_and_closed(tmp_path, monkeypatch):
+    circuit = build_circuit()
+    r1cs = R1CS(circuit)
+    w = WitnessGenerator(circuit, r1cs).generate({"x": to_field(3), "y": to_field(7)})
+    write_r1cs(r1cs, tmp_path / "c.r1cs", PRIME)
+    write_wtns(w, tmp_path / "c.wtns")
+
+    opened = []
+    def tracking_open(*args, **kwargs):
+        opened.append(open(*args, **kwargs))
+        return opened[-1]
+    monkeypatch.setattr(serialization, "open", tracking_open, raising=False)
+
+    for name, read in (("c.r1cs", read_r1cs), ("c.wtns", read_wtns)):
+        data = (tmp_path / name).read_bytes()
+        for cut in (6, 20, 60, len(data) - 1):  # Inside the preamble, headers, payload
+            path = tmp_path / f"cut-{cut}-{name}"
+            path.write_bytes(data[:cut])
+            with pytest.raises(ValueError, match="truncated|past the end|fewer than"):
+                read(path)
+    assert opened and all(f.closed for f in opened)
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from src import circuits, service
+from src.finite_field import FieldElement
+from src.r1cs import R1CS
+from src.service import Client, JobError, PRIME, ProvingService
+from src.witness import WitnessGenerator
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_service_batches_and_proves_over_a_socket(tmp_path):
+    circuit = circuits.id_card()
+    expected = WitnessGenerator(circuit, R1CS(circuit)).generate({"dob": FieldElement(1990, PRIME)})
+
+    async def scenario():
+        async with ProvingService(workers=1, key_dir=str(tmp_path / "keys"), max_delay=0.05) as service:
+            path = str(tmp_path / "zk.sock")
+            await service.start(path=path)
+            client = await Client.connect(path)
+            try:
+                # Pipelined requests for one circuit and op are coalesced into batches
+                witnesses = await asyncio.gather(*(
+                    client.call("witness", circuit="id_card", inputs={"dob": 1990 + i}) for i in range(8)))
+                stats = await client.call("stats")
+                assert stats["batches"] < 8 and stats["jobs"] == 8
+                assert witnesses[0]["witness"] == [str(v) for v in expected.values]
+
+                # One bad job fails alone, not its whole batch
+                good, bad = await asyncio.gather(
+                    client.call("check", circuit="id_card", inputs={"dob": "2001"}),
+                    client.call("check", circuit="id_card", inputs={}), return_exceptions=True)
+                assert good == {"satisfied": True, "failed": []}
+                assert isinstance(bad, JobError) and "dob" in str(bad)
+
+                proved = await client.call("prove", circuit="id_card", inputs={"dob": 1990})
+                assert proved["public"] == ["15"]
+                assert await client.call("verify", circuit="id_card", **proved) == {"valid": True}
+                forged = dict(proved, public=["16"])
+                assert await client.call("verify", circuit="id_card", **forged) == {"valid": False}
+
+                with pytest.raises(JobError):
+                    await client.call("prove", circuit="nope", inputs={})
+            finally:
+                await client.close()
+
+    run(scenario())
+
+
+def test_submit_in_process_reports_errors():
+    async def scenario():
+        async with ProvingService(workers=1) as service:
+            assert (await service.submit({"id": 3, "op": "circuits"}))["result"] == {"circuits": ["id_card"]}
+            response = await service.submit({"id": 4, "op": "explode"})
+            assert response["id"] == 4 and not response["ok"] and "unknown op" in response["error"]
+
+    run(scenario())
+
+
+def test_batch_with_a_bad_job_runs_the_good_ones_once(tmp_path, monkeypatch):
+    calls = []
+    generate_batch = WitnessGenerator.generate_batch
+    monkeypatch.setattr(WitnessGenerator, "generate_batch",
+                        lambda self, maps: calls.append(len(maps)) or generate_batch(self, maps))
+    payloads = [{"inputs": {"dob": 1990}}, {"inputs": {}}, {"inputs": "x"}, {"inputs": {"dob": "2000"}},
+                {"inputs": {"dob": 1990.7}}, {"inputs": {"dob": True}}, {"inputs": {"dob": "1990.7"}}]
+    results = service._run_batch("id_card", circuits.id_card, str(tmp_path), "check", payloads)
+    assert [status for status, _ in results] == ["ok", "error", "error", "ok", "error", "error", "error"]
+    assert "missing input 'dob'" in results[1][1] and results[3][1]["satisfied"]
+    assert all("integer or a decimal string" in message for _, message in results[4:])  # Not truncated
+    assert calls == [2]  # One pass for the valid jobs, no retries
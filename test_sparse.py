@@ -0,0 +1,27 @@
+from src.sparse import SparseMatrix
+
+def test_permute_columns_keeps_rows_sorted():
+    matrix = SparseMatrix.from_dense([[1, 0, 2, 0], [0, 3, 0, 4], [5, 6, 7, 8]])
+    index = [3, 0, 2, 1]  # Column j -> index[j]
+    permuted = matrix.permute_columns(index, 4)
+    for i in range(permuted.num_rows):
+        columns = [col for col, _ in permuted.row(i)]
+        assert columns == sorted(columns)
+    assert permuted.to_dense() == [[0, 0, 2, 1], [3, 4, 0, 0], [6, 8, 7, 5]]
+
+def dense_column(dense, j):
+    return [(i, row[j]) for i, row in enumerate(dense) if row[j] != 0]
+
+def test_column_matches_dense_transpose():
+    matrix = SparseMatrix.from_dense([[1, 0, 2, 0], [0, 3, 0, 4], [5, 6, 0, 8]])
+    dense = matrix.to_dense()
+    for j in range(matrix.num_cols):
+        assert list(matrix.column(j)) == dense_column(dense, j)
+    assert list(matrix.column(9)) == []
+
+    # append_row() drops the cached column view; a new column extends the matrix
+    matrix.append_row([(2, 7), (5, -1), (0, 1), (2, 1)])
+    dense = matrix.to_dense()
+    assert matrix.num_cols == 6 and dense[3] == [1, 0, 8, 0, 0, -1]
+    for j in range(matrix.num_cols):
+        assert list(matrix.column(j)) == dense_column(dense, j)
@@ -1,5 +1,9 @@
 from src.finite_field import FieldElement
 from src.polynomial import lagrange_interpolation, Polynomial
+from src.circuit import FlatCircuit
+from src.r1cs import R1CS
+from src.witness import WitnessGenerator
+from src.qap import QAP
 
 # 1. Setup Field
 PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
@@ -30,13 +34,34 @@ def visualize_simple_qap():
     # VISUAL CHECK:
     # Does the curve actually pass through our gates?
     print("\n2. Checking the 'Graph':")
-    for x, target_y in zip(xs, ys):
-        actual_y = poly.evaluate(x)
+    # One batched evaluation at every gate instead of a Horner pass per gate
+    for x, target_y, actual_y in zip(xs, ys, poly.evaluate_many(xs)):
         match = "MATCH" if actual_y == target_y else "MISS"
         print(f"   At x={x}: Target y={target_y} | Actual Curve y={actual_y} -> {match}")
         
     print("\nThis curve IS the proof. Instead of sending the list [3, 2, 4],")
     print("we send the coefficients of this polynomial.")
 
+def visualize_circuit_qap():
+    print("\n--- FROM CIRCUIT TO QAP ---")
+
+    # out = x * y * z, which needs 2 multiplication gates
+    circuit = FlatCircuit()
+    xy = circuit.mul("x", "y", output_name="xy")
+    circuit.mul(xy, "z", output_name="out")
+    r1cs = R1CS(circuit)
+
+    w = WitnessGenerator(circuit, r1cs).generate({"x": to_field(2), "y": to_field(3), "z": to_field(4)})
+
+    # The QAP class never interpolates column-by-column: it evaluates A.w, B.w, C.w
+    # at every gate (a root of unity) and runs one inverse NTT per polynomial.
+    qap = QAP(r1cs, w)
+    print(f"   A(x) = {qap.A}")
+    print(f"   B(x) = {qap.B}")
+    print(f"   C(x) = {qap.C}")
+    print(f"   H(x) = {qap.H}")
+    print(f"   A*B - C == H*Z at a random point? {qap.check()}")
+
 if __name__ == "__main__":
-    visualize_simple_qap()
\ No newline at end of file
+    visualize_simple_qap()
+    visualize_circuit_qap()
\ No newline at end of file